@@ -0,0 +1,132 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+import asyncio
+import contextlib
+import os
+from typing import AsyncIterator
+
+import playwright.async_api
+from playwright.async_api import async_playwright
+
+SIZE = 2
+CONTEXT_MAX_USES = 50
+
+
+class _BrowserSlot:
+    def __init__(self):
+        self.browser: playwright.async_api.Browser | None = None
+        self.context: playwright.async_api.BrowserContext | None = None
+        self.context_uses = 0
+
+
+class BrowserPool:
+    """
+    Pool of warm browsers shared by the scrapers, so every query costs a page navigation instead of starting a
+    playwright driver and launching a browser.
+
+    The pool has size browsers (FLANAAPIS_BROWSER_POOL_SIZE environment variable by default) and every page waits for a
+    free one, so the concurrent queries can't spawn more browser processes. Each browser keeps a context that is
+    recycled after context_max_uses pages. The new contexts start with the storage state saved by save_storage_state
+    (e.g. the cookies of an accepted consent). A context whose page raises an error is discarded, and a browser that has
+    disconnected is launched again the next time it is used.
+    """
+
+    def __init__(self, size: int = None, browser_type='chromium', context_max_uses=CONTEXT_MAX_USES):
+        self._size = size
+        self.browser_type = browser_type
+        self.context_max_uses = context_max_uses
+        self.storage_state: dict | None = None
+        self._playwright: playwright.async_api.Playwright | None = None
+        self._slots: asyncio.Queue[_BrowserSlot] | None = None
+        self._all_slots: list[_BrowserSlot] = []
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def is_started(self) -> bool:
+        return self._playwright is not None
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            return int(os.environ.get('FLANAAPIS_BROWSER_POOL_SIZE', SIZE))
+
+        return self._size
+
+    async def _close_context(self, slot: _BrowserSlot):
+        if slot.context:
+            with contextlib.suppress(playwright.async_api.Error):
+                await slot.context.close()
+        slot.context = None
+        slot.context_uses = 0
+
+    async def _prepare(self, slot: _BrowserSlot) -> playwright.async_api.BrowserContext:
+        if not slot.browser or not slot.browser.is_connected():
+            await self._close_context(slot)
+            slot.browser = await getattr(self._playwright, self.browser_type).launch()
+
+        if not slot.context or slot.context_uses >= self.context_max_uses:
+            await self._close_context(slot)
+            slot.context = await slot.browser.new_context(storage_state=self.storage_state)
+
+        slot.context_uses += 1
+        return slot.context
+
+    @contextlib.asynccontextmanager
+    async def page(self) -> AsyncIterator[playwright.async_api.Page]:
+        """Opens a new page in a warm browser, waiting for a free one, and closes it at the end."""
+
+        if not self.is_started:
+            await self.start()
+        slot = await self._slots.get()
+        try:
+            try:
+                page = await (await self._prepare(slot)).new_page()
+            except playwright.async_api.Error:
+                await self._close_context(slot)  # maybe the browser crashed, so the next use checks it again
+                raise
+
+            try:
+                yield page
+            except Exception:
+                await self._close_context(slot)  # the error could have left the context in a bad state
+                raise
+            finally:
+                with contextlib.suppress(playwright.async_api.Error):
+                    await page.close()
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def save_storage_state(self, context: playwright.async_api.BrowserContext):
+        """Saves the cookies and local storage of the context for the next contexts of the pool."""
+
+        self.storage_state = await context.storage_state()
+
+    async def start(self):
+        """Starts the playwright driver and launches the browsers. The browsers that fail are launched on demand."""
+
+        async with self._start_lock:
+            if self.is_started:
+                return
+
+            self._playwright = await async_playwright().start()
+            self._slots = asyncio.Queue()
+            self._all_slots = [_BrowserSlot() for _ in range(self.size)]
+            for slot in self._all_slots:
+                with contextlib.suppress(playwright.async_api.Error):
+                    slot.browser = await getattr(self._playwright, self.browser_type).launch()
+                self._slots.put_nowait(slot)
+
+    async def stop(self):
+        async with self._start_lock:
+            if not self.is_started:
+                return
+
+            for slot in self._all_slots:
+                await self._close_context(slot)
+                if slot.browser:
+                    with contextlib.suppress(playwright.async_api.Error):
+                        await slot.browser.close()
+            await self._playwright.stop()
+            self._playwright = None
+            self._slots = None
+            self._all_slots = []
@@ -0,0 +1,112 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache with a time to live for every entry.
+
+    When the cache is full the least recently used entry is evicted. The returned values are the stored ones, so they
+    must be treated as immutable: a caller that needs to change a value has to copy it first. If copy_values=True the
+    values are deep copied once when they are stored, so the objects passed to set can still be mutated. The expired
+    entries are kept stale_ttl more seconds, during which only get_stale returns them.
+    """
+
+    def __init__(self, max_size: int, ttl: float, copy_values=False, stale_ttl: float = 0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.copy_values = copy_values
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        try:
+            expiration, _ = self._entries[key]
+        except KeyError:
+            return False
+
+        return time.monotonic() < expiration
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _get_entry(self, key: Hashable) -> tuple[float, Any] | None:
+        try:
+            expiration, value = self._entries[key]
+        except KeyError:
+            return
+
+        if expiration + self.stale_ttl <= time.monotonic():
+            del self._entries[key]
+            return
+
+        return expiration, value
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def expires_in(self, key: Hashable) -> float | None:
+        """Returns the seconds until the entry expires (negative if it is stale) or None if it is not in the cache."""
+
+        if not (entry := self._get_entry(key)):
+            return
+
+        return entry[0] - time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not (entry := self._get_entry(key)) or entry[0] <= time.monotonic():
+            self.misses += 1
+            return default
+
+        _, value = entry
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value of the entry even if it has expired, as long as it is not older than ttl + stale_ttl."""
+
+        if not (entry := self._get_entry(key)):
+            return default
+
+        _, value = entry
+
+        return value
+
+    def keys(self) -> list[Hashable]:
+        """Returns the keys of the entries, including the expired ones that have not been removed yet."""
+
+        return list(self._entries)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            return self._entries.pop(key)[1]
+        except KeyError:
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float = None):
+        if self.copy_values:
+            value = copy.deepcopy(value)
+
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
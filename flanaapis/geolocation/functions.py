@@ -1,12 +1,15 @@
+import math
 import os
 from typing import AsyncIterator, overload
 
 import flanautils
 
+from flanaapis import upstream_calls
 from flanaapis.exceptions import PlaceNotFoundError
-from flanaapis.geolocation import google_maps, open_street_map
+from flanaapis.geolocation import google_maps, open_street_map, place_cache, timezones
 from flanaapis.geolocation.models import Place
 
+EARTH_RADIUS = 6371.0088  # km
 TIMEZONE_BASE_ENDPOINT = 'https://api.timezonedb.com/v2.1/get-time-zone'
 
 
@@ -36,6 +39,21 @@ async def ensure_coordinates(latitude: float | str, longitude: float = None, fas
     return latitude, longitude
 
 
+def haversine_distance(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+    """Returns the great-circle distance in kilometers between two coordinates."""
+
+    latitude_1, longitude_1, latitude_2, longitude_2 = map(math.radians, (latitude_1, longitude_1, latitude_2, longitude_2))
+    a = math.sin((latitude_2 - latitude_1) / 2) ** 2 + math.cos(latitude_1) * math.cos(latitude_2) * math.sin((longitude_2 - longitude_1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def quantize_coordinates(latitude: float, longitude: float, grid_size: float) -> tuple[float, float]:
+    """Snaps the coordinates to the nearest node of a grid of grid_size degrees."""
+
+    return round(round(latitude / grid_size) * grid_size, 6), round(round(longitude / grid_size) * grid_size, 6)
+
+
 @overload
 async def find_timezone(place_query: str, fast: bool = False) -> dict | None:
     pass
@@ -48,6 +66,9 @@ async def find_timezone(latitude: float, longitude: float = None, fast: bool = F
 
 async def find_timezone(latitude: float | str, longitude: float = None, fast: bool = False) -> dict | None:
     latitude, longitude = await ensure_coordinates(latitude, longitude, fast)
+    if timezone_data := await timezones.find_timezone(latitude, longitude):
+        return timezone_data
+
     parameters = {
         'key': os.environ['TIMEZONEDB_API_KEY'],
         'format': 'json',
@@ -55,6 +76,7 @@ async def find_timezone(latitude: float | str, longitude: float = None, fast: bo
         'lat': latitude,
         'lng': longitude
     }
+    upstream_calls.count_call()
     timezone_data = await flanautils.get_request(TIMEZONE_BASE_ENDPOINT, params=parameters)
 
     if timezone_data['status'] == 'OK':
@@ -62,10 +84,13 @@ async def find_timezone(latitude: float | str, longitude: float = None, fast: bo
 
 
 async def find_place(place_query: str, fast: bool = False) -> Place | None:
-    if not fast and (partial_place := await google_maps.find_place(place_query)):
-        return await open_street_map.find_place(f'{partial_place.latitude}, {partial_place.longitude}')
-    else:
-        return await open_street_map.find_place(place_query)
+    async def find() -> Place | None:
+        if not fast and (partial_place := await google_maps.find_place(place_query)):
+            return await open_street_map.reverse_find_place(partial_place.latitude, partial_place.longitude)
+        else:
+            return await open_street_map.find_place(place_query)
+
+    return await place_cache.get_or_find(place_cache.create_key('fast_place' if fast else 'place', place_query), find)
 
 
 # noinspection PyUnusedLocal
@@ -83,7 +108,7 @@ async def find_place_showing_progress(place_query: str) -> AsyncIterator[str | P
                 yield message
 
     if result:
-        yield await open_street_map.find_place(f'{result.latitude}, {result.longitude}')
+        yield await open_street_map.reverse_find_place(result.latitude, result.longitude)
     else:
         yield 'Google maps no ha encontrado nada. Buscando en openstreetmap.org...'
         yield await open_street_map.find_place(place_query)
@@ -1,71 +1,169 @@
+import asyncio
+import contextlib
 import re
 import urllib.parse
 from typing import AsyncIterable
 
-import playwright
-from playwright.async_api import async_playwright
+import playwright.async_api
 
+from flanaapis.browsers import BrowserPool
 from flanaapis.geolocation.models import Place
 
+BASE_URL = 'https://www.google.es/maps/search'
+BLOCKED_RESOURCE_TYPES = ('font', 'image', 'media')
+TILE_URL_PATTERN = re.compile(r'/maps/vt\b|/kh/v\b|khms\d*\.google')
+SEARCH_RESPONSE_URL_PATTERN = re.compile(r'/search\?.*\btbm=map\b|/maps/preview/place\b')
+RESPONSE_COORDINATES_PATTERN = re.compile(r'\[\[1,\[null,null,(-?\d{1,2}\.\d+),(-?\d{1,3}\.\d+)],"0x')  # first result, not the viewport
+URL_COORDINATES_PATTERN = re.compile(r'(?:place|search)/\d*(.+)/@([\d.-]+),([\d.-]+)')
+INTERCEPT_TIMEOUT = 15
 
-async def find_place(place_query: str) -> Place | None:
-    async with async_playwright() as p:
-        async with await p.chromium.launch() as browser:
-            try:
-                page: playwright.async_api.Page = await browser.new_page()
-                await page.goto(f"https://www.google.es/maps/search/{'+'.join(place_query.split())}")
-                if await (button := page.locator("'Acepto'")).count() or await (button := page.locator("'Aceptar todo'")).count():
-                    await button.first.click()
-                while '@' not in page.url:
-                    await page.wait_for_event('framenavigated')
-
-                await page.wait_for_load_state('domcontentloaded')
-                if await page.query_selector("'Google Maps no encuentra'"):
-                    return
-            except playwright.async_api.TimeoutError:
-                return
+browser_pool = BrowserPool()
 
-            try:
-                place_name, latitude, longitude = re.findall(r'(?:place|search)/\d*(.+)/@([\d.-]+),([\d.-]+)', page.url)[0]
-            except IndexError:
-                return
 
-            place_name = urllib.parse.unquote(place_name.replace('+', ' ').strip())
+def _create_place_by_response(text: str, place_query: str) -> Place | None:
+    if match := RESPONSE_COORDINATES_PATTERN.search(text):
+        return Place(place_query, *match.groups())
 
-            return Place(place_name, latitude, longitude)
 
+def _create_place_by_url(url: str) -> Place | None:
+    try:
+        place_name, latitude, longitude = URL_COORDINATES_PATTERN.findall(url)[0]
+    except IndexError:
+        return
 
-async def find_place_showing_progress(place_query: str) -> AsyncIterable[str | Place | None]:
-    yield 'Abriendo navegador...'
-    async with async_playwright() as p:
-        async with await p.chromium.launch() as browser:
-            try:
-                page: playwright.async_api.Page = await browser.new_page()
-                yield 'Dirigiéndome a google.es/maps...'
-                await page.goto(f"https://www.google.es/maps/search/{'+'.join(place_query.split())}")
-
-                if await (button := page.locator("'Acepto'")).count() or await (button := page.locator("'Aceptar todo'")).count():
-                    yield 'Aceptando consentimiento de privacidad...'
-                    await button.first.click()
-
-                yield 'Rebuscando coordenadas en la página...'
-                while '@' not in page.url:
-                    await page.wait_for_event('framenavigated')
-
-                await page.wait_for_load_state('domcontentloaded')
-                if await page.query_selector("'Google Maps no encuentra'"):
-                    yield
-                    return
-            except playwright.async_api.TimeoutError:
-                yield
+    place_name = urllib.parse.unquote(place_name.replace('+', ' ').strip())
+
+    return Place(place_name, latitude, longitude)
+
+
+def _get_url(place_query: str) -> str:
+    return f"{BASE_URL}/{'+'.join(place_query.split())}"
+
+
+async def _intercept_place(page: playwright.async_api.Page, place_query: str) -> Place | None:
+    """
+    Returns the place as soon as its coordinates appear in a search response of Maps or in the url, without waiting for
+    the page to load, which is aborted when the page is closed. The images, fonts and map tiles are never requested. The
+    places found in the responses are named after the query because only the coordinates are reliable there, and a
+    search response without results gives None.
+    """
+
+    place_future: asyncio.Future[Place | None] = asyncio.get_running_loop().create_future()
+
+    def set_place(place: Place | None):
+        if not place_future.done():
+            place_future.set_result(place)
+
+    async def check_page():
+        with contextlib.suppress(playwright.async_api.Error):
+            await page.wait_for_load_state('domcontentloaded')
+            if await page.query_selector("'Google Maps no encuentra'"):
+                set_place(None)
+            elif place := _create_place_by_url(page.url):
+                set_place(place)
+
+    async def on_frame_navigated(frame: playwright.async_api.Frame):
+        if frame != page.main_frame:
+            return
+
+        if '/place/' in frame.url and (place := _create_place_by_url(frame.url)):
+            set_place(place)
+        elif '@' in frame.url:
+            await check_page()  # the coordinates of a search url can be the ones of a search without results
+
+    async def on_response(response: playwright.async_api.Response):
+        if not SEARCH_RESPONSE_URL_PATTERN.search(response.url):
+            return
+
+        with contextlib.suppress(playwright.async_api.Error):
+            set_place(_create_place_by_response(await response.text(), place_query))
+
+    page.on('framenavigated', on_frame_navigated)
+    page.on('response', on_response)
+    await page.route('**/*', _route_request)
+
+    consent_accepted = False
+    try:
+        await page.goto(_get_url(place_query), wait_until='commit')
+        if 'consent.' in page.url:
+            await page.wait_for_load_state('domcontentloaded')
+            if await (button := page.locator("'Acepto'")).count() or await (button := page.locator("'Aceptar todo'")).count():
+                await button.first.click()
+                consent_accepted = True
+
+        place = await asyncio.wait_for(place_future, INTERCEPT_TIMEOUT)
+    except (asyncio.TimeoutError, playwright.async_api.TimeoutError):
+        return
+
+    if consent_accepted:
+        await browser_pool.save_storage_state(page.context)
+
+    return place
+
+
+async def _route_request(route: playwright.async_api.Route):
+    with contextlib.suppress(playwright.async_api.Error):  # the page may have been closed after finding the place
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES or TILE_URL_PATTERN.search(route.request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+async def find_place(place_query: str, intercept_network=True) -> Place | None:
+    """
+    Finds the place in Google Maps. If intercept_network=True (default) the coordinates are taken from the network
+    traffic as soon as they appear, otherwise the page navigates until the url has them.
+    """
+
+    async with browser_pool.page() as page:
+        if intercept_network:
+            return await _intercept_place(page, place_query)
+
+        consent_accepted = False
+        try:
+            await page.goto(_get_url(place_query))
+            if await (button := page.locator("'Acepto'")).count() or await (button := page.locator("'Aceptar todo'")).count():
+                await button.first.click()
+                consent_accepted = True
+            while '@' not in page.url:
+                await page.wait_for_event('framenavigated')
+
+            await page.wait_for_load_state('domcontentloaded')
+            if consent_accepted:
+                await browser_pool.save_storage_state(page.context)
+            if await page.query_selector("'Google Maps no encuentra'"):
                 return
+        except playwright.async_api.TimeoutError:
+            return
+
+        return _create_place_by_url(page.url)
 
-            try:
-                place_name, latitude, longitude = re.findall(r'(?:place|search)/\d*(.+)/@([\d.-]+),([\d.-]+)', page.url)[0]
-            except IndexError:
+
+async def find_place_showing_progress(place_query: str) -> AsyncIterable[str | Place | None]:
+    yield 'Abriendo navegador...'
+    consent_accepted = False
+    async with browser_pool.page() as page:
+        try:
+            yield 'Dirigiéndome a google.es/maps...'
+            await page.goto(_get_url(place_query))
+
+            if await (button := page.locator("'Acepto'")).count() or await (button := page.locator("'Aceptar todo'")).count():
+                yield 'Aceptando consentimiento de privacidad...'
+                await button.first.click()
+                consent_accepted = True
+
+            yield 'Rebuscando coordenadas en la página...'
+            while '@' not in page.url:
+                await page.wait_for_event('framenavigated')
+
+            await page.wait_for_load_state('domcontentloaded')
+            if consent_accepted:
+                await browser_pool.save_storage_state(page.context)
+            if await page.query_selector("'Google Maps no encuentra'"):
                 yield
                 return
+        except playwright.async_api.TimeoutError:
+            yield
+            return
 
-            place_name = urllib.parse.unquote(place_name.replace('+', ' ').strip())
-
-            yield Place(place_name, latitude, longitude)
+        yield _create_place_by_url(page.url)
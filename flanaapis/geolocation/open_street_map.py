@@ -1,8 +1,24 @@
 from typing import overload
 
 import flanautils
+
+import flanaapis.geolocation.functions
+from flanaapis.cache import TTLCache
+from flanaapis.geolocation import place_cache
+from flanaapis.governor import RequestGovernor
 from flanaapis.geolocation.models import Place
 
+BASE_ENDPOINT = 'https://nominatim.openstreetmap.org'
+LANGUAGE = 'es-ES,es,en'
+REVERSE_CACHE_GRID_SIZE = 0.001
+REVERSE_CACHE_MAX_SIZE = 4096
+REVERSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+reverse_cache = TTLCache(REVERSE_CACHE_MAX_SIZE, REVERSE_CACHE_TTL, copy_values=True)
+nominatim_governor = RequestGovernor(environment_variable='FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND')
+
+_MISSING = object()
+
 
 @overload
 async def find_place(place_query: str, near_to_place: Place = None) -> Place | None:
@@ -37,33 +53,67 @@ async def find_place(place_query: str, near_to_latitude: float = None, near_to_l
         return next(iter(await find_places(place_query)), None)
 
 
+def _create_place_by_data(place_data: dict) -> Place:
+    place = Place(place_data.get('display_name'), place_data.get('lat'), place_data.get('lon'))
+
+    if 'address' in place_data:
+        place.country = place_data['address'].get('country')
+        place.country_code = place_data['address'].get('country_code')
+        place.state = place_data['address'].get('state')
+        place.state_district = place_data['address'].get('state_district')
+        place.province = place_data['address'].get('province')
+        place.county = place_data['address'].get('county')
+        place.city = place_data['address'].get('city')
+        place.town = place_data['address'].get('town')
+        place.borough = place_data['address'].get('borough')
+        place.postcode = place_data['address'].get('postcode')
+        place.neighbourhood = place_data['address'].get('neighbourhood')
+        place.road = place_data['address'].get('road')
+        place.number = place_data['address'].get('house_number')
+        place.amenity = place_data['address'].get('amenity')
+
+    return place
+
+
+async def _request_places(place_query: str) -> list[Place]:
+    places_data: list[dict] = await nominatim_governor.request(
+        ('search', place_cache.normalize_query(place_query)),
+        lambda: flanautils.get_request(f'{BASE_ENDPOINT}/search',
+                                       {'q': place_query,
+                                        'format': 'jsonv2',
+                                        'accept-language': LANGUAGE,
+                                        'addressdetails': True})
+    )
+
+    return [_create_place_by_data(place_data) for place_data in places_data]
+
+
 async def find_places(place_query: str) -> list[Place]:
-    places_data: list[dict] = await flanautils.get_request(f'https://nominatim.openstreetmap.org/search',
-                                                           {'q': place_query,
-                                                            'format': 'jsonv2',
-                                                            'accept-language': 'es-ES,es,en',
-                                                            'addressdetails': True})
-
-    places = []
-    for place_data in places_data:
-        place = Place(place_data.get('display_name'), place_data.get('lat'), place_data.get('lon'))
-
-        if 'address' in place_data:
-            place.country = place_data['address'].get('country')
-            place.country_code = place_data['address'].get('country_code')
-            place.state = place_data['address'].get('state')
-            place.state_district = place_data['address'].get('state_district')
-            place.province = place_data['address'].get('province')
-            place.county = place_data['address'].get('county')
-            place.city = place_data['address'].get('city')
-            place.town = place_data['address'].get('town')
-            place.borough = place_data['address'].get('borough')
-            place.postcode = place_data['address'].get('postcode')
-            place.neighbourhood = place_data['address'].get('neighbourhood')
-            place.road = place_data['address'].get('road')
-            place.number = place_data['address'].get('house_number')
-            place.amenity = place_data['address'].get('amenity')
-
-        places.append(place)
-
-    return places
+    return await place_cache.get_or_find(place_cache.create_key('places', place_query), lambda: _request_places(place_query))
+
+
+async def reverse_find_place(latitude: float, longitude: float, grid_size: float = REVERSE_CACHE_GRID_SIZE) -> Place | None:
+    """
+    Finds the address of the coordinates. The coordinates are snapped to a grid of grid_size degrees (~100 m by default)
+    and the result is cached by grid node, so the close coordinates share the same request. The requests to Nominatim
+    go through nominatim_governor (one per second by default).
+    """
+
+    latitude, longitude = flanaapis.geolocation.functions.quantize_coordinates(latitude, longitude, grid_size)
+    if (place := reverse_cache.get((latitude, longitude, grid_size), _MISSING)) is not _MISSING:
+        return place
+
+    place_data: dict = await nominatim_governor.request(
+        ('reverse', latitude, longitude),
+        lambda: flanautils.get_request(f'{BASE_ENDPOINT}/reverse',
+                                       {'lat': latitude,
+                                        'lon': longitude,
+                                        'format': 'jsonv2',
+                                        'accept-language': LANGUAGE,
+                                        'addressdetails': True})
+    )
+
+    place = None if not place_data or 'error' in place_data else _create_place_by_data(place_data)
+    reverse_cache.set((latitude, longitude, grid_size), place, None if place else place_cache.NOT_FOUND_TTL)
+
+    return place
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Awaitable, Callable, TypeVar
+
+from flanaapis.cache import TTLCache
+from flanaapis.geolocation.models import Place
+
+DATABASE_PATH = 'place_cache.sqlite3'
+MEMORY_CACHE_MAX_SIZE = 2048
+PLACE_TTL = 90 * 24 * 60 * 60
+NOT_FOUND_TTL = 15 * 60
+
+T = TypeVar('T')
+
+memory_cache = TTLCache(MEMORY_CACHE_MAX_SIZE, PLACE_TTL, copy_values=True)
+
+_MISSING = object()
+_initialized_paths: set[str] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    path = os.environ.get('FLANAAPIS_PLACE_CACHE_PATH', DATABASE_PATH)
+    connection = sqlite3.connect(path)
+    if path not in _initialized_paths:
+        connection.execute('CREATE TABLE IF NOT EXISTS place_cache (key TEXT PRIMARY KEY, data TEXT NOT NULL, expiration REAL NOT NULL)')
+        connection.execute('DELETE FROM place_cache WHERE expiration <= ?', (time.time(),))
+        connection.commit()
+        _initialized_paths.add(path)
+
+    return connection
+
+
+def _decode(data: dict | list[dict] | None) -> Place | list[Place] | None:
+    match data:
+        case dict():
+            return Place(**{k.lstrip('_'): v for k, v in data.items()})
+        case list():
+            return [_decode(place_data) for place_data in data]
+
+
+def _encode(value: Place | list[Place] | None) -> dict | list[dict] | None:
+    match value:
+        case Place():
+            return vars(value).copy()
+        case list():
+            return [_encode(place) for place in value]
+
+
+def _get(key: str) -> tuple[dict | list[dict] | None, float] | None:
+    with _connect() as connection:
+        row = connection.execute('SELECT data, expiration FROM place_cache WHERE key = ? AND expiration > ?', (key, time.time())).fetchone()
+    connection.close()
+
+    return (json.loads(row[0]), row[1]) if row else None
+
+
+def _set(key: str, data: dict | list[dict] | None, expiration: float):
+    with _connect() as connection:
+        connection.execute('INSERT OR REPLACE INTO place_cache VALUES (?, ?, ?)', (key, json.dumps(data), expiration))
+    connection.close()
+
+
+def create_key(kind: str, place_query: str) -> str:
+    return f'{kind}:{normalize_query(place_query)}'
+
+
+async def get_or_find(key: str, find: Callable[[], Awaitable[T]]) -> T:
+    """
+    Returns the cached result of the key or the result of find, which is stored in memory and in a SQLite database
+    (FLANAAPIS_PLACE_CACHE_PATH environment variable, place_cache.sqlite3 by default) for PLACE_TTL seconds, or
+    NOT_FOUND_TTL seconds if nothing was found.
+    """
+
+    if (value := memory_cache.get(key, _MISSING)) is not _MISSING:
+        return value
+
+    if stored := await asyncio.to_thread(_get, key):
+        data, expiration = stored
+        value = _decode(data)
+        memory_cache.set(key, value, expiration - time.time())
+        return value
+
+    value = await find()
+    ttl = PLACE_TTL if value else NOT_FOUND_TTL
+    memory_cache.set(key, value, ttl)
+    await asyncio.to_thread(_set, key, _encode(value), time.time() + ttl)
+
+    return value
+
+
+def normalize_query(place_query: str) -> str:
+    """Removes the accents, the case and the extra whitespace of the query."""
+
+    place_query = ''.join(character for character in unicodedata.normalize('NFKD', place_query) if not unicodedata.combining(character))
+    place_query = re.sub(r'\s*,\s*', ', ', ' '.join(place_query.split()))
+
+    return place_query.casefold().strip(' ,')
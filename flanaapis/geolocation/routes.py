@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from flanaapis import governor
 from flanaapis.geolocation import functions, open_street_map
 
 router = APIRouter()
@@ -26,6 +27,7 @@ class PlaceOutput(BaseModel):
 
 @router.get("/place", response_model=PlaceOutput, response_model_exclude_defaults=True, response_model_exclude_unset=True)
 async def find_place(query: str, near_to_latitude: float = None, near_to_longitude: float = None, fast: bool = False):
+    governor.request_priority.set(governor.Priority.INTERACTIVE)
     match near_to_latitude, near_to_longitude:
         case [float(), _] | [_, float()]:
             return (await open_street_map.find_place(query, near_to_latitude, near_to_longitude)).to_dict()
@@ -38,9 +40,11 @@ async def find_place(query: str, near_to_latitude: float = None, near_to_longitu
 # noinspection PyUnusedLocal
 @router.get("/places", response_model=list[PlaceOutput], response_model_exclude_defaults=True, response_model_exclude_unset=True)
 async def find_places(query: str, fast: bool = False):
+    governor.request_priority.set(governor.Priority.INTERACTIVE)
     return [place.to_dict() for place in await open_street_map.find_places(query)]
 
 
 @router.get("/timezone")
 async def find_places(query: str, fast: bool = False):
+    governor.request_priority.set(governor.Priority.INTERACTIVE)
     return await functions.find_timezone(query, fast) or {}
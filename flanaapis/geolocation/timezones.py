@@ -0,0 +1,156 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+import asyncio
+import datetime
+import logging
+import pathlib
+import threading
+import zoneinfo
+
+try:
+    from timezonefinder import TimezoneFinder
+except ImportError as e:  # pragma: no cover
+    TimezoneFinder = None
+    logging.getLogger(__name__).warning(f'timezonefinder could not be imported ({e}), the timezones will be requested to TimezoneDB')
+
+TRANSITION_SEARCH_DAYS = 366
+
+_timezone_finder: TimezoneFinder | None = None
+_timezone_finder_lock = threading.Lock()
+_zone_countries: dict[str, tuple[str, str]] | None = None
+_zone_transitions: dict[str, tuple[int, int, int | None, int | None]] = {}  # zone name -> (valid from, valid until, zone start, zone end)
+
+
+def _find_transition(zone: zoneinfo.ZoneInfo, timestamp: int, forward: bool) -> int | None:
+    """Returns the timestamp of the first second with a different utc offset or abbreviation before or after timestamp."""
+
+    def zone_state(timestamp_: int) -> tuple[datetime.timedelta, str]:
+        date_time = datetime.datetime.fromtimestamp(timestamp_, zone)
+        return date_time.utcoffset(), date_time.tzname()
+
+    step = 86400 if forward else -86400
+    state = zone_state(timestamp)
+    for days in range(1, TRANSITION_SEARCH_DAYS + 1):
+        if zone_state(other_timestamp := timestamp + step * days) != state:
+            break
+    else:
+        return
+
+    same_timestamp = other_timestamp - step
+    while abs(other_timestamp - same_timestamp) > 1:
+        middle_timestamp = (same_timestamp + other_timestamp) // 2
+        if zone_state(middle_timestamp) == state:
+            same_timestamp = middle_timestamp
+        else:
+            other_timestamp = middle_timestamp
+
+    return other_timestamp if forward else same_timestamp
+
+
+def _get_zone_transitions(zone: zoneinfo.ZoneInfo, timestamp: int) -> tuple[int | None, int | None]:
+    """Returns the timestamps of the transitions before and after timestamp, cached until they are no longer valid."""
+
+    try:
+        valid_from, valid_until, zone_start, zone_end = _zone_transitions[zone.key]
+    except KeyError:
+        pass
+    else:
+        if valid_from <= timestamp < valid_until:
+            return zone_start, zone_end
+
+    zone_start = _find_transition(zone, timestamp, forward=False)
+    zone_end = _find_transition(zone, timestamp, forward=True)
+    _zone_transitions[zone.key] = (
+        timestamp if zone_start is None else zone_start,
+        timestamp + 86400 if zone_end is None else zone_end,
+        zone_start,
+        zone_end
+    )
+
+    return zone_start, zone_end
+
+
+def _load_zone_countries() -> dict[str, tuple[str, str]]:
+    """Returns a dict zone name -> (country code, country name) read from the zone.tab of the system tz database."""
+
+    zone_countries = {}
+    for tz_path in map(pathlib.Path, zoneinfo.TZPATH):
+        try:
+            country_names = {}
+            for line in (tz_path / 'iso3166.tab').read_text(encoding='utf-8').splitlines():
+                if not line.startswith('#'):
+                    country_code, country_name = line.split('\t')[:2]
+                    country_names[country_code] = country_name
+            for line in (tz_path / 'zone.tab').read_text(encoding='utf-8').splitlines():
+                if not line.startswith('#'):
+                    country_code, _, zone_name, *_ = line.split('\t')
+                    zone_countries[zone_name] = (country_code, country_names.get(country_code, ''))
+        except (OSError, ValueError):
+            continue
+        break
+
+    return zone_countries
+
+
+def _load_timezone_finder() -> TimezoneFinder:
+    global _timezone_finder
+
+    with _timezone_finder_lock:
+        if not _timezone_finder:
+            _timezone_finder = TimezoneFinder()
+
+    return _timezone_finder
+
+
+def create_timezone_data(zone_name: str, date_time: datetime.datetime = None) -> dict:
+    """Builds the TimezoneDB get-time-zone response for the IANA zone at the given moment (now by default)."""
+
+    global _zone_countries
+
+    if _zone_countries is None:
+        _zone_countries = _load_zone_countries()
+
+    zone = zoneinfo.ZoneInfo(zone_name)
+    date_time = (date_time or datetime.datetime.now(datetime.timezone.utc)).astimezone(zone)
+    timestamp = int(date_time.timestamp())
+    gmt_offset = int(date_time.utcoffset().total_seconds())
+    zone_start, zone_end = _get_zone_transitions(zone, timestamp)
+    country_code, country_name = _zone_countries.get(zone_name, ('', ''))
+
+    return {
+        'status': 'OK',
+        'message': '',
+        'countryCode': country_code,
+        'countryName': country_name,
+        'regionName': '',
+        'cityName': '',
+        'zoneName': zone_name,
+        'abbreviation': date_time.tzname(),
+        'gmtOffset': gmt_offset,
+        'dst': '1' if date_time.dst() else '0',
+        'zoneStart': zone_start,
+        'zoneEnd': None if zone_end is None else zone_end - 1,
+        'nextAbbreviation': None if zone_end is None else datetime.datetime.fromtimestamp(zone_end, zone).tzname(),
+        'timestamp': timestamp + gmt_offset,
+        'formatted': date_time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+async def find_timezone(latitude: float, longitude: float) -> dict | None:
+    """
+    Finds the timezone of the coordinates offline with the spatially indexed timezone boundaries bundled with
+    timezonefinder, which are loaded lazily on the first call and read from memory-mapped files. Returns the same dict
+    as TimezoneDB or None if timezonefinder is not installed or the coordinates are not in any timezone.
+    """
+
+    if not TimezoneFinder:
+        return
+
+    timezone_finder = _timezone_finder or await asyncio.to_thread(_load_timezone_finder)
+    if not (zone_name := timezone_finder.timezone_at(lat=latitude, lng=longitude)):
+        return
+
+    try:
+        return create_timezone_data(zone_name)
+    except zoneinfo.ZoneInfoNotFoundError:
+        return
@@ -0,0 +1,210 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+import asyncio
+import contextvars
+import enum
+import functools
+import itertools
+import os
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Hashable, TypeVar
+
+from flanaapis.exceptions import ResponseError
+
+BACKOFF_TIME = 30
+BURST = 1
+MAX_RETRIES = 1
+REQUESTS_PER_SECOND = 1
+
+T = TypeVar('T')
+
+
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+request_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar('request_priority', default=Priority.DEFAULT)
+
+
+class _Request:
+    def __init__(self, key: Hashable, make_request: Callable[[], Awaitable], future: asyncio.Future, priority: Priority, sequence: int):
+        self.key = key
+        self.make_request = make_request
+        self.future = future
+        self.priority = priority
+        self.sequence = sequence
+        self.retries = 0
+        self.sent = False
+
+
+class RequestGovernor:
+    """
+    Schedules the requests to an api that allows requests_per_second requests per second (the environment_variable
+    environment variable or REQUESTS_PER_SECOND by default).
+
+    The requests wait in a queue and are sent with a token bucket of burst tokens, the most important first: the
+    priority of a request is the request_priority of its context by default, so a route can mark its requests as
+    interactive and a background task as background. The concurrent requests with the same key share the same upstream
+    call. When the api answers 429 (Too Many Requests) nothing is sent for backoff_time seconds and the request is
+    queued again up to max_retries times.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = None,
+        environment_variable: str = None,
+        burst=BURST,
+        backoff_time: float = BACKOFF_TIME,
+        max_retries=MAX_RETRIES
+    ):
+        self._requests_per_second = requests_per_second
+        self.environment_variable = environment_variable
+        self.burst = burst
+        self.backoff_time = backoff_time
+        self.max_retries = max_retries
+        self._tokens = float(burst)
+        self._last_token_update = time.monotonic()
+        self._paused_until = 0.0
+        self._sequence = itertools.count()
+        self._in_flight: dict[Hashable, _Request] = {}
+        self._queue: asyncio.PriorityQueue[tuple[int, int, _Request]] | None = None
+        self._send_tasks: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def requests_per_second(self) -> float:
+        if self._requests_per_second is None:
+            return float(os.environ.get(self.environment_variable, REQUESTS_PER_SECOND)) if self.environment_variable else REQUESTS_PER_SECOND
+
+        return self._requests_per_second
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+
+        # the queue and the futures belong to the loop that created them
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._in_flight.clear()
+        self._send_tasks.clear()
+        self._task = loop.create_task(self._run())
+
+    def _forget_request(self, request: _Request, _future: asyncio.Future):
+        if self._in_flight.get(request.key) is request:
+            del self._in_flight[request.key]
+        if not request.future.cancelled():
+            request.future.exception()  # the callers could have been cancelled
+
+    def _is_pending(self, priority: int, request: _Request) -> bool:
+        # a request is queued again with its new priority when a more important caller joins it
+        return not request.sent and not request.future.done() and priority == request.priority
+
+    def _queue_request(self, request: _Request):
+        self._queue.put_nowait((request.priority, request.sequence, request))
+
+    async def _run(self):
+        while True:
+            while True:
+                priority, sequence, request = await self._queue.get()
+                if self._is_pending(priority, request):
+                    break
+            self._queue.put_nowait((priority, sequence, request))  # the most important request is taken after the wait
+
+            await self._wait_for_token()
+
+            while not self._queue.empty():
+                priority, _, request = self._queue.get_nowait()
+                if self._is_pending(priority, request):
+                    request.sent = True
+                    task = asyncio.create_task(self._send(request))
+                    self._send_tasks.add(task)
+                    task.add_done_callback(self._send_tasks.discard)
+                    break
+            else:
+                self._tokens += 1
+
+    async def _send(self, request: _Request):
+        try:
+            result = await request.make_request()
+        except ResponseError as e:
+            if not str(e).startswith('429'):
+                request.future.set_exception(e)
+            elif request.retries < self.max_retries:
+                self._pause()
+                request.retries += 1
+                request.sent = False
+                self._queue_request(request)
+            else:
+                self._pause()
+                request.future.set_exception(e)
+        except asyncio.CancelledError:
+            request.future.cancel()
+            raise
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(result)
+
+    def _pause(self):
+        self._paused_until = time.monotonic() + self.backoff_time
+        self._tokens = 0
+
+    async def _wait_for_token(self):
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                self._last_token_update = self._paused_until
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._tokens = min(self.burst, self._tokens + (now - self._last_token_update) * self.requests_per_second)
+            self._last_token_update = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.requests_per_second)
+
+    async def request(self, key: Hashable, make_request: Callable[[], Awaitable[T]], priority: Priority = None) -> T:
+        """
+        Returns the result of make_request when its turn comes. If a request with the same key is already queued or
+        running the result of that one is returned.
+        """
+
+        self._ensure_started()
+        if priority is None:
+            priority = request_priority.get()
+
+        if not (request := self._in_flight.get(key)):
+            request = _Request(key, make_request, self._loop.create_future(), priority, next(self._sequence))
+            request.future.add_done_callback(functools.partial(self._forget_request, request))
+            self._in_flight[key] = request
+            self._queue_request(request)
+        elif not request.sent and priority < request.priority:
+            request.priority = priority
+            self._queue_request(request)
+
+        return await asyncio.shield(request.future)
+
+    async def stop(self):
+        tasks = [task for task in (self._task, *self._send_tasks) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for request in tuple(self._in_flight.values()):
+            request.future.cancel()
+        self._task = None
+        self._queue = None
+        self._send_tasks.clear()
+
+
+def create_task(coroutine: Coroutine[Any, Any, T], priority: Priority) -> asyncio.Task[T]:
+    """Creates a task whose requests have the given request_priority."""
+
+    context = contextvars.copy_context()
+    context.run(request_priority.set, priority)
+    return context.run(asyncio.create_task, coroutine)
@@ -1,3 +1,4 @@
+import contextlib
 import os
 import sys
 
@@ -5,18 +6,35 @@ import flanautils
 import uvicorn
 from fastapi import FastAPI
 
+import flanaapis.geolocation.google_maps
+import flanaapis.geolocation.open_street_map
 import flanaapis.geolocation.routes
 import flanaapis.scraping.routes
+import flanaapis.sessions
+import flanaapis.weather.refresher
 import flanaapis.weather.routes
 
 os.environ |= flanautils.find_environment_variables('../.env')
 
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: FastAPI):
+    await flanaapis.sessions.start()
+    flanaapis.weather.refresher.weather_refresher.start()
+    await flanaapis.geolocation.google_maps.browser_pool.start()
+    yield
+    await flanaapis.geolocation.google_maps.browser_pool.stop()
+    await flanaapis.weather.refresher.weather_refresher.stop()
+    await flanaapis.geolocation.open_street_map.nominatim_governor.stop()
+    await flanaapis.sessions.stop()
+
+
 sub_app = FastAPI()
 sub_app.include_router(flanaapis.geolocation.routes.router)
 sub_app.include_router(flanaapis.scraping.routes.router)
 sub_app.include_router(flanaapis.weather.routes.router)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.mount('/flanaapis', sub_app)
 
 if __name__ == '__main__':
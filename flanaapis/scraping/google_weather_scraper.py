@@ -1,6 +1,9 @@
+import asyncio
 import json
 import re
+from html import unescape
 
+import flanautils
 import requests
 from bs4 import BeautifulSoup as bs
 
@@ -14,6 +17,20 @@ HEADER = {
     "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0",
     "Language": "es-ES,es;q=0.5",
 }
+WIND_PATTERN = re.compile(
+    r'"(\d+ [\w\/]+) \w+ (\w+) (\w+-*\w*,* [0-9:]+\s*\w*)" class="wob_t" style="display:inline;text-align:right">\d+ [\w\/]+<\/span><span aria-label="\d+ [\w\/]+ \w+-*\w*,* [0-9:]+\s*\w*" class="wob_t" style="display:none;text-align:right">\d+ [\w\/]+<\/span><\/div><div style="[\w-]+:\d+"><\/div><img alt="\d+ [\w\/]+ \w+ \w+" aria-hidden="true" src="\/\/ssl.gstatic.com\/m\/images\/weather\/\w+.\w+" style="transform-origin:\d+% \d+%;transform:rotate\((\d+)\w+\)'
+)
+FORECAST_PATTERN = re.compile(
+    r'\bid="(?P<wob_id>wob_(?:loc|tm|dts|dc|pp|hm|ws))"[^>]*>(?P<wob_text>[^<]*)'
+    r'|\bclass="[^"]*\bwob_df\b[^"]*"[^>]*>.*?<div[^>]*?\baria-label="(?P<day_name>[^"]*)".*?<img[^>]*?\balt="(?P<day_weather>[^"]*)"'
+    + "".join(
+        rf'.*?<span[^>]*?\bclass="[^"]*\bwob_t\b[^"]*"[^>]*>(?P<day_temp_{i}>[^<]*)<'
+        for i in range(4)
+    )
+    + rf"|(?P<wind>{WIND_PATTERN.pattern})"
+    r"|pmc='(?P<pmc>(?-s:{.*?}))'",
+    re.DOTALL,
+)
 
 
 def mph_to_kmph(mph):
@@ -61,6 +78,47 @@ def _get_soup(header, url):
         return None
 
 
+def _convert_weather_now(data, output_units):
+    """Autodetects the input units of the current weather conditions and
+       converts the "Temperature" and "Wind Speed" to the output units.
+
+    Args:
+        data (dict): The current weather conditions with the "temp" as a float
+                     and the "wind" as the text shown by Google.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                             "c" for Celsius or "f" for Farenheit and a "speed"
+                             key, which can be "km/h" for Kilometers Per Hour
+                             or "mph" for Miles Per Hour.
+
+    Returns:
+        tuple: The autodetected input units and the converted data.
+    """
+
+    # Autodetect and convert "Temperature" and "Wind Speed" units
+    if "km/h" in data["wind"]:
+        data["wind"] = float(data["wind"].replace("km/h", ""))
+
+        if output_units["speed"] == "mph":
+            data["wind"] = kmph_to_mph(data["wind"])
+
+        if output_units["temp"] == "f":
+            data["temp"] = c_to_f(data["temp"])
+
+        input_units = "metric"
+    else:
+        data["wind"] = float(data["wind"].replace("mph", ""))
+
+        if output_units["speed"] == "kph":
+            data["wind"] = mph_to_kmph(data["wind"])
+
+        if output_units["temp"] == "c":
+            data["temp"] = f_to_c(data["temp"])
+
+        input_units = "imperial"
+
+    return input_units, data
+
+
 def _get_weather_now(soup, output_units):
     """Gets the current weather conditions.
 
@@ -95,29 +153,44 @@ def _get_weather_now(soup, output_units):
     )
     data["wind"] = soup.find("span", attrs={"id": "wob_ws"}).text
 
-    # Autodetect and convert "Temperature" and "Wind Speed" units
-    if "km/h" in data["wind"]:
-        data["wind"] = float(data["wind"].replace("km/h", ""))
+    input_units, data = _convert_weather_now(data, output_units)
 
-        if output_units["speed"] == "mph":
-            data["wind"] = kmph_to_mph(data["wind"])
+    return input_units, region, data
 
-        if output_units["temp"] == "f":
-            data["temp"] = c_to_f(data["temp"])
 
-        input_units = "metric"
-    else:
-        data["wind"] = float(data["wind"].replace("mph", ""))
+def _convert_day_temperatures(temps, input_units, output_units):
+    """Chooses the maximum and minimum temperatures of a day in the output
+       units from the four temperatures shown by Google.
 
-        if output_units["speed"] == "kph":
-            data["wind"] = mph_to_kmph(data["wind"])
+    Args:
+        temps (list): The texts of the four "wob_t" spans of the day.
+        input_units (string): The autodetected input units, they can be either
+                              "metric" or "imperial".
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                             "c" for Celsius or "f" for Farenheit and a "speed"
+                             key, which can be "km/h" for Kilometers Per Hour
+                             or "mph" for Miles Per Hour.
 
+    Returns:
+        tuple: The maximum and the minimum temperatures.
+    """
+    # Get the right data for the chosen output units
+    if input_units == "metric":
         if output_units["temp"] == "c":
-            data["temp"] = f_to_c(data["temp"])
-
-        input_units = "imperial"
+            max_temp = float(temps[0])
+            min_temp = float(temps[2])
+        else:
+            max_temp = float(temps[1])
+            min_temp = float(temps[3])
+    else:
+        if output_units["temp"] == "c":
+            max_temp = float(temps[1])
+            min_temp = float(temps[3])
+        else:
+            max_temp = float(temps[0])
+            min_temp = float(temps[2])
 
-    return input_units, region, data
+    return max_temp, min_temp
 
 
 def _get_next_days(soup, input_units, output_units):
@@ -144,26 +217,14 @@ def _get_next_days(soup, input_units, output_units):
     days = soup.find("div", attrs={"id": "wob_dp"})
 
     # Iterate over every single day
-    for day in days.findAll("div", attrs={"class": "wob_df"}):
+    for day in days.find_all("div", attrs={"class": "wob_df"}):
         day_name = day.find("div").attrs["aria-label"]
         weather = day.find("img").attrs["alt"]
-        temp = day.findAll("span", {"class": "wob_t"})
+        temp = day.find_all("span", {"class": "wob_t"})
 
-        # Get the right data for the chosen output units
-        if input_units == "metric":
-            if output_units["temp"] == "c":
-                max_temp = float(temp[0].text)
-                min_temp = float(temp[2].text)
-            else:
-                max_temp = float(temp[1].text)
-                min_temp = float(temp[3].text)
-        else:
-            if output_units["temp"] == "c":
-                max_temp = float(temp[1].text)
-                min_temp = float(temp[3].text)
-            else:
-                max_temp = float(temp[0].text)
-                min_temp = float(temp[2].text)
+        max_temp, min_temp = _convert_day_temperatures(
+            [span.text for span in temp], input_units, output_units
+        )
 
         # Append the values to the output list
         data.append(
@@ -178,31 +239,20 @@ def _get_next_days(soup, input_units, output_units):
     return data
 
 
-def _get_wind(soup, output_units):
-    """Wind Direction and Wind Bearing must be retrieved in a "special" manner,
-       Google provides a 15 day forecast with 3 hour intervals containing Wind
-       Speed, Wind Direction, Datetime and Wind Bearing. This function extracts
-       this data.
+def _convert_wind(data, output_units):
+    """Post processes the wind data extracted with WIND_PATTERN.
 
     Args:
-        soup (bs4.BeautifulSoup): The BeautifoulSoup object
+        data (list): The tuples of wind speed, wind direction, datetime and
+                     wind bearing found in the page.
         output_units (dict): A dictionary contatining "temp" key, which can be
                              "c" for Celsius or "f" for Farenheit and a "speed"
                              key, which can be "km/h" for Kilometers Per Hour
                              or "mph" for Miles Per Hour.
 
     Returns:
-        list: A list containing one entry for every 3 hour period, each entry
-              is another list, composed of wind speed, wind direction,
-              datetime and wind bearing.
+        list: The same list returned by _get_wind.
     """
-    # Extracting the data from the "soup"
-    wind = str(soup.find("div", attrs={"id": "wob_wg", "class": "wob_noe"}))
-    data = re.findall(
-        r'"(\d+ [\w\/]+) \w+ (\w+) (\w+-*\w*,* [0-9:]+\s*\w*)" class="wob_t" style="display:inline;text-align:right">\d+ [\w\/]+<\/span><span aria-label="\d+ [\w\/]+ \w+-*\w*,* [0-9:]+\s*\w*" class="wob_t" style="display:none;text-align:right">\d+ [\w\/]+<\/span><\/div><div style="[\w-]+:\d+"><\/div><img alt="\d+ [\w\/]+ \w+ \w+" aria-hidden="true" src="\/\/ssl.gstatic.com\/m\/images\/weather\/\w+.\w+" style="transform-origin:\d+% \d+%;transform:rotate\((\d+)\w+\)',
-        wind,
-    )
-
     # Extracting the input values units
     if "km/h" in data[0][0]:
         input_units = "metric"
@@ -232,6 +282,31 @@ def _get_wind(soup, output_units):
     return data
 
 
+def _get_wind(soup, output_units):
+    """Wind Direction and Wind Bearing must be retrieved in a "special" manner,
+       Google provides a 15 day forecast with 3 hour intervals containing Wind
+       Speed, Wind Direction, Datetime and Wind Bearing. This function extracts
+       this data.
+
+    Args:
+        soup (bs4.BeautifulSoup): The BeautifoulSoup object
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                             "c" for Celsius or "f" for Farenheit and a "speed"
+                             key, which can be "km/h" for Kilometers Per Hour
+                             or "mph" for Miles Per Hour.
+
+    Returns:
+        list: A list containing one entry for every 3 hour period, each entry
+              is another list, composed of wind speed, wind direction,
+              datetime and wind bearing.
+    """
+    # Extracting the data from the "soup"
+    wind = str(soup.find("div", attrs={"id": "wob_wg", "class": "wob_noe"}))
+    data = re.findall(WIND_PATTERN, wind)
+
+    return _convert_wind(data, output_units)
+
+
 def _get_hourly_forecast(header, url, output_units):
     """This functions extracts hourly forecast data for the next 15 days.
 
@@ -253,8 +328,43 @@ def _get_hourly_forecast(header, url, output_units):
 
     # Request and extract the data from the url
     text = requests.get(url, headers=header).text
-    data_in = re.search(r"pmc='({.*?})'", text).group(1)
-    data_in = json.loads(data_in.replace(r"\x22", '"').replace(r'\\"', r"\""))
+
+    return _get_hourly_forecast_by_text(text, output_units)
+
+
+def _get_hourly_forecast_by_text(text, output_units):
+    """Extracts the hourly forecast data for the next 15 days from the text of
+       an already downloaded page.
+
+    Args:
+        text (string): The html of the Google weather page.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+
+    Returns:
+        list: The same list returned by _get_hourly_forecast.
+    """
+    return _parse_hourly_forecast(
+        re.search(r"pmc='({.*?})'", text).group(1), output_units
+    )
+
+
+def _parse_hourly_forecast(pmc, output_units):
+    """Parses the hourly forecast data from the "pmc" JSON blob of the page.
+
+    Args:
+        pmc (string): The escaped JSON assigned to pmc in the page.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+
+    Returns:
+        list: The same list returned by _get_hourly_forecast.
+    """
+    data_in = json.loads(pmc.replace(r"\x22", '"').replace(r'\\"', r"\""))
 
     # Create a list to store the output data
     data_out = list()
@@ -288,6 +398,137 @@ def _get_hourly_forecast(header, url, output_units):
     return data_out
 
 
+def _get_url(region):
+    return f"{URL}+{region.replace(' ', '+')}"
+
+
+def _extract_forecast(html, output_units):
+    """Extracts all the forecast data with a single regex scan of the raw html,
+       without building the BeautifulSoup tree of the page.
+
+    Args:
+        html (string): The html of the Google weather page.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+
+    Returns:
+        dict: The same dictionary returned by get_forecast.
+
+    Raises:
+        KeyError, IndexError, TypeError, ValueError: If some of the data is not
+                                                     found in the page.
+    """
+    wind_group = FORECAST_PATTERN.groupindex["wind"]
+
+    texts = dict()
+    days = list()
+    wind = list()
+    pmc = None
+
+    for match in FORECAST_PATTERN.finditer(html):
+        if match["wob_id"]:
+            texts.setdefault(match["wob_id"], unescape(match["wob_text"]))
+        elif match["day_name"] is not None:
+            days.append(match)
+        elif match["wind"]:
+            wind.append(match.group(*range(wind_group + 1, wind_group + 5)))
+        elif pmc is None:
+            pmc = match["pmc"]
+
+    if not days:
+        raise ValueError("next days not found")
+
+    # Create a dictionary to store the output data
+    data = dict()
+
+    data["region"] = texts["wob_loc"]
+    input_units, data["weather_now"] = _convert_weather_now(
+        {
+            "temp": float(texts["wob_tm"]),
+            "datetime": texts["wob_dts"],
+            "weather": texts["wob_dc"],
+            "precip_prob": float(texts["wob_pp"].replace("%", "")),
+            "humidity": float(texts["wob_hm"].replace("%", "")),
+            "wind": texts["wob_ws"],
+        },
+        output_units,
+    )
+
+    data["next_days"] = list()
+    for day in days:
+        max_temp, min_temp = _convert_day_temperatures(
+            [unescape(day[f"day_temp_{i}"]) for i in range(4)],
+            input_units,
+            output_units,
+        )
+        data["next_days"].append(
+            {
+                "day": unescape(day["day_name"]),
+                "weather": unescape(day["day_weather"]),
+                "max_temp": max_temp,
+                "min_temp": min_temp,
+            }
+        )
+
+    data["wind"] = _convert_wind(wind, output_units)
+    data["hourly_forecast"] = _parse_hourly_forecast(pmc, output_units)
+
+    return data
+
+
+def _get_forecast_by_soup(html, output_units):
+    """Extracts all the forecast data from the BeautifulSoup tree of the html
+       of the Google weather page.
+
+    Args:
+        html (string): The html of the Google weather page.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+
+    Returns:
+        dict: The same dictionary returned by get_forecast.
+    """
+    soup = bs(html, "html.parser")
+
+    # Create a dictionary to store the output data
+    data = dict()
+
+    input_units, data["region"], data["weather_now"] = _get_weather_now(
+        soup, output_units
+    )
+    data["next_days"] = _get_next_days(soup, input_units, output_units)
+    data["wind"] = _get_wind(soup, output_units)
+    data["hourly_forecast"] = _get_hourly_forecast_by_text(html, output_units)
+
+    return data
+
+
+def _get_forecast_by_html(html, output_units):
+    """Extracts all the forecast data from the html of the Google weather page,
+       so the page only has to be downloaded once. The fast regex extractor is
+       tried first and the BeautifulSoup tree is only built if the markup is
+       not the expected.
+
+    Args:
+        html (string): The html of the Google weather page.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+
+    Returns:
+        dict: The same dictionary returned by get_forecast.
+    """
+    try:
+        return _extract_forecast(html, output_units)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return _get_forecast_by_soup(html, output_units)
+
+
 def get_forecast(region, output_units={"temp": "c", "speed": "km/h"}):
     """This is the wrapper that calls the other functions and joins the data into
        one output.
@@ -306,7 +547,7 @@ def get_forecast(region, output_units={"temp": "c", "speed": "km/h"}):
               functions
     """
     # Build url and get the "soup" from it
-    url = f"{URL}+{region.replace(' ', '+')}"
+    url = _get_url(region)
     soup = _get_soup(HEADER, url)
 
     # Create a dictionary to store the output data
@@ -323,3 +564,37 @@ def get_forecast(region, output_units={"temp": "c", "speed": "km/h"}):
     data["hourly_forecast"] = _get_hourly_forecast(HEADER, url, output_units)
 
     return data
+
+
+async def get_forecast_async(region, output_units={"temp": "c", "speed": "km/h"}, session=None):
+    """Asynchronous version of get_forecast. The page is downloaded only once
+       and it is parsed in a separate thread, so the event loop is not blocked.
+
+    Args:
+        region (string): The desired region to get the weather forecast.
+        output_units (dict): A dictionary contatining "temp" key, which can be
+                            "c" for Celsius or "f" for Farenheit and a "speed"
+                            key, which can be "km/h" for Kilometers Per Hour
+                            or "mph" for Miles Per Hour.
+        session (aiohttp.ClientSession): The session to be used for the request.
+                                         If it is None a new one is created.
+
+    Returns:
+        dict: The same dictionary returned by get_forecast.
+
+    Raises:
+        flanaapis.exceptions.ResponseError: If Google doesn't respond with a 200.
+    """
+    headers = {
+        "User-Agent": HEADER["User-Agent"],
+        "Accept-Language": HEADER["Language"],
+        "Content-Language": HEADER["Language"],
+    }
+    html = await flanautils.get_request(
+        requests.utils.requote_uri(_get_url(region)),
+        headers=headers,
+        session=session,
+        clean_text=False,
+    )
+
+    return await asyncio.to_thread(_get_forecast_by_html, html, output_units)
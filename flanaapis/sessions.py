@@ -0,0 +1,29 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+import aiohttp
+
+_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession | None:
+    """Returns the HTTP session shared by the routes or None if it is not open, so the callers create their own."""
+
+    if _session and not _session.closed:
+        return _session
+
+
+async def start():
+    """Opens the shared HTTP session. It has to be called inside the event loop that will use it (the app lifespan)."""
+
+    global _session
+
+    if not get_session():
+        _session = aiohttp.ClientSession()
+
+
+async def stop():
+    global _session
+
+    if _session:
+        await _session.close()
+    _session = None
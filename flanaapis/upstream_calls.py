@@ -0,0 +1,32 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+import contextlib
+import contextvars
+from typing import Iterator
+
+
+class CallCounter:
+    def __init__(self):
+        self.calls = 0
+
+
+call_counter: contextvars.ContextVar[CallCounter | None] = contextvars.ContextVar('call_counter', default=None)
+
+
+def count_call():
+    """Counts a call to an upstream api in the call_counter of the context, if there is one."""
+
+    if counter := call_counter.get():
+        counter.calls += 1
+
+
+@contextlib.contextmanager
+def counting_calls() -> Iterator[CallCounter]:
+    """Counts the upstream calls made in the block, including the ones of the tasks created in it."""
+
+    counter = CallCounter()
+    token = call_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        call_counter.reset(token)
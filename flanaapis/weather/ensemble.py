@@ -0,0 +1,123 @@
+from __future__ import annotations  # todo0 remove when it's by default
+
+__all__ = ['INSTANT_WEATHER_ATTRIBUTE_NAMES', 'DAY_WEATHER_ATTRIBUTE_NAMES', 'can_mean_day_weathers', 'mean_day_weathers']
+
+import datetime
+import operator
+from typing import Sequence
+
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+INSTANT_WEATHER_ATTRIBUTE_NAMES = ('clouds', 'dew_point', 'humidity', 'precipitation_probability', 'pressure', 'rain_volume', 'snow_volume', 'temperature', 'temperature_feel', 'uvi', 'visibility', 'wind_degrees', 'wind_gust', 'wind_speed')
+DAY_WEATHER_ATTRIBUTE_NAMES = ('sunrise', 'sunset', 'min_temperature', 'max_temperature')
+
+_get_instant_values = operator.attrgetter(*INSTANT_WEATHER_ATTRIBUTE_NAMES)
+
+
+def _weighted_mean(values: numpy.ndarray, weights: numpy.ndarray) -> numpy.ndarray:
+    """
+    Weighted mean over the first axis (providers) of values ignoring the NaNs. The weight of the missing values is
+    distributed in equal parts among the present ones like flanautils.MeanBase does with the attributes that are None.
+    """
+
+    present = ~numpy.isnan(values)
+    n_present = present.sum(axis=0)
+    present_weights = numpy.where(present, weights, 0).sum(axis=0)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        missing_weight_parts = (weights.sum(axis=0) - present_weights) / n_present
+        means = numpy.where(present, (weights + missing_weight_parts) * numpy.nan_to_num(values), 0).sum(axis=0)
+    means[n_present == 0] = numpy.nan
+
+    return means
+
+
+def can_mean_day_weathers(ratios: list[float] | None) -> bool:
+    """Returns True if numpy is installed and the ratios can be reproduced by the vectorized engine."""
+
+    return numpy is not None and (not ratios or all(ratio > 0 for ratio in ratios))
+
+
+def mean_day_weathers(providers_day_weathers: Sequence[list[DayWeather] | None], ratios: list[float] = None) -> list[DayWeather]:
+    """
+    Vectorized equivalent of merging the providers day by day with DayWeather.mean.
+
+    The forecasts are laid out as (providers x days x 24 x attributes) float arrays with NaN for the missing values and
+    the whole horizon is averaged at once. The hours of every provider are read in a single pass into one array of
+    attribute tuples that is scattered into its place. The days forecasted by only one provider are returned untouched. Requires
+    numpy and positive ratios (see can_mean_day_weathers).
+    """
+
+    providers_day_weathers = [{day_weather.date: day_weather for day_weather in day_weathers} if day_weathers else {} for day_weathers in providers_day_weathers]
+    if not (dates := sorted({date for day_weathers in providers_day_weathers for date in day_weathers})):
+        return []
+    if not ratios:
+        ratios = [1 / len(providers_day_weathers)] * len(providers_day_weathers)
+
+    # ----- arrays -----
+    days = [[day_weathers.get(date) for date in dates] for day_weathers in providers_day_weathers]
+    day_values = numpy.full((len(days), len(dates), len(DAY_WEATHER_ATTRIBUTE_NAMES)), numpy.nan)
+    instant_values = numpy.full((len(days), len(dates) * 24, len(INSTANT_WEATHER_ATTRIBUTE_NAMES)), numpy.nan)
+    for provider_index, provider_days in enumerate(days):
+        hour_indexes = []
+        hour_values = []
+        for date_index, day_weather in enumerate(provider_days):
+            if not day_weather:
+                continue
+
+            day_values[provider_index, date_index] = [
+                value.timestamp() if isinstance(value := getattr(day_weather, attribute_name), datetime.datetime) else value
+                for attribute_name in DAY_WEATHER_ATTRIBUTE_NAMES
+            ]
+            for hour, hour_slot in enumerate(day_weather.instant_weathers.hour_slots):
+                if hour_slot:
+                    hour_indexes.append(date_index * 24 + hour)
+                    hour_values.append(_get_instant_values(hour_slot[0]))
+        if hour_values:
+            instant_values[provider_index, hour_indexes] = numpy.array(hour_values, dtype=float)
+    instant_values = instant_values.reshape((len(days), len(dates), 24, len(INSTANT_WEATHER_ATTRIBUTE_NAMES)))
+    day_present = numpy.array([[bool(day_weather) for day_weather in provider_days] for provider_days in days])
+
+    # ----- day weights: the ratios of the providers without the day are given to the rest -----
+    ratios = numpy.array(ratios, dtype=float)[:, numpy.newaxis]
+    n_day_present = day_present.sum(axis=0)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        day_weights = numpy.where(day_present, ratios + numpy.where(day_present, 0, ratios).sum(axis=0) / n_day_present, 0)
+
+    day_means = _weighted_mean(day_values, day_weights[..., numpy.newaxis]).tolist()
+    instant_means = _weighted_mean(instant_values, day_weights[..., numpy.newaxis, numpy.newaxis]).tolist()
+
+    # ----- back to models -----
+    final_day_weathers = []
+    for date_index, date in enumerate(dates):
+        present_day_weathers = [provider_days[date_index] for provider_days in days if provider_days[date_index]]
+        if len(present_day_weathers) <= 1:
+            final_day_weathers.extend(present_day_weathers)
+            continue
+
+        day_weather = DayWeather(date=present_day_weathers[-1].date, timezone=present_day_weathers[-1].timezone)
+        for attribute_name, value in zip(DAY_WEATHER_ATTRIBUTE_NAMES, day_means[date_index]):
+            if value != value:
+                continue
+            if attribute_name in ('sunrise', 'sunset'):
+                timezone = [getattr(day_weather_, attribute_name) for day_weather_ in present_day_weathers if getattr(day_weather_, attribute_name) is not None][-1].tzinfo
+                value = datetime.datetime.fromtimestamp(value, timezone)
+            setattr(day_weather, attribute_name, value)
+
+        for hour in range(24):
+            if not (hour_instant_weathers := [hour_slot[0] for day_weather_ in present_day_weathers if (hour_slot := day_weather_.instant_weathers.hour_slots[hour])]):
+                continue
+
+            instant_weather = InstantWeather(hour_instant_weathers[-1].date_time)
+            for attribute_name, value in zip(INSTANT_WEATHER_ATTRIBUTE_NAMES, instant_means[date_index][hour]):
+                if value == value:
+                    setattr(instant_weather, attribute_name, value)
+            day_weather.instant_weathers.append(instant_weather)
+
+        final_day_weathers.append(day_weather)
+
+    return final_day_weathers
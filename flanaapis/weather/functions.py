@@ -1,15 +1,197 @@
-__all__ = ['clear_past_precipitation_probability', 'get_day_weathers_by_place']
+__all__ = [
+    'clear_past_precipitation_probability',
+    'find_cached_coordinates',
+    'get_batch_day_weathers',
+    'get_current_weather',
+    'get_day_weathers_by_place',
+    'iterate_day_weathers_by_place',
+    'iterate_history_instant_weathers',
+    'merge_providers_weathers',
+    'redistribute_ratios',
+    'refresh_cached_weathers'
+]
 
+import asyncio
+import contextlib
 import datetime
-from typing import overload
+import functools
+import math
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Sequence, TypeVar, overload
 
+import aiohttp
 import flanautils
 
+from flanaapis import governor
+from flanaapis.cache import TTLCache
 from flanaapis.geolocation import functions
 from flanaapis.geolocation.models import Place
-from flanaapis.weather import google, open_weather_map, visual_crossing
+from flanaapis.weather import ensemble, google, history, open_weather_map, refresher, visual_crossing
 from flanaapis.weather.models import DayWeather, InstantWeather
 
+BATCH_MAX_CONCURRENCY = 8
+CURRENT_WEATHER_CACHE_TTL = 2 * 60
+PROVIDER_TIMEOUTS = {
+    'open_weather_map': 10,
+    'visual_crossing': 10,
+    'google': 15
+}
+FORECAST_CACHE_GRID_SIZE = 0.01
+FORECAST_CACHE_MAX_SIZE = 1024
+FORECAST_REUSE_RADIUS = 2  # km
+FORECAST_REUSE_MAX_RADIUS = 10  # km
+FORECAST_CACHE_STALE_TTL = 10 * 60
+FORECAST_CACHE_TTLS = {
+    'open_weather_map': 10 * 60,
+    'visual_crossing': 15 * 60,
+    'google': 30 * 60
+}
+STALE_REFRESH_TIMEOUT = 60
+
+T = TypeVar('T')
+
+current_weather_cache = TTLCache(FORECAST_CACHE_MAX_SIZE, CURRENT_WEATHER_CACHE_TTL, copy_values=True)
+forecast_caches = {provider: TTLCache(FORECAST_CACHE_MAX_SIZE, ttl, copy_values=True, stale_ttl=FORECAST_CACHE_STALE_TTL) for provider, ttl in FORECAST_CACHE_TTLS.items()}
+_refresh_tasks: dict[tuple[str, tuple[float, float]], asyncio.Task] = {}
+
+
+async def _get_cached_weathers(
+    provider: str,
+    latitude: float,
+    longitude: float,
+    get_weathers: Callable[[aiohttp.ClientSession | None, int | None, int | None], Awaitable[tuple[InstantWeather | None, list[DayWeather] | None]]],
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+    """
+    Returns the cached weathers of the provider for the cell of the coordinates. If they have expired but are still in
+    the stale window they are returned immediately while they are refreshed in the background.
+
+    The forecasts of the whole horizon are cached by cell and serve any days_back and days_ahead. The shorter ones are
+    cached apart.
+
+    The returned weathers are shared with the cache, so they must not be mutated.
+    """
+
+    key = cell = functions.quantize_coordinates(latitude, longitude, FORECAST_CACHE_GRID_SIZE)
+    if days_back is not None or days_ahead is not None:
+        key = (*cell, days_back, days_ahead)
+
+    if not refresh:
+        if key != cell and cell in forecast_caches[provider]:
+            key = cell
+
+        if weathers := forecast_caches[provider].get(key):
+            return _trim_weathers(weathers, days_back, days_ahead)
+
+        if weathers := forecast_caches[provider].get_stale(key):
+            if (provider, key) not in _refresh_tasks:
+                # the request session can be closed before the refresh ends, so it uses its own
+                _refresh_tasks[provider, key] = governor.create_task(_wait_for_provider(_update_cached_weathers(provider, key, get_weathers), STALE_REFRESH_TIMEOUT), governor.Priority.BACKGROUND)
+                _refresh_tasks[provider, key].add_done_callback(lambda _: _refresh_tasks.pop((provider, key), None))
+            return _trim_weathers(weathers, days_back, days_ahead)
+
+    return _trim_weathers(await _update_cached_weathers(provider, key, get_weathers, session), days_back, days_ahead)
+
+
+def _trim_weathers(weathers: tuple[InstantWeather | None, list[DayWeather] | None], days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+    current_weather, day_weathers = weathers
+    if not day_weathers or days_back is None and days_ahead is None:
+        return current_weather, day_weathers
+
+    today = datetime.datetime.now(day_weathers[0].timezone).date()
+    first_date = datetime.date.min if days_back is None else today - datetime.timedelta(days=days_back)
+    last_date = datetime.date.max if days_ahead is None else today + datetime.timedelta(days=days_ahead)
+
+    return current_weather, [day_weather for day_weather in day_weathers if first_date <= day_weather.date <= last_date]
+
+
+async def _update_cached_weathers(
+    provider: str,
+    key: tuple,
+    get_weathers: Callable[[aiohttp.ClientSession | None, int | None, int | None], Awaitable[tuple[InstantWeather | None, list[DayWeather] | None]]],
+    session: aiohttp.ClientSession = None
+) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+    days_back, days_ahead = key[2:] or (None, None)
+    current_weather, day_weathers = await get_weathers(session, days_back, days_ahead)
+    if day_weathers:
+        forecast_caches[provider].set(key, (current_weather, day_weathers))
+
+    return current_weather, day_weathers
+
+
+def _create_provider_tasks(
+    latitude: float,
+    longitude: float,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None,
+    providers: Iterable[str] = None
+) -> dict[str, asyncio.Task[tuple[InstantWeather | None, list[DayWeather] | None]]]:
+    def get_timezone(current_weather, days_weathers) -> datetime.timezone | None:
+        try:
+            return current_weather.date_time.tzinfo
+        except AttributeError:
+            try:
+                return days_weathers[0].timezone
+            except (IndexError, TypeError):
+                return None
+
+    # noinspection PyUnusedLocal
+    async def get_google_weathers(session_: aiohttp.ClientSession = None, days_back_: int = None, days_ahead_: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+        if not (api_weather_data := await google.get_weather_api_data(latitude, longitude, session_)):
+            return None, None
+
+        for task in (provider_tasks.get('open_weather_map'), provider_tasks.get('visual_crossing')):
+            if task and (timezone := get_timezone(*await asyncio.shield(task))):
+                break
+        else:
+            timezone = await google.find_timezone(latitude, longitude)
+
+        return google.create_day_weathers_by_data(api_weather_data, timezone)
+
+    timeouts = PROVIDER_TIMEOUTS | (timeouts or {})
+    if not refresh:
+        refresher.weather_refresher.record_request(latitude, longitude, days_back, days_ahead)
+
+    get_weathers_functions = {
+        'open_weather_map': functools.partial(open_weather_map.get_day_weathers_by_place, latitude, longitude),
+        'visual_crossing': functools.partial(visual_crossing.get_day_weathers_by_place, latitude, longitude),
+        'google': get_google_weathers
+    }
+    provider_tasks = {
+        provider: asyncio.create_task(_wait_for_provider(_get_cached_weathers(provider, latitude, longitude, get_weathers, session, refresh, days_back, days_ahead), timeouts[provider]))
+        for provider, get_weathers in get_weathers_functions.items() if providers is None or provider in providers
+    }
+
+    return provider_tasks
+
+
+async def _wait_for_provider(awaitable: Awaitable[T], timeout: float, default: T = (None, None)) -> T:
+    # noinspection PyBroadException
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except Exception:
+        return default
+
+
+def redistribute_ratios(ratios: list[float] | None, objects: Sequence) -> list[float] | None:
+    """
+    Returns the ratios of the present objects, giving them the ratios of the missing ones in equal parts like
+    flanautils.MeanBase does with the attributes that are None.
+    """
+
+    if not ratios:
+        return
+
+    present_ratios = [ratio for ratio, object_ in zip(ratios, objects) if object_]
+    missing_ratio = sum(ratio for ratio, object_ in zip(ratios, objects) if not object_)
+
+    return [ratio + missing_ratio / len(present_ratios) for ratio in present_ratios]
+
 
 def clear_past_precipitation_probability(day_weathers: list[DayWeather], timezone: datetime.timezone):
     for day_weather in day_weathers:
@@ -18,53 +200,300 @@ def clear_past_precipitation_probability(day_weathers: list[DayWeather], timezon
                 instant_weather.precipitation_probability = None
 
 
+def find_cached_coordinates(latitude: float, longitude: float, radius: float = FORECAST_REUSE_RADIUS) -> tuple[float, float] | None:
+    """
+    Looks for fresh cached forecasts in the cells of the forecast cache grid within radius kilometers of the
+    coordinates and returns the coordinates of the cell with the most cached providers, the nearest one on a tie, or
+    None if there is none.
+
+    The cells of the grid square around the radius are checked one by one, unless there are more of them than cached
+    keys: then the cached keys are checked instead, so the cost is bounded by the size of the caches.
+    """
+
+    if radius <= 0:
+        return
+
+    cell_latitude, cell_longitude = functions.quantize_coordinates(latitude, longitude, FORECAST_CACHE_GRID_SIZE)
+    cell_height = functions.haversine_distance(0, 0, FORECAST_CACHE_GRID_SIZE, 0)
+    cell_width = cell_height * max(math.cos(math.radians(latitude)), FORECAST_CACHE_GRID_SIZE)
+    latitude_cells = math.ceil(radius / cell_height)
+    longitude_cells = min(math.ceil(radius / cell_width), math.ceil(180 / FORECAST_CACHE_GRID_SIZE))
+
+    if (2 * latitude_cells + 1) * (2 * longitude_cells + 1) > sum(len(forecast_cache) for forecast_cache in forecast_caches.values()):
+        cells = {key for forecast_cache in forecast_caches.values() for key in forecast_cache.keys() if len(key) == 2}  # the shorter horizons are not reused
+    else:
+        cells = (
+            (
+                round(cell_latitude + latitude_offset * FORECAST_CACHE_GRID_SIZE, 6),
+                round((cell_longitude + longitude_offset * FORECAST_CACHE_GRID_SIZE + 180) % 360 - 180, 6)
+            )
+            for latitude_offset in range(-latitude_cells, latitude_cells + 1)
+            for longitude_offset in range(-longitude_cells, longitude_cells + 1)
+        )
+
+    best_cell = None
+    best_rank = None
+    for cell in cells:
+        if (
+            not (n_providers := sum(cell in forecast_cache for forecast_cache in forecast_caches.values()))
+            or
+            (distance := functions.haversine_distance(latitude, longitude, *cell)) > radius
+        ):
+            continue
+
+        if not best_rank or (-n_providers, distance) < best_rank:
+            best_cell = cell
+            best_rank = (-n_providers, distance)
+
+    return best_cell
+
+
+async def get_batch_day_weathers(
+    coordinates: Iterable[tuple[float, float]],
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    max_concurrency=BATCH_MAX_CONCURRENCY,
+    session: aiohttp.ClientSession = None
+) -> list[tuple[InstantWeather, list[DayWeather]] | Exception]:
+    """
+    Gets the weather of several places at once. The places that fall in the same cell of the forecast cache grid are
+    requested only once, all the upstream requests share one HTTP session (session or a new one) and at most
+    max_concurrency cells are requested at the same time. Returns the weathers of every place in the same order or the
+    exception raised getting them.
+    """
+
+    async def get_cell_weathers(latitude: float, longitude: float) -> tuple[InstantWeather, list[DayWeather]]:
+        async with semaphore:
+            return await get_day_weathers_by_place(latitude, longitude, ratios, timeouts, session)
+
+    coordinates = list(coordinates)
+    cells = [functions.quantize_coordinates(latitude, longitude, FORECAST_CACHE_GRID_SIZE) for latitude, longitude in coordinates]
+    cell_coordinates = {}
+    for cell, (latitude, longitude) in zip(cells, coordinates):
+        cell_coordinates.setdefault(cell, (latitude, longitude))
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async with contextlib.nullcontext(session) if session else aiohttp.ClientSession() as session:
+        cell_results = await asyncio.gather(*(get_cell_weathers(latitude, longitude) for latitude, longitude in cell_coordinates.values()), return_exceptions=True)
+    weathers_by_cell = dict(zip(cell_coordinates, cell_results))
+
+    return [weathers_by_cell[cell] for cell in cells]
+
+
+async def get_current_weather(
+    latitude: float | str,
+    longitude: float = None,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None
+) -> InstantWeather | None:
+    """
+    Gets only the current weather of OpenWeatherMap, Visual Crossing and Google, with one request per provider, and
+    merges them. The result is cached CURRENT_WEATHER_CACHE_TTL seconds by cell of the forecast cache grid. Returns None
+    if no provider answers.
+    """
+
+    async def get_google_current_weather() -> InstantWeather | None:
+        if not (api_weather_data := await google.get_weather_api_data(latitude, longitude, session)):
+            return
+
+        for task in (open_task, vc_task):
+            if current_weather_ := await asyncio.shield(task):
+                timezone = current_weather_.date_time.tzinfo
+                break
+        else:
+            timezone = await google.find_timezone(latitude, longitude)
+
+        return google.create_current_weather_by_data(api_weather_data, timezone)
+
+    latitude, longitude = await functions.ensure_coordinates(latitude, longitude)
+    key = functions.quantize_coordinates(latitude, longitude, FORECAST_CACHE_GRID_SIZE)
+    if current_weather := current_weather_cache.get(key):
+        return current_weather
+
+    timeouts = PROVIDER_TIMEOUTS | (timeouts or {})
+    open_task = asyncio.create_task(_wait_for_provider(open_weather_map.get_current_weather(latitude, longitude, session), timeouts['open_weather_map'], None))
+    vc_task = asyncio.create_task(_wait_for_provider(visual_crossing.get_current_weather(latitude, longitude, session), timeouts['visual_crossing'], None))
+    google_task = asyncio.create_task(_wait_for_provider(get_google_current_weather(), timeouts['google'], None))
+
+    if not any(current_weathers := await asyncio.gather(open_task, vc_task, google_task)):
+        return
+
+    current_weather = InstantWeather.mean(current_weathers, ratios)
+    current_weather_cache.set(key, current_weather)
+
+    return current_weather
+
+
 @overload
-async def get_day_weathers_by_place(place: Place, ratios: list[float] = None) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(
+    place: Place,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(place_query: str, ratios: list[float] = None) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(
+    place_query: str,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(latitude: float, longitude: float, ratios: list[float] = None) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(
+    latitude: float, longitude: float,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
-async def get_day_weathers_by_place(latitude: float | str, longitude: float = None, ratios: list[float] = None) -> tuple[InstantWeather, list[DayWeather]]:
-    def get_timezone(current_weather, days_weathers) -> datetime.timezone | None:
-        try:
-            return current_weather.date_time.tzinfo
-        except AttributeError:
-            try:
-                return days_weathers[0].timezone
-            except (IndexError, TypeError):
-                return None
+async def get_day_weathers_by_place(
+    latitude: float | str, longitude: float = None,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    refresh=False,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[InstantWeather, list[DayWeather]]:
+    """
+    Gets the weather of the place merging OpenWeatherMap, Visual Crossing and Google. If refresh=True the providers are
+    requested again even if their forecasts are cached. days_back and days_ahead limit the days from today, and the
+    upstream requests, to the ones needed (the whole horizon of every provider by default).
+    """
+
+    latitude, longitude = await functions.ensure_coordinates(latitude, longitude)
+    provider_tasks = _create_provider_tasks(latitude, longitude, timeouts, session, refresh, days_back, days_ahead)
+
+    return merge_providers_weathers(await asyncio.gather(*provider_tasks.values()), ratios)
+
+
+async def iterate_day_weathers_by_place(
+    latitude: float | str,
+    longitude: float = None,
+    ratios: list[float] = None,
+    timeouts: dict[str, float] = None,
+    session: aiohttp.ClientSession = None,
+    days_back: int = None,
+    days_ahead: int = None
+) -> AsyncIterator[tuple[list[str], list[str], InstantWeather, list[DayWeather]]]:
+    """
+    Yields (finished providers, pending providers, current weather, day weathers) merging the providers that have
+    finished every time one of them brings new data. The last value always has no pending providers and is the same
+    result as get_day_weathers_by_place.
+    """
 
     latitude, longitude = await functions.ensure_coordinates(latitude, longitude)
+    provider_tasks = _create_provider_tasks(latitude, longitude, timeouts, session, days_back=days_back, days_ahead=days_ahead)
+    providers_by_task = {task: provider for provider, task in provider_tasks.items()}
+    providers_weathers = {provider: (None, None) for provider in provider_tasks}
+    pending = set(provider_tasks.values())
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            new_data = False
+            for task in done:
+                providers_weathers[providers_by_task[task]] = task.result()
+                new_data = new_data or any(task.result())
+
+            if new_data or not pending:
+                yield (
+                    [provider for provider, task in provider_tasks.items() if task.done() and any(task.result())],
+                    [provider for provider, task in provider_tasks.items() if not task.done()],
+                    *merge_providers_weathers(providers_weathers.values(), ratios)
+                )
+    finally:
+        for task in pending:
+            task.cancel()
+
 
-    open_current_weather, open_day_weathers = await open_weather_map.get_day_weathers_by_place(latitude, longitude)
-    vc_current_weather, vc_day_weathers = await visual_crossing.get_day_weathers_by_place(latitude, longitude)
-    timezone = get_timezone(open_current_weather, open_day_weathers) or get_timezone(vc_current_weather, vc_day_weathers)
-    google_current_weather, google_day_weathers = await google.get_day_weathers_by_place(latitude, longitude, timezone)
+def merge_providers_weathers(providers_weathers: Iterable[tuple[InstantWeather | None, list[DayWeather] | None]], ratios: list[float] = None) -> tuple[InstantWeather, list[DayWeather]]:
+    """Merges the (current weather, day weathers) of OpenWeatherMap, Visual Crossing and Google, in the order of the ratios."""
 
-    all_day_weathers = [day_weathers for day_weathers in (open_day_weathers, vc_day_weathers, google_day_weathers) if day_weathers]
+    current_weathers, providers_day_weathers = zip(*providers_weathers)
+    all_day_weathers = [day_weathers for day_weathers in providers_day_weathers if day_weathers]
 
     final_day_weathers = []
     if len(all_day_weathers) == 1:
         final_day_weathers = all_day_weathers[0]
-    else:
+    elif ensemble.can_mean_day_weathers(ratios):
+        final_day_weathers = ensemble.mean_day_weathers(providers_day_weathers, ratios)
+    elif all_day_weathers:
         first_date = sorted(day_weathers[0].date for day_weathers in all_day_weathers)[0]
         last_date = sorted(day_weathers[-1].date for day_weathers in all_day_weathers)[-1]
         date = first_date
         while date <= last_date:
-            all_day_weather = [day_weather for day_weathers in all_day_weathers if (day_weather := flanautils.find(day_weathers, condition=lambda day_weather: day_weather.date == date))]
-            if len(all_day_weather) == 1:
-                final_day_weathers.append(all_day_weather[0])
-            else:
-                final_day_weathers.append(DayWeather.mean(all_day_weather, ratios))
+            all_day_weather = [flanautils.find(day_weathers or (), condition=lambda day_weather: day_weather.date == date) for day_weathers in providers_day_weathers]
+            if len(present_day_weather := [day_weather for day_weather in all_day_weather if day_weather]) == 1:
+                final_day_weathers.append(present_day_weather[0])
+            elif present_day_weather:
+                final_day_weathers.append(DayWeather.mean(present_day_weather, redistribute_ratios(ratios, all_day_weather)))
             date = date + datetime.timedelta(days=1)
 
-    return InstantWeather.mean((open_current_weather, vc_current_weather, google_current_weather), ratios), final_day_weathers
+    return InstantWeather.mean(current_weathers, ratios), final_day_weathers
+
+
+async def refresh_cached_weathers(latitude: float, longitude: float, providers: Iterable[str] = None, days_back: int = None, days_ahead: int = None):
+    """
+    Requests again the forecasts of the providers (all by default) for the cell of the coordinates and the horizon of
+    days_back and days_ahead, and caches them.
+    """
+
+    await asyncio.gather(*_create_provider_tasks(latitude, longitude, refresh=True, days_back=days_back, days_ahead=days_ahead, providers=providers).values())
+
+
+async def iterate_history_instant_weathers(latitude: float, longitude: float, from_date: datetime.date, to_date: datetime.date) -> AsyncIterator[InstantWeather]:
+    """Yields the hours stored in the history between the dates (both included), merging the providers hour by hour."""
+
+    def pop_instant_weathers(until: datetime.datetime = None) -> list[InstantWeather]:
+        merged_instant_weathers = []
+        for date_time in sorted(date_time for date_time in instant_weathers_by_date_time if until is None or date_time < until):
+            instant_weathers = instant_weathers_by_date_time.pop(date_time)
+            if from_date <= date_time.date() <= to_date:
+                merged_instant_weathers.append(instant_weathers[0] if len(instant_weathers) == 1 else InstantWeather.mean(instant_weathers))
+
+        return merged_instant_weathers
+
+    instant_weathers_by_date_time: dict[datetime.datetime, list[InstantWeather]] = {}
+    last_date = None
+    # OpenWeatherMap days are UTC days so the neighbouring dates may contain local hours of the range
+    async for date, provider, timezone_offset, data in history.iterate_days_data(latitude, longitude, from_date - datetime.timedelta(days=1), to_date + datetime.timedelta(days=1)):
+        if date != last_date:
+            if last_date:
+                # the days from this date on can't have hours before its midnight - 14 hours (the biggest utc offset)
+                for instant_weather in pop_instant_weathers(datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc) - datetime.timedelta(hours=14)):
+                    yield instant_weather
+            last_date = date
+
+        timezone = datetime.timezone(datetime.timedelta(seconds=timezone_offset))
+        match provider:
+            case 'open_weather_map':
+                instant_weathers = [open_weather_map.create_instant_weather_by_data(hour_data, timezone) for hour_data in data['hourly']]
+            case 'visual_crossing':
+                instant_weathers = [visual_crossing.create_instant_weather_by_data(hour_data, timezone) for hour_data in data.get('hours', ())]
+            case _:
+                instant_weathers = []
+
+        for instant_weather in instant_weathers:
+            instant_weathers_by_date_time.setdefault(instant_weather.date_time, []).append(instant_weather)
+
+    for instant_weather in pop_instant_weathers():
+        yield instant_weather
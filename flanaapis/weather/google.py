@@ -1,11 +1,51 @@
 import datetime
 from typing import overload
 
+import aiohttp
+
 import flanaapis.geolocation.functions
+from flanaapis import upstream_calls
 from flanaapis.scraping import google_weather_scraper
 from flanaapis.weather.models import DayWeather, InstantWeather
 
 
+def create_current_weather_by_data(api_weather_data: dict, timezone: datetime.timezone) -> InstantWeather:
+    current_weather = create_instant_weather_by_data(api_weather_data['weather_now'], timezone)
+    current_weather.date_time = datetime.datetime.now(timezone)
+
+    return current_weather
+
+
+def create_day_weathers_by_data(api_weather_data: dict, timezone: datetime.timezone) -> tuple[InstantWeather, list[DayWeather]]:
+    current_weather = create_current_weather_by_data(api_weather_data, timezone)
+
+    day_weathers = []
+
+    last_day_name = ''
+    days_offset = -1
+    day_weather = None
+    for hour_data in api_weather_data['hourly_forecast']:
+        if last_day_name != (day_name := hour_data['datetime'].split()[0]):
+            last_day_name = day_name
+            days_offset += 1
+            try:
+                day_data = api_weather_data['next_days'][days_offset]
+            except IndexError:
+                day_data = {}
+            day_weathers.append(
+                day_weather := DayWeather(
+                    date=datetime.datetime.now(timezone).date() + datetime.timedelta(days=days_offset),
+                    timezone=timezone,
+                    min_temperature=day_data.get('min_temp'),
+                    max_temperature=day_data.get('max_temp')
+                )
+            )
+
+        day_weather.instant_weathers.append(create_instant_weather_by_data(hour_data, timezone, days_offset))
+
+    return current_weather, day_weathers
+
+
 def create_instant_weather_by_data(data: dict, timezone: datetime.timezone, days_offset=0) -> InstantWeather:
     now = datetime.datetime.now(timezone) + datetime.timedelta(days=days_offset)
     hour = datetime.datetime.strptime(data['datetime'].split()[-1], '%H:%M').hour
@@ -21,6 +61,13 @@ def create_instant_weather_by_data(data: dict, timezone: datetime.timezone, days
     )
 
 
+async def find_timezone(latitude: float, longitude: float) -> datetime.timezone:
+    if api_timezone_data := await flanaapis.geolocation.functions.find_timezone(latitude, longitude):
+        return datetime.timezone(datetime.timedelta(seconds=api_timezone_data['gmtOffset']))
+    else:
+        return datetime.timezone(datetime.timedelta())
+
+
 @overload
 async def get_day_weathers_by_place(place_query: str, timezone: datetime.timezone = None) -> tuple[InstantWeather, list[DayWeather]]:
     pass
@@ -33,45 +80,20 @@ async def get_day_weathers_by_place(latitude: float, longitude: float, timezone:
 
 async def get_day_weathers_by_place(latitude: float | str, longitude: float = None, timezone: datetime.timezone = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
     latitude, longitude = await flanaapis.geolocation.functions.ensure_coordinates(latitude, longitude)
-    place = await flanaapis.geolocation.open_street_map.find_place(f'{latitude}, {longitude}')
 
-    # noinspection PyBroadException
-    try:
-        api_weather_data = google_weather_scraper.get_forecast(str(place))
-    except Exception:
+    if not (api_weather_data := await get_weather_api_data(latitude, longitude)):
         return None, None
 
-    if not timezone:
-        if api_timezone_data := await flanaapis.geolocation.functions.find_timezone(latitude, longitude):
-            timezone = datetime.timezone(datetime.timedelta(seconds=api_timezone_data['gmtOffset']))
-        else:
-            timezone = datetime.timezone(datetime.timedelta())
+    return create_day_weathers_by_data(api_weather_data, timezone or await find_timezone(latitude, longitude))
 
-    current_weather = create_instant_weather_by_data(api_weather_data['weather_now'], timezone)
-    current_weather.date_time = datetime.datetime.now(timezone)
-
-    day_weathers = []
-
-    last_day_name = ''
-    days_offset = -1
-    day_weather = None
-    for hour_data in api_weather_data['hourly_forecast']:
-        if last_day_name != (day_name := hour_data['datetime'].split()[0]):
-            last_day_name = day_name
-            days_offset += 1
-            try:
-                day_data = api_weather_data['next_days'][days_offset]
-            except IndexError:
-                day_data = {}
-            day_weathers.append(
-                day_weather := DayWeather(
-                    date=datetime.datetime.now(timezone).date() + datetime.timedelta(days=days_offset),
-                    timezone=timezone,
-                    min_temperature=day_data.get('min_temp'),
-                    max_temperature=day_data.get('max_temp')
-                )
-            )
 
-        day_weather.instant_weathers.append(create_instant_weather_by_data(hour_data, timezone, days_offset))
+async def get_weather_api_data(latitude: float, longitude: float, session: aiohttp.ClientSession = None) -> dict | None:
+    if not (place := await flanaapis.geolocation.open_street_map.reverse_find_place(latitude, longitude)):
+        return
 
-    return current_weather, day_weathers
+    upstream_calls.count_call()
+    # noinspection PyBroadException
+    try:
+        return await google_weather_scraper.get_forecast_async(str(place), session=session)
+    except Exception:
+        pass
@@ -0,0 +1,104 @@
+__all__ = ['add_days_data', 'get_days_data', 'iterate_days_data']
+
+import asyncio
+import datetime
+import json
+import os
+import pathlib
+import sqlite3
+from typing import AsyncIterator, Iterable
+
+from flanaapis.geolocation.functions import quantize_coordinates
+
+DATABASE_PATH = str(pathlib.Path.home() / '.flanaapis' / 'weather_history.sqlite3')
+GRID_SIZE = 0.01
+
+_initialized_paths: set[str] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    path = os.environ.get('FLANAAPIS_WEATHER_HISTORY_PATH', DATABASE_PATH)
+    if path not in _initialized_paths:
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    if path not in _initialized_paths:
+        connection.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS day_weather_data (
+                provider TEXT NOT NULL,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                date TEXT NOT NULL,
+                timezone_offset INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (latitude, longitude, date, provider)
+            )
+            '''
+        )
+        connection.commit()
+        _initialized_paths.add(path)
+
+    return connection
+
+
+def _add_days_data(provider: str, latitude: float, longitude: float, days_data: list[tuple[datetime.date, int, dict]]):
+    latitude, longitude = quantize_coordinates(latitude, longitude, GRID_SIZE)
+    with _connect() as connection:
+        connection.executemany(
+            'INSERT OR IGNORE INTO day_weather_data VALUES (?, ?, ?, ?, ?, ?)',
+            ((provider, latitude, longitude, date.isoformat(), timezone_offset, json.dumps(data)) for date, timezone_offset, data in days_data)
+        )
+    connection.close()
+
+
+def _get_days_data(provider: str, latitude: float, longitude: float, dates: list[datetime.date]) -> dict[datetime.date, tuple[int, dict]]:
+    latitude, longitude = quantize_coordinates(latitude, longitude, GRID_SIZE)
+    with _connect() as connection:
+        rows = connection.execute(
+            f"SELECT date, timezone_offset, data FROM day_weather_data WHERE provider = ? AND latitude = ? AND longitude = ? AND date IN ({', '.join('?' * len(dates))})",
+            (provider, latitude, longitude, *(date.isoformat() for date in dates))
+        ).fetchall()
+    connection.close()
+
+    return {datetime.date.fromisoformat(date): (timezone_offset, json.loads(data)) for date, timezone_offset, data in rows}
+
+
+def _get_date_rows(latitude: float, longitude: float, date: datetime.date) -> list[tuple[str, int, dict]]:
+    with _connect() as connection:
+        rows = connection.execute(
+            'SELECT provider, timezone_offset, data FROM day_weather_data WHERE latitude = ? AND longitude = ? AND date = ? ORDER BY provider',
+            (latitude, longitude, date.isoformat())
+        ).fetchall()
+    connection.close()
+
+    return [(provider, timezone_offset, json.loads(data)) for provider, timezone_offset, data in rows]
+
+
+async def add_days_data(provider: str, latitude: float, longitude: float, days_data: Iterable[tuple[datetime.date, int, dict]]):
+    """
+    Stores the data of completed days. The days are immutable once they are over, so if a day is already stored it is
+    left untouched.
+    """
+
+    if days_data := list(days_data):
+        await asyncio.to_thread(_add_days_data, provider, latitude, longitude, days_data)
+
+
+async def get_days_data(provider: str, latitude: float, longitude: float, dates: Iterable[datetime.date]) -> dict[datetime.date, tuple[int, dict]]:
+    """Returns a dictionary date -> (timezone_offset, data) with the stored days of the provider for the given dates."""
+
+    if not (dates := list(dates)):
+        return {}
+
+    return await asyncio.to_thread(_get_days_data, provider, latitude, longitude, dates)
+
+
+async def iterate_days_data(latitude: float, longitude: float, from_date: datetime.date, to_date: datetime.date) -> AsyncIterator[tuple[datetime.date, str, int, dict]]:
+    """Yields (date, provider, timezone_offset, data) of the stored days in the date range, one date at a time."""
+
+    latitude, longitude = quantize_coordinates(latitude, longitude, GRID_SIZE)
+    date = from_date
+    while date <= to_date:
+        for provider, timezone_offset, data in await asyncio.to_thread(_get_date_rows, latitude, longitude, date):
+            yield date, provider, timezone_offset, data
+        date += datetime.timedelta(days=1)
@@ -83,6 +83,89 @@ class InstantWeather(MeanBase, FlanaBase):
         return self
 
 
+class HourlyInstantWeathers(list):
+    """
+    List of InstantWeathers that keeps them indexed in 24 hour slots, so they can be looked up by hour in constant time.
+
+    The index is updated on append and rebuilt lazily after any other mutation. The InstantWeathers are indexed by the
+    hour of their date_time, so if the date_time of a contained InstantWeather changes it must be reassigned.
+    """
+
+    def __init__(self, iterable: Iterable[InstantWeather] = ()):
+        super().__init__(iterable)
+        self._hour_slots: list[list[InstantWeather]] | None = None
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._hour_slots = None
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._hour_slots = None
+        return result
+
+    def __imul__(self, other):
+        result = super().__imul__(other)
+        self._hour_slots = None
+        return result
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._hour_slots = None
+
+    @property
+    def hour_slots(self) -> list[list[InstantWeather]]:
+        if self._hour_slots is None:
+            self._hour_slots = [[] for _ in range(24)]
+            for instant_weather in self:
+                self._index(instant_weather)
+
+        return self._hour_slots
+
+    def _index(self, instant_weather: InstantWeather):
+        try:
+            self._hour_slots[instant_weather.date_time.hour].append(instant_weather)
+        except AttributeError:
+            pass
+
+    def append(self, instant_weather: InstantWeather):
+        super().append(instant_weather)
+        if self._hour_slots is not None:
+            self._index(instant_weather)
+
+    def clear(self):
+        super().clear()
+        self._hour_slots = None
+
+    def extend(self, instant_weathers: Iterable[InstantWeather]):
+        super().extend(instant_weathers)
+        self._hour_slots = None
+
+    def insert(self, index: int, instant_weather: InstantWeather):
+        super().insert(index, instant_weather)
+        self._hour_slots = None
+
+    def pop(self, index: int = -1) -> InstantWeather:
+        instant_weather = super().pop(index)
+        self._hour_slots = None
+        return instant_weather
+
+    def remove(self, instant_weather: InstantWeather):
+        super().remove(instant_weather)
+        self._hour_slots = None
+
+    def reverse(self):
+        super().reverse()
+        self._hour_slots = None
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._hour_slots = None
+
+
 @dataclass(unsafe_hash=True)
 class DayWeather(MeanBase, FlanaBase):
     date: datetime.date = None
@@ -91,7 +174,12 @@ class DayWeather(MeanBase, FlanaBase):
     sunset: datetime.datetime = None
     min_temperature: float = None
     max_temperature: float = None
-    instant_weathers: list[InstantWeather] = field(default_factory=list)
+    instant_weathers: list[InstantWeather] = field(default_factory=HourlyInstantWeathers)
+
+    def __setattr__(self, name: str, value: Any):
+        if name == 'instant_weathers' and not isinstance(value, HourlyInstantWeathers):
+            value = HourlyInstantWeathers(value)
+        super().__setattr__(name, value)
 
     def _dict_repr(self) -> Any:
         self_vars = super()._dict_repr()
@@ -103,72 +191,100 @@ class DayWeather(MeanBase, FlanaBase):
 
         return self_vars
 
-    def distribute_precipitation_volume(self, precipitations: Iterable[Precipitation]):
-        def distribute_precipitation_volume_(precipitation_type: PrecipitationType, precipitations_: Iterable[Precipitation]):
-            grouped_precipitations: dict[int, list[Precipitation]] = {}
-            for hours in range(1, 25):
-                grouped_precipitations[hours] = [precipitation.copy() for precipitation in precipitations_ if (precipitation.end_date - precipitation.start_date).total_seconds() / 3600 == hours]
-
-            hourly_precipitations: list[Precipitation] = grouped_precipitations[1]
-            for hours in range(2, 25):
-                for precipitation in grouped_precipitations[hours]:
-                    start_hour = precipitation.start_date.hour
-                    start_hours = list(range(start_hour, min(start_hour + hours, 24)))
-
-                    for hourly_precipitation in hourly_precipitations:
-                        if hourly_precipitation.start_date.hour in start_hours:
-                            start_hours.remove(hourly_precipitation.start_date.hour)
-                            precipitation.volume -= hourly_precipitation.volume
-                    if start_hours:
-                        hourly_volume = precipitation.volume / len(start_hours)
-                    else:
-                        continue
-                    for start_hour in start_hours:
-                        start_date = precipitation.start_date.replace(hour=start_hour)
-                        hourly_precipitations.append(Precipitation(precipitation_type, start_date, start_date + datetime.timedelta(hours=1), hourly_volume))
-            hourly_precipitations.sort(key=lambda precipitation: precipitation.start_date)
-
-            attribute_name = f'{precipitation_type.name.lower()}_volume'
-            for precipitation in hourly_precipitations:
-                if not precipitation.volume:
-                    return
-
-                if not (instant_weather := next(iter(self.get_instant_weathers_by_hour(precipitation.start_date.hour)), None)):
-                    instant_weather = InstantWeather(precipitation.start_date)
-                    self.instant_weathers.append(instant_weather)
-                setattr(instant_weather, attribute_name, precipitation.volume)
-
-            self.instant_weathers.sort(key=lambda instant_weather_: instant_weather_.date_time)
-
-        precipitations = [precipitation for precipitation in precipitations if precipitation.start_date.date() == self.date]
-        temp_precipitations = []
+    def _distribute_hourly_precipitation_volume(self, precipitation_type: PrecipitationType, precipitations: Iterable[Precipitation]):
+        hourly_precipitations: list[tuple[datetime.datetime, float]] = []
+        first_hourly_volumes: dict[int, float] = {}  # hour -> volume of the first hourly precipitation of that hour
+        grouped_precipitations: list[list[Precipitation]] = [[] for _ in range(25)]
+        for precipitation in precipitations:
+            hours = (precipitation.end_date - precipitation.start_date).total_seconds() / 3600
+            if hours == 1:
+                hourly_precipitations.append((precipitation.start_date, precipitation.volume))
+                first_hourly_volumes.setdefault(precipitation.start_date.hour, precipitation.volume)
+            elif 2 <= hours <= 24 and hours.is_integer():
+                grouped_precipitations[int(hours)].append(precipitation)
+
+        for hours in range(2, 25):
+            for precipitation in grouped_precipitations[hours]:
+                start_hour = precipitation.start_date.hour
+                end_hour = min(start_hour + hours, 24)
+
+                volume = precipitation.volume
+                for hour, hourly_volume in first_hourly_volumes.items():
+                    if start_hour <= hour < end_hour:
+                        volume -= hourly_volume
+                if not (free_hours := [hour for hour in range(start_hour, end_hour) if hour not in first_hourly_volumes]):
+                    continue
+
+                hourly_volume = volume / len(free_hours)
+                for hour in free_hours:
+                    hourly_precipitations.append((precipitation.start_date.replace(hour=hour), hourly_volume))
+                    first_hourly_volumes[hour] = hourly_volume
+        hourly_precipitations.sort(key=lambda hourly_precipitation: hourly_precipitation[0])
+
+        attribute_name = f'{precipitation_type.name.lower()}_volume'
+        for start_date, volume in hourly_precipitations:
+            if not volume:
+                return
+
+            if not (instant_weather := self.get_instant_weather_by_hour(start_date.hour)):
+                instant_weather = InstantWeather(start_date)
+                self.instant_weathers.append(instant_weather)
+            setattr(instant_weather, attribute_name, volume)
+
+        self.instant_weathers.sort(key=lambda instant_weather_: instant_weather_.date_time)
+
+    @classmethod
+    def distribute_days_precipitation_volume(cls, day_weathers: Iterable[DayWeather], precipitations: Iterable[Precipitation]):
+        """
+        Distributes the rain and snow volumes of the precipitations among the hours of the days. The precipitations are
+        grouped by start date in a single pass, so it is equivalent to calling distribute_precipitation_volume for every
+        day but linear in the number of precipitations.
+        """
+
+        days_precipitations: dict[datetime.date, dict[PrecipitationType, list[Precipitation]]] = {}
         for precipitation in precipitations:
+            if precipitation.type_ not in (PrecipitationType.RAIN, PrecipitationType.SNOW):
+                continue
+
+            day_precipitations = days_precipitations.setdefault(precipitation.start_date.date(), {}).setdefault(precipitation.type_, [])
             next_day_first_hour_date_time = (precipitation.start_date + datetime.timedelta(days=1)).replace(hour=0)
             if next_day_first_hour_date_time < precipitation.end_date:
                 precipitation_hours = (precipitation.end_date - precipitation.start_date).total_seconds() / 3600
                 hours_until_next_day = (next_day_first_hour_date_time - precipitation.start_date).total_seconds() / 3600
                 next_day_precipitation_hours = precipitation_hours - hours_until_next_day
-                temp_precipitations.append(Precipitation(precipitation.type_, precipitation.start_date, next_day_first_hour_date_time, precipitation.volume / precipitation_hours * hours_until_next_day))
-                temp_precipitations.append(Precipitation(precipitation.type_, next_day_first_hour_date_time, next_day_first_hour_date_time + datetime.timedelta(hours=next_day_precipitation_hours), precipitation.volume / precipitation_hours * next_day_precipitation_hours))
+                day_precipitations.append(Precipitation(precipitation.type_, precipitation.start_date, next_day_first_hour_date_time, precipitation.volume / precipitation_hours * hours_until_next_day))
+                day_precipitations.append(Precipitation(precipitation.type_, next_day_first_hour_date_time, next_day_first_hour_date_time + datetime.timedelta(hours=next_day_precipitation_hours), precipitation.volume / precipitation_hours * next_day_precipitation_hours))
             else:
-                temp_precipitations.append(precipitation)
-        precipitations = temp_precipitations
-        if rain := [precipitation for precipitation in precipitations if precipitation.type_ is PrecipitationType.RAIN]:
-            distribute_precipitation_volume_(PrecipitationType.RAIN, rain)
-        if snow := [precipitation for precipitation in precipitations if precipitation.type_ is PrecipitationType.SNOW]:
-            distribute_precipitation_volume_(PrecipitationType.SNOW, snow)
+                day_precipitations.append(precipitation)
+
+        for day_weather in day_weathers:
+            day_precipitations = days_precipitations.get(day_weather.date, {})
+            for precipitation_type in (PrecipitationType.RAIN, PrecipitationType.SNOW):
+                if precipitation_type in day_precipitations:
+                    day_weather._distribute_hourly_precipitation_volume(precipitation_type, day_precipitations[precipitation_type])
+
+    def distribute_precipitation_volume(self, precipitations: Iterable[Precipitation]):
+        self.distribute_days_precipitation_volume((self,), precipitations)
 
     def fill_24h_instant_weathers(self):
         if not self.date:
             return
 
-        for hour in range(24):
-            if not self.get_instant_weathers_by_hour(hour):
-                new_instant_weather = InstantWeather(datetime.datetime(self.date.year, self.date.month, self.date.day, hour, tzinfo=self.timezone))
-                self.instant_weathers.insert(hour, new_instant_weather)
+        hour_slots = self.instant_weathers.hour_slots
+        if all(hour_slots):
+            return
+
+        instant_weathers = []
+        for hour, hour_instant_weathers in enumerate(hour_slots):
+            instant_weathers.extend(hour_instant_weathers or (InstantWeather(datetime.datetime(self.date.year, self.date.month, self.date.day, hour, tzinfo=self.timezone)),))
+        instant_weathers.extend(instant_weather for instant_weather in self.instant_weathers if not instant_weather.date_time)
+        self.instant_weathers = instant_weathers
+
+    def get_instant_weather_by_hour(self, hour: int) -> InstantWeather | None:
+        return next(iter(self.instant_weathers.hour_slots[hour]), None)
 
     def get_instant_weathers_by_hour(self, hour: int) -> list[InstantWeather]:
-        return [instant_weather for instant_weather in self.instant_weathers if instant_weather.date_time and instant_weather.date_time.hour == hour]
+        return self.instant_weathers.hour_slots[hour].copy()
 
     @classmethod
     def mean(
@@ -182,9 +298,12 @@ class DayWeather(MeanBase, FlanaBase):
 
         final_instant_weathers = []
         for hour in range(24):
-            instant_weathers = [instant_weather for day_weather in objects if (instant_weather := next(iter(day_weather.get_instant_weathers_by_hour(hour)), None))]
-            if instant_weathers:
-                final_instant_weathers.append(InstantWeather.mean(instant_weathers, ratios))
+            instant_weathers = [day_weather.get_instant_weather_by_hour(hour) for day_weather in objects]
+            if ratios:
+                if any(instant_weathers):
+                    final_instant_weathers.append(InstantWeather.mean(instant_weathers, ratios))
+            elif instant_weathers := [instant_weather for instant_weather in instant_weathers if instant_weather]:
+                final_instant_weathers.append(InstantWeather.mean(instant_weathers))
 
         # noinspection PyTypeChecker
         day_weather: DayWeather = super().mean(objects, ratios, attribute_names)
@@ -195,6 +314,18 @@ class DayWeather(MeanBase, FlanaBase):
 
         return day_weather
 
+    def merge_instant_weather(self, instant_weather: InstantWeather, left_priority=True) -> InstantWeather:
+        """
+        Merges the instant weather into the instant weather of the same hour or adds it if there is none. Unlike merge,
+        the instant weathers are not reordered.
+        """
+
+        if self_instant_weather := self.get_instant_weather_by_hour(instant_weather.date_time.hour):
+            return self_instant_weather.merge(instant_weather, left_priority)
+
+        self.instant_weathers.append(instant_weather)
+        return instant_weather
+
     def merge(self, other: DayWeather, left_priority=True) -> DayWeather:
         vars_copy = vars(self).copy()
         vars_copy.popitem()
@@ -205,8 +336,8 @@ class DayWeather(MeanBase, FlanaBase):
 
         new_instant_weathers = []
         for hour in range(24):
-            self_instant_weather = next(iter(self.get_instant_weathers_by_hour(hour)), None)
-            other_instant_weather = next(iter(other.get_instant_weathers_by_hour(hour)), None)
+            self_instant_weather = self.get_instant_weather_by_hour(hour)
+            other_instant_weather = other.get_instant_weather_by_hour(hour)
             if self_instant_weather:
                 if other_instant_weather:
                     new_instant_weathers.append(self_instant_weather.merge(other_instant_weather, left_priority))
@@ -1,15 +1,19 @@
 __all__ = [
     'add_daily_attributes_from_current_data_format',
     'create_instant_weather_by_data',
+    'get_current_weather',
     'get_day_weathers_by_place',
     'get_hourly_precipitation',
     'get_hourly_precipitations',
+    'get_request_with_retries',
     'get_weather_api_data'
 ]
 
 import asyncio
+import contextlib
 import datetime
 import os
+import random
 from typing import Iterable, overload
 
 import aiohttp
@@ -17,6 +21,8 @@ import flanautils
 
 import flanaapis.geolocation.functions
 import flanaapis.weather.functions
+import flanaapis.weather.history
+from flanaapis import upstream_calls
 from flanaapis.exceptions import ResponseError
 from flanaapis.geolocation.models import Place
 from flanaapis.weather.models import DayPhases, DayWeather, InstantWeather, Precipitation, PrecipitationType
@@ -27,7 +33,13 @@ BASE_ENDPOINT = 'https://api.openweathermap.org/data/2.5'
 PAST_ENDPOINT = f'{BASE_ENDPOINT}/onecall/timemachine'
 NEAR_FUTURE_ENDPOINT = f'{BASE_ENDPOINT}/forecast'
 PRESENT_FUTURE_ENDPOINT = f'{BASE_ENDPOINT}/onecall'
+PAST_DAYS = 5
 MAX_RETRIES_PAST_REQUEST = 5
+MAX_CONCURRENT_REQUESTS = 4
+RETRY_BACKOFF_BASE = 0.25
+RETRY_BACKOFF_CAP = 4
+REQUESTS_TIME_BUDGET = 8
+RETRIED_EXCEPTIONS = (ResponseError, aiohttp.ClientError, asyncio.TimeoutError)
 
 
 def add_daily_attributes_from_current_data_format(day_weathers: Iterable[DayWeather], data: dict, timezone: datetime.timezone):
@@ -41,92 +53,107 @@ def add_daily_attributes_from_current_data_format(day_weathers: Iterable[DayWeat
 
 
 def create_instant_weather_by_data(data: dict, timezone: datetime.timezone) -> InstantWeather:
-    def format_old_open_weather_map_api_data() -> dict:
-        for k, v in data['main'].items():
-            data[k] = v
-        data['clouds'] = sum(data['clouds'].values())
-        data['wind_deg'] = data.get('wind', {}).get('deg')
-        data['wind_gust'] = data.get('wind', {}).get('gust')
-        data['wind_speed'] = data.get('wind', {}).get('speed')
-
-        return data
-
-    if 'main' in data:
-        data = format_old_open_weather_map_api_data()
+    if 'main' in data:  # 3-hour forecast format, read from its nested dicts instead of merging them into a new one
+        main_data = data['main']
+        wind_data = data.get('wind', {})
+        clouds = sum(data['clouds'].values())
+        wind_degrees = wind_data.get('deg')
+        wind_gust = wind_data.get('gust')
+        wind_speed = wind_data.get('speed')
+    else:
+        main_data = data
+        clouds = data.get('clouds')
+        wind_degrees = data.get('wind_deg')
+        wind_gust = data.get('wind_gust')
+        wind_speed = data.get('wind_speed')
 
     return InstantWeather(
         date_time=datetime.datetime.fromtimestamp(data['dt'], tz=timezone),
-        clouds=data.get('clouds'),
+        clouds=clouds,
         description=data.get('weather', ({},))[0].get('description'),
         dew_point=data.get('dew_point'),
-        humidity=data.get('humidity'),
+        humidity=main_data.get('humidity'),
         icon=data.get('weather', ({},))[0].get('icon'),
         precipitation_probability=pop * 100 if (pop := data.get('pop')) else pop,  # p -> %
-        pressure=data.get('pressure'),
-        temperature=data.get('temp'),
-        temperature_feel=data.get('feels_like'),
+        pressure=main_data.get('pressure'),
+        temperature=main_data.get('temp'),
+        temperature_feel=main_data.get('feels_like'),
         uvi=data.get('uvi'),
         visibility=visibility / 1000 if (visibility := data.get('visibility')) else visibility,  # visibility m -> km
-        wind_degrees=data.get('wind_deg'),
-        wind_gust=data.get('wind_gust'),
-        wind_speed=wind_speed * 3.6 if (wind_speed := data.get('wind_speed')) else wind_speed  # wind_speed m/s -> km/h
+        wind_degrees=wind_degrees,
+        wind_gust=wind_gust,
+        wind_speed=wind_speed * 3.6 if wind_speed else wind_speed  # wind_speed m/s -> km/h
     )
 
 
+async def get_current_weather(latitude: float, longitude: float, session: aiohttp.ClientSession = None) -> InstantWeather:
+    """Requests only the current weather block of onecall."""
+
+    parameters = {
+        'lat': latitude,
+        'lon': longitude,
+        'units': UNITS,
+        'lang': LANGUAGE,
+        'exclude': 'minutely,hourly,daily,alerts',
+        'appid': os.environ['OPEN_WEATHER_MAP_API_KEY']
+    }
+    upstream_calls.count_call()
+    api_data = await flanautils.get_request(PRESENT_FUTURE_ENDPOINT, parameters, session=session)
+
+    return create_instant_weather_by_data(api_data['current'], datetime.timezone(datetime.timedelta(seconds=api_data['timezone_offset'])))
+
+
 @overload
-async def get_day_weathers_by_place(place: Place) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(place: Place, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(place_query: str) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(place_query: str, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(latitude: float, longitude: float) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(latitude: float, longitude: float, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather, list[DayWeather]]:
     pass
 
 
-async def get_day_weathers_by_place(latitude: float | str, longitude: float = None) -> tuple[InstantWeather, list[DayWeather]]:
+async def get_day_weathers_by_place(latitude: float | str, longitude: float = None, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather, list[DayWeather]]:
     latitude, longitude = await flanaapis.geolocation.functions.ensure_coordinates(latitude, longitude)
 
-    day_weathers = []
+    day_weathers_by_date: dict[datetime.date, DayWeather] = {}
 
-    past_days_data, present_future_data, near_future_data, timezone = await get_weather_api_data(latitude, longitude)
+    past_days_data, present_future_data, near_future_data, timezone = await get_weather_api_data(latitude, longitude, session, days_back, days_ahead)
     current_weather = create_instant_weather_by_data(present_future_data['current'], timezone)
     precipitations: list[Precipitation] = []
 
     # ----- hourly data -----
     hourly_data = [hour_data for past_day_data in past_days_data for hour_data in past_day_data['hourly']][:-1]
     hourly_data += present_future_data['hourly']
-    hourly_data += near_future_data['list']
+    if near_future_data:
+        hourly_data += near_future_data['list']
 
     for hour_data in hourly_data:
-        hour_dt = datetime.datetime.fromtimestamp(hour_data['dt'], tz=timezone)
-        day_weather = flanautils.find(day_weathers, condition=lambda day_weather_: day_weather_.date == hour_dt.date())
-        if not day_weather or hour_dt.date() != day_weather.date:
-            day_weathers.append(day_weather := DayWeather(hour_dt.date(), timezone))
+        instant_weather = create_instant_weather_by_data(hour_data, timezone)
+        hour_dt = instant_weather.date_time
+        if not (day_weather := day_weathers_by_date.get(hour_dt.date())):
+            day_weathers_by_date[hour_dt.date()] = day_weather = DayWeather(hour_dt.date(), timezone)
 
         if hourly_precipitations := get_hourly_precipitations(hour_dt, hour_data):
             precipitations.extend(hourly_precipitations)
 
-        temp_day_weather = DayWeather()
-        temp_day_weather.instant_weathers.append(create_instant_weather_by_data(hour_data, timezone))
-        day_weather.merge(temp_day_weather)
+        day_weather.merge_instant_weather(instant_weather)
 
     # ----- daily data -----
     for past_day_data in past_days_data:
-        add_daily_attributes_from_current_data_format(day_weathers, past_day_data, timezone)
+        add_daily_attributes_from_current_data_format(day_weathers_by_date.values(), past_day_data, timezone)
 
-    add_daily_attributes_from_current_data_format(day_weathers, present_future_data, timezone)
+    add_daily_attributes_from_current_data_format(day_weathers_by_date.values(), present_future_data, timezone)
 
     for future_day_data in present_future_data['daily']:
         day_dt = datetime.datetime.fromtimestamp(future_day_data['dt'], tz=timezone).replace(hour=0)
-        day_weather = flanautils.find(day_weathers, condition=lambda day_weather_: day_weather_.date == day_dt.date())
-        if not day_weather:
-            day_weather = DayWeather(day_dt.date(), timezone)
-            day_weathers.append(day_weather)
+        if not (day_weather := day_weathers_by_date.get(day_dt.date())):
+            day_weathers_by_date[day_dt.date()] = day_weather = DayWeather(day_dt.date(), timezone)
 
         day_weather.sunrise = datetime.datetime.fromtimestamp(future_day_data['sunrise'], timezone)
         day_weather.sunset = datetime.datetime.fromtimestamp(future_day_data['sunset'], timezone)
@@ -137,23 +164,23 @@ async def get_day_weathers_by_place(latitude: float | str, longitude: float = No
         if daily_snow := future_day_data.get('snow') or 0:
             precipitations.append(Precipitation(PrecipitationType.SNOW, day_dt, day_dt + datetime.timedelta(days=1), daily_snow))
 
-        temp_day_weather = DayWeather()
+        day_instant_weather = create_instant_weather_by_data(future_day_data, timezone)
         # noinspection PyTypeChecker
         for phase_name, hour in DayPhases.items:
             phase_name = phase_name.lower()
-            hour_dt = day_dt.replace(hour=hour)
-
-            future_day_data_copy = future_day_data.copy()
-            future_day_data_copy['dt'] = int(hour_dt.timestamp())
-            future_day_data_copy['temp'] = future_day_data['temp'][phase_name]
-            future_day_data_copy['feels_like'] = future_day_data['feels_like'][phase_name]
+            phase_instant_weather = day_instant_weather.copy()
+            phase_instant_weather.date_time = day_dt.replace(hour=hour)
+            phase_instant_weather.temperature = future_day_data['temp'][phase_name]
+            phase_instant_weather.temperature_feel = future_day_data['feels_like'][phase_name]
             if phase_name != 'day':
-                future_day_data_copy['uvi'] = 0
-            temp_day_weather.instant_weathers.append(create_instant_weather_by_data(future_day_data_copy, timezone))
-            day_weather.merge(temp_day_weather)
+                phase_instant_weather.uvi = 0
+            day_weather.merge_instant_weather(phase_instant_weather)
 
+    day_weathers = list(day_weathers_by_date.values())
     for day_weather in day_weathers:
-        day_weather.distribute_precipitation_volume(precipitations)
+        day_weather.instant_weathers.sort(key=lambda instant_weather: instant_weather.date_time.hour)
+
+    DayWeather.distribute_days_precipitation_volume(day_weathers, precipitations)
 
     flanaapis.weather.functions.clear_past_precipitation_probability(day_weathers, timezone)
 
@@ -176,7 +203,31 @@ def get_hourly_precipitations(date: datetime.datetime, data: dict) -> list[Preci
     return [precipitation for precipitation in (rain_last_hour, rain_last_3_hours, snow_last_hour, snow_last_3_hours) if precipitation]
 
 
-async def get_weather_api_data(latitude: float, longitude: float) -> tuple[list[dict], dict, dict, datetime.timezone]:
+async def get_request_with_retries(url: str, parameters: dict, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, max_retries=MAX_RETRIES_PAST_REQUEST) -> dict:
+    for attempt in range(max_retries):
+        async with semaphore:
+            upstream_calls.count_call()
+            try:
+                return await flanautils.get_request(url, parameters, session=session)
+            except RETRIED_EXCEPTIONS:
+                if attempt == max_retries - 1:
+                    raise
+
+        await asyncio.sleep(random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt)))  # full jitter
+
+
+async def get_weather_api_data(
+    latitude: float,
+    longitude: float,
+    session: aiohttp.ClientSession = None,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[list[dict], dict, dict | None, datetime.timezone]:
+    """
+    Requests the past days (days_back, PAST_DAYS by default), the present and the forecast. The 3-hour forecast is only
+    requested if days_ahead is None or greater than 1, because the hourly forecast of onecall already covers 48 hours.
+    """
+
     parameters = {
         'lat': latitude,
         'lon': longitude,
@@ -184,20 +235,47 @@ async def get_weather_api_data(latitude: float, longitude: float) -> tuple[list[
         'lang': LANGUAGE,
         'appid': os.environ['OPEN_WEATHER_MAP_API_KEY']
     }
-
-    async with aiohttp.ClientSession() as session:
-        past_days_data = []
-        for days_to_the_past in reversed(range(6)):
-            dt_query_param = datetime.datetime.now() - datetime.timedelta(days=days_to_the_past)
-            for _ in range(MAX_RETRIES_PAST_REQUEST):
-                try:
-                    past_days_data.append(await flanautils.get_request(PAST_ENDPOINT, parameters | {'dt': int(dt_query_param.timestamp())}, session=session))
-                    break
-                except ResponseError:
-                    await asyncio.sleep(1)
-
-        present_future_data: dict = await flanautils.get_request(PRESENT_FUTURE_ENDPOINT, parameters, session=session)
-        near_future_data: dict = await flanautils.get_request(NEAR_FUTURE_ENDPOINT, parameters, session=session)
-        timezone = datetime.timezone(datetime.timedelta(seconds=present_future_data['timezone_offset']))
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    days_back = PAST_DAYS if days_back is None else min(days_back, PAST_DAYS)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    past_dts = [now - datetime.timedelta(days=days_to_the_past) for days_to_the_past in reversed(range(days_back + 1))]
+    stored_past_days_data = await flanaapis.weather.history.get_days_data('open_weather_map', latitude, longitude, (past_dt.date() for past_dt in past_dts if past_dt.date() < now.date()))
+
+    async with contextlib.nullcontext(session) if session else aiohttp.ClientSession() as session:
+        past_tasks = {
+            past_dt: asyncio.create_task(get_request_with_retries(PAST_ENDPOINT, parameters | {'dt': int(past_dt.timestamp())}, session, semaphore))
+            for past_dt in past_dts if past_dt.date() not in stored_past_days_data
+        }
+        present_future_task = asyncio.create_task(get_request_with_retries(PRESENT_FUTURE_ENDPOINT, parameters, session, semaphore, max_retries=1))
+        tasks = [*past_tasks.values(), present_future_task]
+        near_future_task = None
+        if days_ahead is None or days_ahead > 1:
+            near_future_task = asyncio.create_task(get_request_with_retries(NEAR_FUTURE_ENDPOINT, parameters, session, semaphore, max_retries=1))
+            tasks.append(near_future_task)
+
+        _, pending = await asyncio.wait(tasks, timeout=REQUESTS_TIME_BUDGET)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    past_days_data = []
+    new_past_days_data = []
+    for past_dt in past_dts:
+        if past_dt.date() in stored_past_days_data:
+            past_days_data.append(stored_past_days_data[past_dt.date()][1])
+        elif not (task := past_tasks[past_dt]).cancelled() and not task.exception():
+            past_days_data.append(task.result())
+            if past_dt.date() < now.date():
+                new_past_days_data.append((past_dt.date(), task.result()['timezone_offset'], task.result()))
+
+    if present_future_task.cancelled() or near_future_task and near_future_task.cancelled():
+        raise asyncio.TimeoutError('OpenWeatherMap requests exceeded the time budget')
+    present_future_data: dict = present_future_task.result()
+    near_future_data: dict | None = near_future_task.result() if near_future_task else None
+    timezone = datetime.timezone(datetime.timedelta(seconds=present_future_data['timezone_offset']))
+
+    await flanaapis.weather.history.add_days_data('open_weather_map', latitude, longitude, new_past_days_data)
 
     return past_days_data, present_future_data, near_future_data, timezone
@@ -0,0 +1,203 @@
+__all__ = ['WeatherRefresher', 'weather_refresher']
+
+import asyncio
+import collections
+import functools
+import os
+import time
+
+import flanaapis.weather.functions
+from flanaapis import governor, upstream_calls
+from flanaapis.cache import TTLCache
+from flanaapis.geolocation.functions import quantize_coordinates
+
+CALLS_PER_MINUTE = 30
+ESTIMATED_REFRESH_CALLS = {
+    'open_weather_map': 2,
+    'visual_crossing': 1,
+    'google': 1
+}
+HOT_CELL_MIN_REQUESTS = 3
+HOT_CELL_WINDOW = 15 * 60
+MAX_TRACKED_CELLS = 4096
+REFRESH_INTERVAL = 30
+REFRESH_MARGIN = 2 * 60
+
+
+class WeatherRefresher:
+    """
+    Refreshes in the background the forecasts of the most requested cells before they expire, so their requests keep
+    hitting the cache.
+
+    A cell is hot if it has been requested at least hot_cell_min_requests times in the last hot_cell_window seconds. At
+    most max_tracked_cells cells are tracked, the least recently requested are forgotten first.
+    Only the requested horizons (days_back and days_ahead) and providers of the cell that are about to expire are
+    refreshed. The refreshes never spend more than calls_per_minute upstream calls per minute
+    (FLANAAPIS_WEATHER_REFRESH_CALLS_PER_MINUTE environment variable by default), so they can't starve the interactive
+    requests: a refresh starts if the budget covers its estimated calls and is charged the calls it really made.
+    """
+
+    def __init__(
+        self,
+        calls_per_minute: float = None,
+        hot_cell_min_requests=HOT_CELL_MIN_REQUESTS,
+        hot_cell_window: float = HOT_CELL_WINDOW,
+        refresh_margin: float = REFRESH_MARGIN,
+        max_tracked_cells=MAX_TRACKED_CELLS
+    ):
+        self._calls_per_minute = calls_per_minute
+        self.hot_cell_min_requests = hot_cell_min_requests
+        self.hot_cell_window = hot_cell_window
+        self.refresh_margin = refresh_margin
+        self.max_tracked_cells = max_tracked_cells
+        self._available_calls: float | None = None
+        self._last_budget_update = time.monotonic()
+        self._cell_requests: dict[tuple[float, float], collections.deque[float]] = {}
+        self._cell_coordinates: dict[tuple[float, float], tuple[float, float]] = {}
+        self._cell_keys: dict[tuple[float, float], dict[tuple, float]] = {}
+        self._refresh_tasks: dict[tuple[float, float], asyncio.Task] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def calls_per_minute(self) -> float:
+        if self._calls_per_minute is None:
+            return float(os.environ.get('FLANAAPIS_WEATHER_REFRESH_CALLS_PER_MINUTE', CALLS_PER_MINUTE))
+
+        return self._calls_per_minute
+
+    def _charge_calls(self, calls: float):
+        # the budget can go negative if a refresh made more calls than estimated
+        self._update_available_calls()
+        self._available_calls -= calls
+
+    def _consume_calls(self, calls: float) -> bool:
+        self._update_available_calls()
+        if self._available_calls < calls:
+            return False
+
+        self._available_calls -= calls
+        return True
+
+    def _expires_soon(self, forecast_cache: TTLCache, key: tuple) -> bool:
+        return (expires_in := forecast_cache.expires_in(key)) is None or expires_in < self.refresh_margin
+
+    def _forget_cell(self, cell: tuple[float, float]):
+        del self._cell_requests[cell]
+        del self._cell_coordinates[cell]
+        del self._cell_keys[cell]
+
+    def _forget_old_requests(self, cell: tuple[float, float], min_time: float):
+        requests = self._cell_requests[cell]
+        while requests and requests[0] < min_time:
+            requests.popleft()
+        if not requests:
+            self._forget_cell(cell)
+            return
+
+        for key, last_request_time in tuple(self._cell_keys[cell].items()):
+            if last_request_time < min_time:
+                del self._cell_keys[cell][key]
+
+    def _forget_refresh(self, cell: tuple[float, float], task: asyncio.Task):
+        self._refresh_tasks.pop(cell, None)
+        if not task.cancelled():
+            task.exception()  # a failed refresh is simply retried in the next round
+
+    def _get_expiring_keys(self, cell: tuple[float, float]) -> dict[tuple, list[str]]:
+        """
+        Returns the requested cache keys of the cell with the providers whose forecasts are about to expire. The shorter
+        horizons are served by the whole one while it is cached, so they are only refreshed when nobody requests the
+        whole horizon and it is about to expire too.
+        """
+
+        expiring_keys = {}
+        for key in self._cell_keys[cell]:
+            if providers := [
+                provider for provider, forecast_cache in flanaapis.weather.functions.forecast_caches.items()
+                if self._expires_soon(forecast_cache, key) and (key == cell or cell not in self._cell_keys[cell] and self._expires_soon(forecast_cache, cell))
+            ]:
+                expiring_keys[key] = providers
+
+        return expiring_keys
+
+    async def _refresh(self, latitude: float, longitude: float, expiring_keys: dict[tuple, list[str]], estimated_calls: int):
+        with upstream_calls.counting_calls() as call_counter:
+            try:
+                await asyncio.gather(*(
+                    flanaapis.weather.functions.refresh_cached_weathers(latitude, longitude, providers, *(key[2:] or (None, None)))
+                    for key, providers in expiring_keys.items()
+                ))
+            finally:
+                self._charge_calls(call_counter.calls - estimated_calls)
+
+    def _update_available_calls(self):
+        now = time.monotonic()
+        if self._available_calls is None:
+            self._available_calls = self.calls_per_minute
+        self._available_calls = min(self.calls_per_minute, self._available_calls + (now - self._last_budget_update) * self.calls_per_minute / 60)
+        self._last_budget_update = now
+
+    def get_hot_cells(self) -> list[tuple[float, float]]:
+        """Returns the hot cells, the most requested first, and forgets the cells without recent requests."""
+
+        min_time = time.monotonic() - self.hot_cell_window
+        for cell in tuple(self._cell_requests):
+            self._forget_old_requests(cell, min_time)
+
+        return sorted(
+            (cell for cell, requests in self._cell_requests.items() if len(requests) >= self.hot_cell_min_requests),
+            key=lambda cell: len(self._cell_requests[cell]),
+            reverse=True
+        )
+
+    def record_request(self, latitude: float, longitude: float, days_back: int = None, days_ahead: int = None):
+        key = cell = quantize_coordinates(latitude, longitude, flanaapis.weather.functions.FORECAST_CACHE_GRID_SIZE)
+        if days_back is not None or days_ahead is not None:
+            key = (*cell, days_back, days_ahead)
+
+        # the cell is moved to the end, so the cells are sorted from the least to the most recently requested
+        now = time.monotonic()
+        self._cell_requests[cell] = self._cell_requests.pop(cell, None) or collections.deque()
+        self._cell_requests[cell].append(now)
+        self._cell_coordinates[cell] = (latitude, longitude)
+        self._cell_keys.setdefault(cell, {})[key] = now
+        self._forget_old_requests(cell, now - self.hot_cell_window)
+        while len(self._cell_requests) > self.max_tracked_cells:
+            self._forget_cell(next(iter(self._cell_requests)))
+
+    def refresh_hot_cells(self) -> list[tuple[float, float]]:
+        """Starts the refresh of the hot cells that are about to expire while the budget allows it. Returns the cells."""
+
+        refreshed_cells = []
+        for cell in self.get_hot_cells():
+            if cell in self._refresh_tasks or not (expiring_keys := self._get_expiring_keys(cell)):
+                continue
+            estimated_calls = sum(ESTIMATED_REFRESH_CALLS[provider] for providers in expiring_keys.values() for provider in providers)
+            if not self._consume_calls(estimated_calls):
+                break
+
+            self._refresh_tasks[cell] = governor.create_task(self._refresh(*self._cell_coordinates[cell], expiring_keys, estimated_calls), governor.Priority.BACKGROUND)
+            self._refresh_tasks[cell].add_done_callback(functools.partial(self._forget_refresh, cell))
+            refreshed_cells.append(cell)
+
+        return refreshed_cells
+
+    async def run(self, interval: float = REFRESH_INTERVAL):
+        while True:
+            self.refresh_hot_cells()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = REFRESH_INTERVAL):
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self.run(interval))
+
+    async def stop(self):
+        for task in (self._task, *self._refresh_tasks.values()):
+            if task:
+                task.cancel()
+        await asyncio.gather(*(task for task in (self._task, *self._refresh_tasks.values()) if task), return_exceptions=True)
+        self._task = None
+        self._refresh_tasks.clear()
+
+
+weather_refresher = WeatherRefresher()
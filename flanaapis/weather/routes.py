@@ -1,20 +1,200 @@
-from fastapi import APIRouter
+import dataclasses
+import datetime
+import json
+from enum import Enum
+from typing import AsyncIterator
 
+import msgpack
+import ujson
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from flanaapis import sessions
+from flanaapis.geolocation.functions import haversine_distance
 from flanaapis.weather import functions
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+BATCH_MAX_SIZE = 100
+INSTANT_WEATHER_FIELDS = tuple(field.name for field in dataclasses.fields(InstantWeather))
 
 router = APIRouter()
 
 
-@router.get("/weather")
-async def weather(latitude: float, longitude: float):
-    current_weather, day_weathers = await functions.get_day_weathers_by_place(latitude, longitude)
+class Coordinates(BaseModel):
+    latitude: float
+    longitude: float
+
+
+class WeatherFormat(str, Enum):
+    JSON = 'json'
+    COLUMNAR = 'columnar'
+    MSGPACK = 'msgpack'
+
+
+def date_time_to_timestamp(date_time: datetime.datetime | None) -> float | None:
+    return date_time.timestamp() if date_time else None
+
+
+def day_weather_to_columns(day_weather: DayWeather, fields: set[str] = None) -> dict:
+    """Like day_weather_to_dict but with the hourly data as a list per InstantWeather field, read from the model directly."""
+
+    instant_weathers = day_weather.instant_weathers
+    columns = {'date_time': [instant_weather.date_time.timestamp() for instant_weather in instant_weathers]}
+    for field_name in INSTANT_WEATHER_FIELDS:
+        if field_name != 'date_time' and (not fields or field_name in fields):
+            columns[field_name] = [getattr(instant_weather, field_name) for instant_weather in instant_weathers]
+
+    return {
+        'date': datetime.datetime(day_weather.date.year, day_weather.date.month, day_weather.date.day).timestamp(),
+        'timezone': str(day_weather.timezone),
+        'sunrise': date_time_to_timestamp(day_weather.sunrise),
+        'sunset': date_time_to_timestamp(day_weather.sunset),
+        'min_temperature': day_weather.min_temperature,
+        'max_temperature': day_weather.max_temperature,
+        'instant_weathers': columns
+    }
+
+
+def day_weather_to_dict(day_weather: DayWeather, fields: set[str] = None) -> dict:
+    day_weather_vars = day_weather.to_dict()
+    day_weather_vars['instant_weathers'] = [instant_weather_to_dict(instant_weather, fields) for instant_weather in day_weather.instant_weathers]
+
+    return day_weather_vars
+
+
+def instant_weather_to_dict(instant_weather: InstantWeather, fields: set[str] = None) -> dict:
+    instant_weather_vars = instant_weather.to_dict()
+    if fields:
+        instant_weather_vars = {k: v for k, v in instant_weather_vars.items() if k in fields}
+
+    return instant_weather_vars
+
+
+def parse_fields(fields: str | None) -> set[str] | None:
+    """Parses the comma separated InstantWeather fields to return (date_time is always returned)."""
+
+    if not fields:
+        return
+
+    fields = {field_name.strip() for field_name in fields.split(',')}
+    if unknown_fields := fields.difference(INSTANT_WEATHER_FIELDS):
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+
+    return fields | {'date_time'}
+
 
-    for i, day_weather in enumerate(day_weathers):
-        for j, instant_weather in enumerate(day_weather.instant_weathers):
-            day_weather.instant_weathers[j] = instant_weather.to_dict()
-        day_weathers[i] = day_weather.to_dict()
+def resolve_location(latitude: float, longitude: float, radius: float) -> dict:
+    """Returns the location whose forecast is used for the coordinates: a near cached one or the coordinates themselves."""
+
+    forecast_latitude, forecast_longitude = functions.find_cached_coordinates(latitude, longitude, radius) or (latitude, longitude)
 
     return {
-        'current_weather': current_weather.to_dict(),
-        'day_weathers': day_weathers
+        'latitude': forecast_latitude,
+        'longitude': forecast_longitude,
+        'distance': round(haversine_distance(latitude, longitude, forecast_latitude, forecast_longitude), 3)
     }
+
+
+@router.get("/weather")
+async def weather(
+    latitude: float,
+    longitude: float,
+    radius: float = Query(functions.FORECAST_REUSE_RADIUS, ge=0, le=functions.FORECAST_REUSE_MAX_RADIUS),
+    days_back: int = Query(None, ge=0),
+    days_ahead: int = Query(None, ge=0),
+    fields: str = None,
+    format_: WeatherFormat = Query(WeatherFormat.JSON, alias='format')
+):
+    fields = parse_fields(fields)
+
+    location = resolve_location(latitude, longitude, radius)
+    current_weather, day_weathers = await functions.get_day_weathers_by_place(location['latitude'], location['longitude'], session=sessions.get_session(), days_back=days_back, days_ahead=days_ahead)
+
+    if format_ is WeatherFormat.JSON:
+        return {
+            'location': location,
+            'current_weather': instant_weather_to_dict(current_weather, fields),
+            'day_weathers': [day_weather_to_dict(day_weather, fields) for day_weather in day_weathers]
+        }
+
+    content = {
+        'location': location,
+        'current_weather': instant_weather_to_dict(current_weather, fields),
+        'day_weathers': [day_weather_to_columns(day_weather, fields) for day_weather in day_weathers]
+    }
+    if format_ is WeatherFormat.MSGPACK:
+        return Response(msgpack.packb(content), media_type='application/msgpack')
+
+    return Response(ujson.dumps(content), media_type='application/json')
+
+
+@router.post("/weather/batch")
+async def weather_batch(places: list[Coordinates]):
+    if len(places) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f'The batch can not have more than {BATCH_MAX_SIZE} places')
+
+    results = []
+    for place, weathers in zip(places, await functions.get_batch_day_weathers(((place.latitude, place.longitude) for place in places), session=sessions.get_session())):
+        if isinstance(weathers, Exception):
+            results.append({'latitude': place.latitude, 'longitude': place.longitude, 'error': str(weathers) or type(weathers).__name__})
+        else:
+            current_weather, day_weathers = weathers
+            results.append({
+                'latitude': place.latitude,
+                'longitude': place.longitude,
+                'current_weather': current_weather.to_dict(),
+                'day_weathers': [day_weather_to_dict(day_weather) for day_weather in day_weathers]
+            })
+
+    return results
+
+
+@router.get("/weather/stream")
+async def weather_stream(
+    latitude: float,
+    longitude: float,
+    radius: float = Query(functions.FORECAST_REUSE_RADIUS, ge=0, le=functions.FORECAST_REUSE_MAX_RADIUS),
+    days_back: int = Query(None, ge=0),
+    days_ahead: int = Query(None, ge=0),
+    fields: str = None
+):
+    async def iterate_lines() -> AsyncIterator[str]:
+        async for providers, pending_providers, current_weather, day_weathers in functions.iterate_day_weathers_by_place(location['latitude'], location['longitude'], session=sessions.get_session(), days_back=days_back, days_ahead=days_ahead):
+            document = {
+                'location': location,
+                'providers': providers,
+                'pending_providers': pending_providers,
+                'final': not pending_providers,
+                'current_weather': instant_weather_to_dict(current_weather, fields),
+                'day_weathers': [day_weather_to_dict(day_weather, fields) for day_weather in day_weathers]
+            }
+            yield f'{json.dumps(document)}\n'
+
+    fields = parse_fields(fields)
+    location = resolve_location(latitude, longitude, radius)
+
+    return StreamingResponse(iterate_lines(), media_type='application/x-ndjson')
+
+
+@router.get("/weather/cache")
+async def weather_cache():
+    return {provider: forecast_cache.stats for provider, forecast_cache in functions.forecast_caches.items()} | {'current_weather': functions.current_weather_cache.stats}
+
+
+@router.get("/weather/current")
+async def weather_current(latitude: float, longitude: float, fields: str = None):
+    fields = parse_fields(fields)
+    if not (current_weather := await functions.get_current_weather(latitude, longitude, session=sessions.get_session())):
+        raise HTTPException(status_code=503, detail='No weather provider is available')
+
+    return {'current_weather': instant_weather_to_dict(current_weather, fields)}
+
+
+@router.get("/weather/history")
+async def weather_history(latitude: float, longitude: float, from_date: datetime.date = Query(alias='from'), to_date: datetime.date = Query(alias='to')):
+    async def iterate_lines() -> AsyncIterator[str]:
+        async for instant_weather in functions.iterate_history_instant_weathers(latitude, longitude, from_date, to_date):
+            yield f'{json.dumps(instant_weather.to_dict())}\n'
+
+    return StreamingResponse(iterate_lines(), media_type='application/x-ndjson')
@@ -1,18 +1,24 @@
-__all__ = ['create_instant_weather_by_data', 'get_weather_api_data', 'get_day_weathers_by_place']
+__all__ = ['create_instant_weather_by_data', 'get_current_weather', 'get_weather_api_data', 'get_day_weathers_by_place']
 
 import datetime
 import os
 from typing import overload
 
+import aiohttp
 import flanautils
 
 import flanaapis.geolocation.functions
+import flanaapis.geolocation.timezones
 import flanaapis.weather.functions
+import flanaapis.weather.history
+from flanaapis import upstream_calls
 from flanaapis.exceptions import ResponseError
 from flanaapis.geolocation.models import Place
 from flanaapis.weather.models import DayWeather, InstantWeather, Precipitation, PrecipitationType
 
 BASE_ENDPOINT = f'https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline'
+PAST_DAYS = 5
+FUTURE_DAYS = 15
 
 
 def create_instant_weather_by_data(data: dict, timezone: datetime.timezone) -> InstantWeather:
@@ -35,26 +41,41 @@ def create_instant_weather_by_data(data: dict, timezone: datetime.timezone) -> I
     )
 
 
+async def get_current_weather(latitude: float, longitude: float, session: aiohttp.ClientSession = None) -> InstantWeather:
+    """Requests only the current conditions of today."""
+
+    parameters = {
+        'key': os.environ['VISUAL_CROSSING_API_KEY'],
+        'unitGroup': 'metric',
+        'lang': 'es',
+        'include': 'current'
+    }
+    upstream_calls.count_call()
+    api_data = await flanautils.get_request(f'{BASE_ENDPOINT}/{latitude},{longitude}/today', parameters, session=session)
+
+    return create_instant_weather_by_data(api_data['currentConditions'], datetime.timezone(datetime.timedelta(hours=api_data['tzoffset'])))
+
+
 @overload
-async def get_day_weathers_by_place(place: Place) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+async def get_day_weathers_by_place(place: Place, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(place_query: str) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+async def get_day_weathers_by_place(place_query: str, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
     pass
 
 
 @overload
-async def get_day_weathers_by_place(latitude: float, longitude: float) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+async def get_day_weathers_by_place(latitude: float, longitude: float, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
     pass
 
 
-async def get_day_weathers_by_place(latitude: float | str, longitude: float = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
+async def get_day_weathers_by_place(latitude: float | str, longitude: float = None, session: aiohttp.ClientSession = None, days_back: int = None, days_ahead: int = None) -> tuple[InstantWeather | None, list[DayWeather] | None]:
     latitude, longitude = await flanaapis.geolocation.functions.ensure_coordinates(latitude, longitude)
 
     try:
-        api_data, timezone = await get_weather_api_data(latitude, longitude)
+        api_data, timezone = await get_weather_api_data(latitude, longitude, session, days_back, days_ahead)
     except ResponseError:
         return None, None
 
@@ -81,8 +102,9 @@ async def get_day_weathers_by_place(latitude: float | str, longitude: float = No
 
         # Hourly precipitation volumes
         for hour_data in day_data.get('hours', ()):
-            day_weather.instant_weathers.append(create_instant_weather_by_data(hour_data, timezone))
-            hour_date = datetime.datetime.fromtimestamp(hour_data['datetimeEpoch'], timezone)
+            instant_weather = create_instant_weather_by_data(hour_data, timezone)
+            day_weather.instant_weathers.append(instant_weather)
+            hour_date = instant_weather.date_time
             if hour_rain_volume := hour_data.get('precip') or 0:
                 precipitations.append(Precipitation(PrecipitationType.RAIN, hour_date, hour_date + datetime.timedelta(hours=1), hour_rain_volume))
             if hour_snow_volume := hour_data.get('snow') or 0:
@@ -97,17 +119,60 @@ async def get_day_weathers_by_place(latitude: float | str, longitude: float = No
     return current_weather, day_weathers
 
 
-async def get_weather_api_data(latitude: float, longitude: float) -> tuple[dict, datetime.timezone]:
-    now = datetime.datetime.now()
-    start_date = now - datetime.timedelta(days=5)
-    end_date = now + datetime.timedelta(days=15)
+async def get_weather_api_data(
+    latitude: float,
+    longitude: float,
+    session: aiohttp.ClientSession = None,
+    days_back: int = None,
+    days_ahead: int = None
+) -> tuple[dict, datetime.timezone]:
+    """
+    Requests the timeline from days_back days ago (PAST_DAYS by default) to days_ahead days (FUTURE_DAYS by default).
+    The days are those of the location, so the stored past days are looked up with its timezone (utc if it can't be
+    found offline).
+    """
+
+    days_back = PAST_DAYS if days_back is None else min(days_back, PAST_DAYS)
+    days_ahead = FUTURE_DAYS if days_ahead is None else min(days_ahead, FUTURE_DAYS)
+
+    if timezone_data := await flanaapis.geolocation.timezones.find_timezone(latitude, longitude):
+        location_timezone = datetime.timezone(datetime.timedelta(seconds=timezone_data['gmtOffset']))
+    else:
+        location_timezone = datetime.timezone.utc
+    now = datetime.datetime.now(location_timezone)
+    start_date = now - datetime.timedelta(days=days_back)
+    end_date = now + datetime.timedelta(days=days_ahead)
     parameters = {
         'key': os.environ['VISUAL_CROSSING_API_KEY'],
         'unitGroup': 'metric',
         'lang': 'es'
     }
 
-    api_data = await flanautils.get_request(f'{BASE_ENDPOINT}/{latitude},{longitude}/{int(start_date.timestamp())}/{int(end_date.timestamp())}', parameters)
+    past_dates = [(start_date + datetime.timedelta(days=days)).date() for days in range(days_back)]
+    stored_past_days_data = await flanaapis.weather.history.get_days_data('visual_crossing', latitude, longitude, past_dates)
+    if past_dates and len(stored_past_days_data) == len(past_dates):
+        start_date = now - datetime.timedelta(days=1)  # one day of margin in case the timezone of the location is unknown
+
+    upstream_calls.count_call()
+    api_data = await flanautils.get_request(f'{BASE_ENDPOINT}/{latitude},{longitude}/{int(start_date.timestamp())}/{int(end_date.timestamp())}', parameters, session=session)
     timezone = datetime.timezone(datetime.timedelta(hours=api_data['tzoffset']))
 
+    today = datetime.datetime.now(timezone).date()
+    await flanaapis.weather.history.add_days_data(
+        'visual_crossing',
+        latitude,
+        longitude,
+        (
+            (date, int(api_data['tzoffset'] * 3600), day_data)
+            for day_data in api_data['days']
+            if (date := datetime.date.fromisoformat(day_data['datetime'])) < today and date not in stored_past_days_data
+        )
+    )
+
+    if stored_past_days_data:
+        api_data['days'] = sorted(
+            [day_data for _, day_data in stored_past_days_data.values()] + [day_data for day_data in api_data['days'] if datetime.date.fromisoformat(day_data['datetime']) not in stored_past_days_data],
+            key=lambda day_data: day_data['datetime']
+        )
+
     return api_data, timezone
@@ -0,0 +1,78 @@
+"""
+Benchmark of the merge of the forecasts of the providers: DayWeather.mean day by day, as merge_providers_weathers does
+without numpy, against the vectorized ensemble.mean_day_weathers. The forecasts are the ones of the replayed responses
+of tests/fixtures/replay/weather.json.
+
+Run with: python -m tests.benchmarks.bench_ensemble
+"""
+
+import asyncio
+import datetime
+import math
+import os
+import tempfile
+import timeit
+
+import flanautils
+
+from flanaapis.weather import ensemble, functions, google, open_weather_map, visual_crossing
+from flanaapis.weather.models import DayWeather
+from tests.replay import Cassette
+
+LATITUDE = 36.72
+LONGITUDE = -4.42
+RATIOS = [0.5, 0.3, 0.2]
+REPETITIONS = 50
+
+
+def day_weather_mean(providers_day_weathers: list[list[DayWeather] | None], ratios: list[float]) -> list[DayWeather]:
+    all_day_weathers = [day_weathers for day_weathers in providers_day_weathers if day_weathers]
+    final_day_weathers = []
+    date = min(day_weathers[0].date for day_weathers in all_day_weathers)
+    last_date = max(day_weathers[-1].date for day_weathers in all_day_weathers)
+    while date <= last_date:
+        all_day_weather = [flanautils.find(day_weathers or (), condition=lambda day_weather: day_weather.date == date) for day_weathers in providers_day_weathers]
+        if len(present_day_weather := [day_weather for day_weather in all_day_weather if day_weather]) == 1:
+            final_day_weathers.append(present_day_weather[0])
+        elif present_day_weather:
+            final_day_weathers.append(DayWeather.mean(present_day_weather, functions.redistribute_ratios(ratios, all_day_weather)))
+        date = date + datetime.timedelta(days=1)
+
+    return final_day_weathers
+
+
+def get_temperatures(day_weathers: list[DayWeather]) -> list[float | None]:
+    return [instant_weather.temperature for day_weather in day_weathers for instant_weather in day_weather.instant_weathers]
+
+
+async def get_providers_day_weathers() -> list[list[DayWeather] | None]:
+    return [
+        (await open_weather_map.get_day_weathers_by_place(LATITUDE, LONGITUDE))[1],
+        (await visual_crossing.get_day_weathers_by_place(LATITUDE, LONGITUDE))[1],
+        (await google.get_day_weathers_by_place(LATITUDE, LONGITUDE))[1]
+    ]
+
+
+def main():
+    if not ensemble.can_mean_day_weathers(RATIOS):
+        print('numpy is not installed')
+        return
+
+    with tempfile.TemporaryDirectory() as temporary_directory, Cassette('weather', mode='replay'):
+        os.environ['FLANAAPIS_WEATHER_HISTORY_PATH'] = os.path.join(temporary_directory, 'weather_history.sqlite3')
+        os.environ['FLANAAPIS_PLACE_CACHE_PATH'] = os.path.join(temporary_directory, 'place_cache.sqlite3')
+        providers_day_weathers = asyncio.run(get_providers_day_weathers())
+
+    expected_temperatures = get_temperatures(day_weather_mean(providers_day_weathers, RATIOS))
+    temperatures = get_temperatures(ensemble.mean_day_weathers(providers_day_weathers, RATIOS))
+    assert len(expected_temperatures) == len(temperatures) and all(
+        expected is None and temperature is None or math.isclose(expected, temperature) for expected, temperature in zip(expected_temperatures, temperatures)
+    ), 'the results differ'
+
+    print(f'{sum(bool(day_weathers) for day_weathers in providers_day_weathers)} providers, {len(expected_temperatures)} hours')
+    for name, function in (('DayWeather.mean', day_weather_mean), ('ensemble.mean_day_weathers', ensemble.mean_day_weathers)):
+        print(f'{name}: {timeit.timeit(lambda: function(providers_day_weathers, RATIOS), number=REPETITIONS) / REPETITIONS * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
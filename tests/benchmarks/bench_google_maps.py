@@ -0,0 +1,95 @@
+"""
+Benchmark of the two extraction modes of google_maps.find_place against a local server that serves the saved pages
+tests/fixtures/google_maps_search.html and tests/fixtures/google_maps_search_response.txt, with the delays of the
+resources below: navigation until the url has the coordinates against the interception of the search response.
+
+The page requests the search response and, RENDER_DELAY after it, writes the coordinates in the url like Maps does.
+
+Requires Chromium (python -m playwright install chromium).
+
+Run with: python -m tests.benchmarks.bench_google_maps
+"""
+
+import asyncio
+import pathlib
+import statistics
+import time
+from unittest import mock
+
+import playwright.async_api
+from aiohttp import web
+
+from flanaapis.geolocation import google_maps
+
+FIXTURES_PATH = pathlib.Path(__file__).parent.parent / 'fixtures'
+PLACE_QUERY = 'malaga'
+REPETITIONS = 10
+SCRIPT_DELAY = 0.05
+SEARCH_RESPONSE_DELAY = 0.15
+STATIC_DELAY = 0.3
+TILE_DELAY = 0.4
+
+
+async def create_server() -> tuple[web.AppRunner, str]:
+    async def page(_request: web.Request) -> web.Response:
+        return web.Response(body=(FIXTURES_PATH / 'google_maps_search.html').read_bytes(), content_type='text/html')
+
+    async def search_response(_request: web.Request) -> web.Response:
+        await asyncio.sleep(SEARCH_RESPONSE_DELAY)
+        return web.Response(body=(FIXTURES_PATH / 'google_maps_search_response.txt').read_bytes(), content_type='application/json')
+
+    async def static(request: web.Request) -> web.Response:
+        if request.match_info['name'].endswith('.js'):
+            await asyncio.sleep(SCRIPT_DELAY)
+            return web.Response(text='window.APP_INITIALIZATION_STATE = [];', content_type='application/javascript')
+
+        await asyncio.sleep(STATIC_DELAY)
+        return web.Response(body=b'\0' * 20000, content_type='application/octet-stream')
+
+    async def tile(_request: web.Request) -> web.Response:
+        await asyncio.sleep(TILE_DELAY)
+        return web.Response(body=b'\0' * 20000, content_type='image/png')
+
+    app = web.Application()
+    app.router.add_get('/maps/search/{query}', page)
+    app.router.add_get('/maps/static/{name}', static)
+    app.router.add_get('/maps/vt', tile)
+    app.router.add_get('/search', search_response)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = site._server.sockets[0].getsockname()[:2]
+
+    return runner, f'http://{host}:{port}'
+
+
+async def run_benchmarks():
+    runner, base_url = await create_server()
+    try:
+        with mock.patch.object(google_maps, 'BASE_URL', f'{base_url}/maps/search'):
+            for name, intercept_network in (('navigation', False), ('network interception', True)):
+                elapsed_times = []
+                for _ in range(REPETITIONS + 1):  # the first one warms up the browser
+                    start_time = time.perf_counter()
+                    place = await google_maps.find_place(PLACE_QUERY, intercept_network)
+                    elapsed_times.append(time.perf_counter() - start_time)
+                    assert place and round(place.latitude, 2) == 36.72 and round(place.longitude, 2) == -4.42, place
+                elapsed_times = elapsed_times[1:]
+
+                print(f'{name:<21} min {min(elapsed_times) * 1000:6.0f} ms | p50 {statistics.median(elapsed_times) * 1000:6.0f} ms | max {max(elapsed_times) * 1000:6.0f} ms')
+    finally:
+        await google_maps.browser_pool.stop()
+        await runner.cleanup()
+
+
+def main():
+    try:
+        asyncio.run(run_benchmarks())
+    except playwright.async_api.Error as e:
+        print(f'Chromium could not be launched: {e.message.splitlines()[0]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Benchmark of the single-pass regex extractor of the Google weather page against the BeautifulSoup path, using
+tests/fixtures/google_weather.html.
+
+Run with: python -m tests.benchmarks.bench_google_weather_scraper
+"""
+
+import pathlib
+import timeit
+import tracemalloc
+
+from flanaapis.scraping import google_weather_scraper
+
+FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'google_weather.html'
+OUTPUT_UNITS = {'temp': 'c', 'speed': 'km/h'}
+REPETITIONS = 20
+
+
+def main():
+    with open(FIXTURE_PATH, encoding='utf-8') as file:
+        html = file.read()
+
+    parsers = (('beautifulsoup', google_weather_scraper._get_forecast_by_soup), ('regex', google_weather_scraper._extract_forecast))
+    assert parsers[0][1](html, OUTPUT_UNITS) == parsers[1][1](html, OUTPUT_UNITS), 'the results differ'
+
+    for name, parser in parsers:
+        elapsed_time = timeit.timeit(lambda: parser(html, OUTPUT_UNITS), number=REPETITIONS) / REPETITIONS
+
+        tracemalloc.start()
+        parser(html, OUTPUT_UNITS)
+        _, peak_size = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f'{name}: {elapsed_time * 1000:.2f} ms, peak memory: {peak_size / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
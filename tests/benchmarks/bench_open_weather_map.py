@@ -0,0 +1,210 @@
+"""
+Benchmark of the OpenWeatherMap parser (open_weather_map.get_day_weathers_by_place) fed with the payloads of
+tests/fixtures/open_weather_map.json instead of the API responses, against the previous assembly of the days, which
+searched the list of days for every record and merged a throwaway DayWeather per hour. It also times the decoding of
+every hourly record into an InstantWeather against the previous create_instant_weather_by_data, which merged the nested
+dicts of the 3-hour forecast format into a new dict per record.
+
+Run with: python -m tests.benchmarks.bench_open_weather_map
+"""
+
+import asyncio
+import copy
+import datetime
+import json
+import pathlib
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+from unittest import mock
+
+import flanautils
+
+import flanaapis.weather.functions
+from flanaapis.weather import open_weather_map
+from flanaapis.weather.models import DayPhases, DayWeather, InstantWeather, Precipitation, PrecipitationType
+
+FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'open_weather_map.json'
+REPETITIONS = 50
+
+
+def load_payloads() -> tuple[list[dict], dict, dict, datetime.timezone]:
+    with open(FIXTURE_PATH) as file:
+        payloads = json.load(file)
+
+    timezone = datetime.timezone(datetime.timedelta(seconds=payloads['present_future']['timezone_offset']))
+    return payloads['past_days'], payloads['present_future'], payloads['near_future'], timezone
+
+
+def legacy_create_instant_weather_by_data(data: dict, timezone: datetime.timezone) -> InstantWeather:
+    def format_old_open_weather_map_api_data() -> dict:
+        return data | data['main'] | {
+            'clouds': sum(data['clouds'].values()),
+            'wind_deg': data.get('wind', {}).get('deg'),
+            'wind_gust': data.get('wind', {}).get('gust'),
+            'wind_speed': data.get('wind', {}).get('speed')
+        }
+
+    if 'main' in data:
+        data = format_old_open_weather_map_api_data()
+
+    return InstantWeather(
+        date_time=datetime.datetime.fromtimestamp(data['dt'], tz=timezone),
+        clouds=data.get('clouds'),
+        description=data.get('weather', ({},))[0].get('description'),
+        dew_point=data.get('dew_point'),
+        humidity=data.get('humidity'),
+        icon=data.get('weather', ({},))[0].get('icon'),
+        precipitation_probability=pop * 100 if (pop := data.get('pop')) else pop,  # p -> %
+        pressure=data.get('pressure'),
+        temperature=data.get('temp'),
+        temperature_feel=data.get('feels_like'),
+        uvi=data.get('uvi'),
+        visibility=visibility / 1000 if (visibility := data.get('visibility')) else visibility,  # visibility m -> km
+        wind_degrees=data.get('wind_deg'),
+        wind_gust=data.get('wind_gust'),
+        wind_speed=wind_speed * 3.6 if (wind_speed := data.get('wind_speed')) else wind_speed  # wind_speed m/s -> km/h
+    )
+
+
+async def legacy_get_day_weathers_by_place(latitude: float, longitude: float) -> tuple[InstantWeather, list[DayWeather]]:
+    day_weathers = []
+
+    past_days_data, present_future_data, near_future_data, timezone = await open_weather_map.get_weather_api_data(latitude, longitude)
+    current_weather = legacy_create_instant_weather_by_data(present_future_data['current'], timezone)
+    precipitations: list[Precipitation] = []
+
+    # ----- hourly data -----
+    hourly_data = [hour_data for past_day_data in past_days_data for hour_data in past_day_data['hourly']][:-1]
+    hourly_data += present_future_data['hourly']
+    hourly_data += near_future_data['list']
+
+    for hour_data in hourly_data:
+        hour_dt = datetime.datetime.fromtimestamp(hour_data['dt'], tz=timezone)
+        day_weather = flanautils.find(day_weathers, condition=lambda day_weather_: day_weather_.date == hour_dt.date())
+        if not day_weather or hour_dt.date() != day_weather.date:
+            day_weathers.append(day_weather := DayWeather(hour_dt.date(), timezone))
+
+        if hourly_precipitations := open_weather_map.get_hourly_precipitations(hour_dt, hour_data):
+            precipitations.extend(hourly_precipitations)
+
+        temp_day_weather = DayWeather()
+        temp_day_weather.instant_weathers.append(legacy_create_instant_weather_by_data(hour_data, timezone))
+        day_weather.merge(temp_day_weather)
+
+    # ----- daily data -----
+    for past_day_data in past_days_data:
+        open_weather_map.add_daily_attributes_from_current_data_format(day_weathers, past_day_data, timezone)
+
+    open_weather_map.add_daily_attributes_from_current_data_format(day_weathers, present_future_data, timezone)
+
+    for future_day_data in present_future_data['daily']:
+        day_dt = datetime.datetime.fromtimestamp(future_day_data['dt'], tz=timezone).replace(hour=0)
+        day_weather = flanautils.find(day_weathers, condition=lambda day_weather_: day_weather_.date == day_dt.date())
+        if not day_weather:
+            day_weather = DayWeather(day_dt.date(), timezone)
+            day_weathers.append(day_weather)
+
+        day_weather.sunrise = datetime.datetime.fromtimestamp(future_day_data['sunrise'], timezone)
+        day_weather.sunset = datetime.datetime.fromtimestamp(future_day_data['sunset'], timezone)
+        day_weather.min_temperature = future_day_data['temp']['min']
+        day_weather.max_temperature = future_day_data['temp']['max']
+        if daily_rain := future_day_data.get('rain') or 0:
+            precipitations.append(Precipitation(PrecipitationType.RAIN, day_dt, day_dt + datetime.timedelta(days=1), daily_rain))
+        if daily_snow := future_day_data.get('snow') or 0:
+            precipitations.append(Precipitation(PrecipitationType.SNOW, day_dt, day_dt + datetime.timedelta(days=1), daily_snow))
+
+        temp_day_weather = DayWeather()
+        # noinspection PyTypeChecker
+        for phase_name, hour in DayPhases.items:
+            phase_name = phase_name.lower()
+            hour_dt = day_dt.replace(hour=hour)
+
+            future_day_data_copy = future_day_data.copy()
+            future_day_data_copy['dt'] = int(hour_dt.timestamp())
+            future_day_data_copy['temp'] = future_day_data['temp'][phase_name]
+            future_day_data_copy['feels_like'] = future_day_data['feels_like'][phase_name]
+            if phase_name != 'day':
+                future_day_data_copy['uvi'] = 0
+            temp_day_weather.instant_weathers.append(legacy_create_instant_weather_by_data(future_day_data_copy, timezone))
+            day_weather.merge(temp_day_weather)
+
+    DayWeather.distribute_days_precipitation_volume(day_weathers, precipitations)
+
+    flanaapis.weather.functions.clear_past_precipitation_probability(day_weathers, timezone)
+
+    return current_weather, day_weathers
+
+
+async def parse(
+    get_day_weathers_by_place: Callable[[float, float], Awaitable[tuple[InstantWeather, list[DayWeather]]]],
+    payloads: tuple[list[dict], dict, dict, datetime.timezone],
+    repetitions: int,
+    trace_memory=False
+) -> tuple[float, int]:
+    elapsed_time = 0
+    peak_size = 0
+    with mock.patch.object(open_weather_map, 'get_weather_api_data', mock.AsyncMock()) as get_weather_api_data_mock:
+        for _ in range(repetitions):
+            get_weather_api_data_mock.return_value = copy.deepcopy(payloads)
+            if trace_memory:
+                tracemalloc.start()
+            start_time = time.perf_counter()
+            await get_day_weathers_by_place(36.72, -4.42)
+            elapsed_time += time.perf_counter() - start_time
+            if trace_memory:
+                peak_size = max(peak_size, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+    return elapsed_time / repetitions, peak_size
+
+
+def decode_hours(create_instant_weather_by_data: Callable[[dict, datetime.timezone], InstantWeather], hourly_data: list[dict], timezone: datetime.timezone, repetitions: int) -> tuple[float, int]:
+    start_time = time.perf_counter()
+    for _ in range(repetitions):
+        for hour_data in hourly_data:
+            create_instant_weather_by_data(hour_data, timezone)
+    elapsed_time = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    for hour_data in hourly_data:
+        create_instant_weather_by_data(hour_data, timezone)
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_time / repetitions, peak_size
+
+
+async def get_day_weathers_dicts(get_day_weathers_by_place: Callable[[float, float], Awaitable[tuple[InstantWeather, list[DayWeather]]]], payloads: tuple[list[dict], dict, dict, datetime.timezone]) -> list[dict]:
+    with mock.patch.object(open_weather_map, 'get_weather_api_data', mock.AsyncMock(return_value=copy.deepcopy(payloads))):
+        _, day_weathers = await get_day_weathers_by_place(36.72, -4.42)
+
+    return [day_weather.to_dict() for day_weather in day_weathers]
+
+
+def main():
+    payloads = load_payloads()
+
+    implementations = (('legacy', legacy_get_day_weathers_by_place), ('date index', open_weather_map.get_day_weathers_by_place))
+    results = [asyncio.run(get_day_weathers_dicts(get_day_weathers_by_place, payloads)) for _, get_day_weathers_by_place in implementations]
+    assert results[0] == results[1], 'the results differ'
+
+    for name, get_day_weathers_by_place in implementations:
+        elapsed_time, _ = asyncio.run(parse(get_day_weathers_by_place, payloads, REPETITIONS))
+        _, peak_size = asyncio.run(parse(get_day_weathers_by_place, payloads, 1, trace_memory=True))
+        print(f'{name}: {elapsed_time * 1000:.2f} ms, peak memory {peak_size / 1024:.0f} KiB')
+
+    past_days_data, present_future_data, near_future_data, timezone = payloads
+    hourly_data = [hour_data for past_day_data in past_days_data for hour_data in past_day_data['hourly']] + present_future_data['hourly'] + near_future_data['list']
+    decoders = (('legacy decoding', legacy_create_instant_weather_by_data), ('decoding', open_weather_map.create_instant_weather_by_data))
+    results = [[decoder(hour_data, timezone).to_dict() for hour_data in hourly_data] for _, decoder in decoders]
+    assert results[0] == results[1], 'the decoded hours differ'
+
+    print(f'{len(hourly_data)} hourly records ({len(near_future_data["list"])} in the 3-hour forecast format)')
+    for name, decoder in decoders:
+        elapsed_time, peak_size = decode_hours(decoder, hourly_data, timezone, REPETITIONS)
+        print(f'{name}: {elapsed_time * 1000:.2f} ms, peak memory {peak_size / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
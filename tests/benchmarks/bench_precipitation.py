@@ -0,0 +1,123 @@
+"""
+Micro-benchmark of DayWeather.distribute_days_precipitation_volume against the previous implementation of
+DayWeather.distribute_precipitation_volume over a 20-day forecast with mixed 1h/3h/24h precipitations.
+
+Run with: python -m tests.benchmarks.bench_precipitation
+"""
+
+import datetime
+import random
+import timeit
+
+from flanaapis.weather.models import DayWeather, InstantWeather, Precipitation, PrecipitationType
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+FIRST_DATE = datetime.date(2022, 6, 1)
+N_DAYS = 20
+REPETITIONS = 20
+
+
+def create_fixture(seed=0) -> tuple[list[DayWeather], list[Precipitation]]:
+    random_ = random.Random(seed)
+    day_weathers = []
+    precipitations = []
+    for day in range(N_DAYS):
+        date = FIRST_DATE + datetime.timedelta(days=day)
+        day_date_time = datetime.datetime(date.year, date.month, date.day, tzinfo=TIMEZONE)
+        day_weather = DayWeather(date, TIMEZONE)
+        for hour in range(24):
+            day_weather.instant_weathers.append(InstantWeather(day_date_time.replace(hour=hour), temperature=random_.uniform(10, 30)))
+        day_weathers.append(day_weather)
+
+        for precipitation_type in (PrecipitationType.RAIN, PrecipitationType.SNOW):
+            precipitations.append(Precipitation(precipitation_type, day_date_time, day_date_time + datetime.timedelta(days=1), random_.uniform(5, 20)))
+            for hour in range(0, 24, 3):
+                start_date = day_date_time.replace(hour=hour)
+                precipitations.append(Precipitation(precipitation_type, start_date, start_date + datetime.timedelta(hours=3), random_.uniform(1, 5)))
+            for hour in random_.sample(range(24), 12):
+                start_date = day_date_time.replace(hour=hour)
+                precipitations.append(Precipitation(precipitation_type, start_date, start_date + datetime.timedelta(hours=1), random_.uniform(0.1, 1)))
+
+    return day_weathers, precipitations
+
+
+def legacy_distribute_precipitation_volume(day_weather: DayWeather, precipitations: list[Precipitation]):
+    def distribute_precipitation_volume_(precipitation_type: PrecipitationType, precipitations_: list[Precipitation]):
+        grouped_precipitations: dict[int, list[Precipitation]] = {}
+        for hours in range(1, 25):
+            grouped_precipitations[hours] = [precipitation.copy() for precipitation in precipitations_ if (precipitation.end_date - precipitation.start_date).total_seconds() / 3600 == hours]
+
+        hourly_precipitations: list[Precipitation] = grouped_precipitations[1]
+        for hours in range(2, 25):
+            for precipitation in grouped_precipitations[hours]:
+                start_hour = precipitation.start_date.hour
+                start_hours = list(range(start_hour, min(start_hour + hours, 24)))
+
+                for hourly_precipitation in hourly_precipitations:
+                    if hourly_precipitation.start_date.hour in start_hours:
+                        start_hours.remove(hourly_precipitation.start_date.hour)
+                        precipitation.volume -= hourly_precipitation.volume
+                if start_hours:
+                    hourly_volume = precipitation.volume / len(start_hours)
+                else:
+                    continue
+                for start_hour in start_hours:
+                    start_date = precipitation.start_date.replace(hour=start_hour)
+                    hourly_precipitations.append(Precipitation(precipitation_type, start_date, start_date + datetime.timedelta(hours=1), hourly_volume))
+        hourly_precipitations.sort(key=lambda precipitation: precipitation.start_date)
+
+        attribute_name = f'{precipitation_type.name.lower()}_volume'
+        for precipitation in hourly_precipitations:
+            if not precipitation.volume:
+                return
+
+            if not (instant_weather := next(iter(instant_weather_ for instant_weather_ in day_weather.instant_weathers if instant_weather_.date_time.hour == precipitation.start_date.hour), None)):
+                instant_weather = InstantWeather(precipitation.start_date)
+                day_weather.instant_weathers.append(instant_weather)
+            setattr(instant_weather, attribute_name, precipitation.volume)
+
+        day_weather.instant_weathers.sort(key=lambda instant_weather_: instant_weather_.date_time)
+
+    precipitations = [precipitation for precipitation in precipitations if precipitation.start_date.date() == day_weather.date]
+    temp_precipitations = []
+    for precipitation in precipitations:
+        next_day_first_hour_date_time = (precipitation.start_date + datetime.timedelta(days=1)).replace(hour=0)
+        if next_day_first_hour_date_time < precipitation.end_date:
+            precipitation_hours = (precipitation.end_date - precipitation.start_date).total_seconds() / 3600
+            hours_until_next_day = (next_day_first_hour_date_time - precipitation.start_date).total_seconds() / 3600
+            next_day_precipitation_hours = precipitation_hours - hours_until_next_day
+            temp_precipitations.append(Precipitation(precipitation.type_, precipitation.start_date, next_day_first_hour_date_time, precipitation.volume / precipitation_hours * hours_until_next_day))
+            temp_precipitations.append(Precipitation(precipitation.type_, next_day_first_hour_date_time, next_day_first_hour_date_time + datetime.timedelta(hours=next_day_precipitation_hours), precipitation.volume / precipitation_hours * next_day_precipitation_hours))
+        else:
+            temp_precipitations.append(precipitation)
+    precipitations = temp_precipitations
+    if rain := [precipitation for precipitation in precipitations if precipitation.type_ is PrecipitationType.RAIN]:
+        distribute_precipitation_volume_(PrecipitationType.RAIN, rain)
+    if snow := [precipitation for precipitation in precipitations if precipitation.type_ is PrecipitationType.SNOW]:
+        distribute_precipitation_volume_(PrecipitationType.SNOW, snow)
+
+
+def run_legacy():
+    day_weathers, precipitations = create_fixture()
+    for day_weather in day_weathers:
+        legacy_distribute_precipitation_volume(day_weather, precipitations)
+    return day_weathers
+
+
+def run_sweep():
+    day_weathers, precipitations = create_fixture()
+    DayWeather.distribute_days_precipitation_volume(day_weathers, precipitations)
+    return day_weathers
+
+
+def main():
+    volumes = [[[(instant_weather.rain_volume, instant_weather.snow_volume) for instant_weather in day_weather.instant_weathers] for day_weather in day_weathers] for day_weathers in (run_legacy(), run_sweep())]
+    assert volumes[0] == volumes[1], 'the results differ'
+
+    fixture_time = timeit.timeit(create_fixture, number=REPETITIONS) / REPETITIONS
+    for name, function in (('legacy', run_legacy), ('sweep', run_sweep)):
+        print(f'{name}: {(timeit.timeit(function, number=REPETITIONS) / REPETITIONS - fixture_time) * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the serialization of a 20-day /weather response: the default format (dicts encoded by FastAPI's
+jsonable_encoder and json) against format=columnar (ujson) and format=msgpack.
+
+Run with: python -m tests.benchmarks.bench_weather_formats
+"""
+
+import datetime
+import json
+import time
+
+import msgpack
+import ujson
+from fastapi.encoders import jsonable_encoder
+
+from flanaapis.weather import routes
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+DAYS = 20
+REPETITIONS = 20
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+
+
+def create_weathers() -> tuple[InstantWeather, list[DayWeather]]:
+    today = datetime.date.today()
+    day_weathers = []
+    for days in range(DAYS):
+        date = today + datetime.timedelta(days=days)
+        day_weather = DayWeather(date, TIMEZONE, min_temperature=15.5, max_temperature=28.25)
+        for hour in range(24):
+            day_weather.instant_weathers.append(
+                InstantWeather(
+                    datetime.datetime(date.year, date.month, date.day, hour, tzinfo=TIMEZONE),
+                    clouds=40,
+                    description='nubes dispersas',
+                    dew_point=12.5,
+                    humidity=55,
+                    icon='03d',
+                    precipitation_probability=10,
+                    pressure=1015,
+                    rain_volume=0,
+                    snow_volume=0,
+                    temperature=20 + hour / 4,
+                    temperature_feel=19.5 + hour / 4,
+                    uvi=3.2,
+                    visibility=10,
+                    wind_degrees=270,
+                    wind_gust=20.5,
+                    wind_speed=12.25
+                )
+            )
+        day_weathers.append(day_weather)
+
+    return InstantWeather(datetime.datetime.now(TIMEZONE), temperature=21), day_weathers
+
+
+def serialize_json(current_weather: InstantWeather, day_weathers: list[DayWeather]) -> bytes:
+    return json.dumps(jsonable_encoder({
+        'current_weather': routes.instant_weather_to_dict(current_weather),
+        'day_weathers': [routes.day_weather_to_dict(day_weather) for day_weather in day_weathers]
+    })).encode()
+
+
+def serialize_columnar(current_weather: InstantWeather, day_weathers: list[DayWeather]) -> bytes:
+    return ujson.dumps({
+        'current_weather': routes.instant_weather_to_dict(current_weather),
+        'day_weathers': [routes.day_weather_to_columns(day_weather) for day_weather in day_weathers]
+    }).encode()
+
+
+def serialize_msgpack(current_weather: InstantWeather, day_weathers: list[DayWeather]) -> bytes:
+    return msgpack.packb({
+        'current_weather': routes.instant_weather_to_dict(current_weather),
+        'day_weathers': [routes.day_weather_to_columns(day_weather) for day_weather in day_weathers]
+    })
+
+
+def main():
+    weathers = create_weathers()
+    for serializer in (serialize_json, serialize_columnar, serialize_msgpack):
+        start_time = time.perf_counter()
+        for _ in range(REPETITIONS):
+            content = serializer(*weathers)
+        elapsed_time = (time.perf_counter() - start_time) / REPETITIONS
+        print(f"{serializer.__name__.removeprefix('serialize_')}: {elapsed_time * 1000:.2f} ms, {len(content) / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
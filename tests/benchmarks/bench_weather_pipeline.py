@@ -0,0 +1,117 @@
+"""
+Benchmark of the whole weather pipeline offline, replaying the responses of tests/fixtures/replay/weather.json: the
+parsing of every provider, DayWeather.mean, DayWeather.merge, merge_providers_weathers and the /weather route.
+
+Every stage is run some warmup times and then timed REPETITIONS times, reporting the latency distribution and the
+memory allocated (peak and retained) in one traced run. The forecast caches are cleared before every run, so the route
+always reaches the providers. The weather history and the place cache are temporary databases that are filled in the
+warmup, as they are in production.
+
+Run with: python -m tests.benchmarks.bench_weather_pipeline
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+import httpx
+from fastapi import FastAPI
+
+from flanaapis.weather import functions, google, open_weather_map, routes, visual_crossing
+from flanaapis.weather.models import DayWeather
+from tests.replay import Cassette
+
+LATITUDE = 36.72
+LONGITUDE = -4.42
+REPETITIONS = 50
+WARMUP_REPETITIONS = 3
+
+
+async def measure(function: Callable[[], Awaitable | None], setup: Callable[[], None] = None) -> tuple[list[float], int, int]:
+    async def run() -> float:
+        if setup:
+            setup()
+        start_time = time.perf_counter()
+        if asyncio.iscoroutine(result := function()):
+            await result
+        return time.perf_counter() - start_time
+
+    for _ in range(WARMUP_REPETITIONS):
+        await run()
+
+    elapsed_times = [await run() for _ in range(REPETITIONS)]
+
+    tracemalloc.start()
+    await run()
+    retained_size, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_times, peak_size, retained_size
+
+
+def clear_caches():
+    for forecast_cache in functions.forecast_caches.values():
+        forecast_cache.clear()
+
+
+def print_results(name: str, elapsed_times: list[float], peak_size: int, retained_size: int):
+    percentiles = statistics.quantiles(elapsed_times, n=100, method='inclusive')
+    print(
+        f'{name:<26}'
+        f' min {min(elapsed_times) * 1000:7.2f} ms'
+        f' | p50 {percentiles[49] * 1000:7.2f} ms'
+        f' | p90 {percentiles[89] * 1000:7.2f} ms'
+        f' | p99 {percentiles[98] * 1000:7.2f} ms'
+        f' | max {max(elapsed_times) * 1000:7.2f} ms'
+        f' | peak {peak_size / 1024:6.0f} KiB'
+        f' | retained {retained_size / 1024:5.0f} KiB'
+    )
+
+
+async def run_benchmarks():
+    providers_weathers = {
+        'open_weather_map': await open_weather_map.get_day_weathers_by_place(LATITUDE, LONGITUDE),
+        'visual_crossing': await visual_crossing.get_day_weathers_by_place(LATITUDE, LONGITUDE),
+        'google': await google.get_day_weathers_by_place(LATITUDE, LONGITUDE)
+    }
+    days_by_date: dict = {}
+    for _, day_weathers in providers_weathers.values():
+        for day_weather in day_weathers:
+            days_by_date.setdefault(day_weather.date, []).append(day_weather)
+    shared_days = [day_weathers for day_weathers in days_by_date.values() if len(day_weathers) > 1]
+    merge_days: list[list[DayWeather]] = []
+
+    def copy_shared_days():
+        merge_days[:] = [[day_weather.deep_copy() for day_weather in day_weathers] for day_weathers in shared_days]
+
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+    benchmarks = {
+        'open_weather_map': (lambda: open_weather_map.get_day_weathers_by_place(LATITUDE, LONGITUDE), None),
+        'visual_crossing': (lambda: visual_crossing.get_day_weathers_by_place(LATITUDE, LONGITUDE), None),
+        'google': (lambda: google.get_day_weathers_by_place(LATITUDE, LONGITUDE), None),
+        'DayWeather.mean': (lambda: [DayWeather.mean(day_weathers) for day_weathers in shared_days], None),
+        'DayWeather.merge': (lambda: [day_weathers[0].merge(day_weathers[1]) for day_weathers in merge_days], copy_shared_days),
+        'merge_providers_weathers': (lambda: functions.merge_providers_weathers(providers_weathers.values()), None),
+        '/weather': (lambda: client.get('/weather', params={'latitude': LATITUDE, 'longitude': LONGITUDE}), clear_caches)
+    }
+    async with client:
+        for name, (function, setup) in benchmarks.items():
+            print_results(name, *await measure(function, setup))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temporary_directory, Cassette('weather', mode='replay'):
+        os.environ['FLANAAPIS_WEATHER_HISTORY_PATH'] = os.path.join(temporary_directory, 'weather_history.sqlite3')
+        os.environ['FLANAAPIS_PLACE_CACHE_PATH'] = os.path.join(temporary_directory, 'place_cache.sqlite3')
+        asyncio.run(run_benchmarks())
+
+
+if __name__ == '__main__':
+    main()
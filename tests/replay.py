@@ -0,0 +1,165 @@
+"""
+Record/replay of the HTTP requests made through aiohttp.ClientSession.get, which are all the requests of the weather
+pipeline (flanautils.get_request included).
+
+The interactions are stored in cassettes, JSON files in tests/fixtures/replay. A request matches a recorded interaction
+if they have the same host, path and parameters, ignoring the secret parameters (never stored), the parameters that
+depend on the current time and the numeric path segments (timestamps). The interactions with the same match key are
+replayed in the recorded order and the last one is repeated once they are exhausted.
+
+The mode is the mode argument or the FLANAAPIS_REPLAY_MODE environment variable: 'replay' (default) or 'record', which
+makes the real requests and overwrites the cassette.
+
+Usage:
+    with Cassette('weather'):
+        await flanaapis.weather.functions.get_day_weathers_by_place(36.72, -4.42)
+"""
+
+from __future__ import annotations  # todo0 remove when it's by default
+
+import json
+import os
+import pathlib
+import re
+from typing import Any
+from unittest import mock
+
+import aiohttp
+import yarl
+
+CASSETTES_PATH = pathlib.Path(__file__).parent / 'fixtures' / 'replay'
+SECRET_PARAMETERS = ('appid', 'key')
+VOLATILE_PARAMETERS = ('dt',)
+VOLATILE_PATH_SEGMENT_PATTERN = re.compile(r'-?\d+')
+API_KEY_NAMES = ('OPEN_WEATHER_MAP_API_KEY', 'TIMEZONEDB_API_KEY', 'VISUAL_CROSSING_API_KEY')
+
+
+class MissingInteractionError(LookupError):
+    pass
+
+
+class ReplayResponse:
+    """The subset of aiohttp.ClientResponse used by flanautils.request."""
+
+    def __init__(self, status: int, reason: str, content_type: str, body: bytes):
+        self.status = status
+        self.reason = reason
+        self.content_type = content_type
+        self.body = body
+
+    async def __aenter__(self) -> ReplayResponse:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def json(self, **_kwargs) -> Any:
+        return json.loads(self.body)
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding='utf-8', **_kwargs) -> str:
+        return self.body.decode(encoding)
+
+
+class Cassette:
+    def __init__(self, name: str, mode: str = None):
+        self.path = CASSETTES_PATH / f'{name}.json'
+        self.mode = mode or os.environ.get('FLANAAPIS_REPLAY_MODE', 'replay')
+        if self.mode not in ('record', 'replay'):
+            raise ValueError(f'Bad replay mode: {self.mode}')
+        self.interactions: list[dict | None] = []
+        self._positions: dict[tuple, int] = {}
+        self._original_get = None
+        self._patches = []
+
+    def __enter__(self) -> Cassette:
+        if self.mode == 'replay':
+            with open(self.path, encoding='utf-8') as file:
+                self.interactions = json.load(file)['interactions']
+            self._patches.append(mock.patch.dict(os.environ, {name: 'replay' for name in API_KEY_NAMES if name not in os.environ}))
+        else:
+            self.interactions = []
+        self._positions.clear()
+
+        cassette = self
+
+        def get(session: aiohttp.ClientSession, url: str | yarl.URL, params: dict = None, **kwargs):
+            if cassette.mode == 'replay':
+                return cassette._replay(url, params)
+            return cassette._record(session, url, params, **kwargs)
+
+        self._original_get = aiohttp.ClientSession.get
+        self._patches.append(mock.patch.object(aiohttp.ClientSession, 'get', get))
+        for patch in self._patches:
+            patch.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._patches.clear()
+
+        if self.mode == 'record' and not exc_type:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump({'interactions': [interaction for interaction in self.interactions if interaction]}, file, ensure_ascii=False, indent=1)
+
+    @staticmethod
+    def _split_url(url: str | yarl.URL, params: dict = None) -> tuple[str, dict[str, str]]:
+        url = yarl.URL(url) if isinstance(url, str) else url
+        parameters = {name: str(value) for name, value in url.query.items()} | {str(name): str(value) for name, value in (params or {}).items()}
+
+        return str(url.with_query(None)), {name: value for name, value in sorted(parameters.items()) if name not in SECRET_PARAMETERS}
+
+    @staticmethod
+    def match_key(url: str, parameters: dict[str, str]) -> tuple:
+        url = yarl.URL(url)
+        path = '/'.join('{}' if VOLATILE_PATH_SEGMENT_PATTERN.fullmatch(segment) else segment for segment in url.path.split('/'))
+
+        return url.host, path, tuple((name, value) for name, value in sorted(parameters.items()) if name not in VOLATILE_PARAMETERS)
+
+    def _record(self, session: aiohttp.ClientSession, url: str | yarl.URL, params: dict = None, **kwargs) -> _RecordContextManager:
+        self.interactions.append(None)  # the slot keeps the order in which the requests are made, not answered
+        return _RecordContextManager(self, len(self.interactions) - 1, self._original_get(session, url, params=params, **kwargs), *self._split_url(url, params))
+
+    def _replay(self, url: str | yarl.URL, params: dict = None) -> ReplayResponse:
+        key = self.match_key(*self._split_url(url, params))
+        interactions = [interaction for interaction in self.interactions if self.match_key(interaction['url'], interaction['params']) == key]
+        if not interactions:
+            raise MissingInteractionError(f'No recorded response in {self.path.name} for GET {url} {params}')
+
+        position = self._positions.get(key, 0)
+        self._positions[key] = min(position + 1, len(interactions) - 1)
+        interaction = interactions[position]
+
+        return ReplayResponse(interaction['status'], interaction['reason'], interaction['content_type'], interaction['body'].encode())
+
+
+class _RecordContextManager:
+    def __init__(self, cassette: Cassette, index: int, request_context_manager, url: str, parameters: dict[str, str]):
+        self.cassette = cassette
+        self.index = index
+        self.request_context_manager = request_context_manager
+        self.url = url
+        self.parameters = parameters
+
+    async def __aenter__(self) -> ReplayResponse:
+        async with self.request_context_manager as response:
+            body = await response.read()
+            self.cassette.interactions[self.index] = {
+                'method': 'GET',
+                'url': self.url,
+                'params': self.parameters,
+                'status': response.status,
+                'reason': response.reason,
+                'content_type': response.content_type,
+                'body': body.decode(response.get_encoding() if response.content_type.startswith('text') else 'utf-8')
+            }
+
+        return ReplayResponse(response.status, response.reason, response.content_type, body)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from flanaapis import browsers
+from flanaapis.browsers import BrowserPool
+
+
+class FakePage:
+    def __init__(self, context: 'FakeContext'):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, storage_state: dict = None):
+        self.storage_state_ = storage_state
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def new_page(self) -> FakePage:
+        return FakePage(self)
+
+    async def storage_state(self) -> dict:
+        return {'cookies': [{'name': 'CONSENT', 'value': 'YES'}]}
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts: list[FakeContext] = []
+
+    async def close(self):
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, storage_state: dict = None) -> FakeContext:
+        self.contexts.append(context := FakeContext(storage_state))
+        return context
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browsers: list[FakeBrowser] = []
+        self.chromium = self
+        self.stopped = False
+
+    async def launch(self) -> FakeBrowser:
+        self.browsers.append(browser := FakeBrowser())
+        return browser
+
+    async def start(self) -> 'FakePlaywright':
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.playwright = FakePlaywright()
+        self.patch = mock.patch.object(browsers, 'async_playwright', lambda: self.playwright)
+        self.patch.start()
+        self.browser_pool = BrowserPool(size=2, context_max_uses=3)
+        await self.browser_pool.start()
+
+    async def asyncTearDown(self):
+        await self.browser_pool.stop()
+        self.patch.stop()
+
+    async def test_browsers_are_reused(self):
+        for _ in range(6):
+            async with self.browser_pool.page() as page:
+                pass
+
+            self.assertTrue(page.closed)
+
+        self.assertEqual(2, len(self.playwright.browsers))
+
+    async def test_concurrency_is_bounded(self):
+        active_pages = 0
+        max_active_pages = 0
+
+        async def use_page():
+            nonlocal active_pages, max_active_pages
+
+            async with self.browser_pool.page():
+                active_pages += 1
+                max_active_pages = max(max_active_pages, active_pages)
+                await asyncio.sleep(0.01)
+                active_pages -= 1
+
+        await asyncio.gather(*(use_page() for _ in range(10)))
+
+        self.assertEqual(2, max_active_pages)
+        self.assertEqual(2, len(self.playwright.browsers))
+
+    async def test_contexts_are_recycled(self):
+        browser = self.playwright.browsers[0]
+        for _ in range(4):
+            async with self.browser_pool.page():
+                pass
+            self.browser_pool._slots._queue.rotate(-1)  # always the same browser
+
+        self.assertEqual(2, len(browser.contexts))
+        self.assertTrue(browser.contexts[0].closed)
+
+    async def test_storage_state(self):
+        async with self.browser_pool.page() as page:
+            await self.browser_pool.save_storage_state(page.context)
+
+        for _ in range(2):
+            async with self.browser_pool.page() as page:
+                pass
+
+        self.assertIsNone(self.playwright.browsers[0].contexts[0].storage_state_)
+        self.assertEqual({'cookies': [{'name': 'CONSENT', 'value': 'YES'}]}, self.playwright.browsers[1].contexts[0].storage_state_)
+
+    async def test_context_is_replaced_after_an_error(self):
+        browser = self.playwright.browsers[0]
+        with self.assertRaises(TimeoutError):
+            async with self.browser_pool.page():
+                raise TimeoutError
+        self.browser_pool._slots._queue.rotate(-1)  # the same browser
+
+        async with self.browser_pool.page():
+            pass
+
+        self.assertEqual(2, len(browser.contexts))
+        self.assertTrue(browser.contexts[0].closed)
+        self.assertFalse(browser.contexts[1].closed)
+        self.assertEqual(2, len(self.playwright.browsers))
+
+    async def test_disconnected_browser_is_relaunched(self):
+        self.playwright.browsers[0].connected = False
+        self.playwright.browsers[1].connected = False
+
+        async with self.browser_pool.page():
+            pass
+
+        self.assertEqual(3, len(self.playwright.browsers))
+
+    async def test_stop(self):
+        await self.browser_pool.stop()
+
+        self.assertTrue(self.playwright.stopped)
+        self.assertFalse(any(browser.connected for browser in self.playwright.browsers))
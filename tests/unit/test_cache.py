@@ -0,0 +1,49 @@
+import unittest
+from unittest import mock
+
+from flanaapis.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual({'size': 2, 'max_size': 2, 'ttl': 60, 'hits': 3, 'misses': 1}, cache.stats)
+
+    def test_expiration(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        with mock.patch('time.monotonic', return_value=0):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=120)
+        with mock.patch('time.monotonic', return_value=90):
+            self.assertNotIn('a', cache)
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(2, cache.get('b'))
+
+    def test_stale(self):
+        cache = TTLCache(max_size=2, ttl=60, stale_ttl=30)
+        with mock.patch('time.monotonic', return_value=0):
+            cache.set('a', 1)
+        with mock.patch('time.monotonic', return_value=70):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(1, cache.get_stale('a'))
+            self.assertEqual(-10, cache.expires_in('a'))
+        with mock.patch('time.monotonic', return_value=90):
+            self.assertIsNone(cache.get_stale('a'))
+            self.assertIsNone(cache.expires_in('a'))
+
+    def test_copy_values(self):
+        cache = TTLCache(max_size=2, ttl=60, copy_values=True)
+        value = [1]
+        cache.set('a', value)
+        value.append(2)
+
+        self.assertEqual([1], cache.get('a'))
+        self.assertIs(cache.get('a'), cache.get_stale('a'))
@@ -0,0 +1,57 @@
+import pathlib
+import unittest
+from unittest import mock
+
+from flanaapis.geolocation import google_maps
+
+FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'google_maps_search_response.txt'
+NO_RESULTS_FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'google_maps_search_no_results_response.txt'
+
+
+def create_route_mock(url: str, resource_type: str) -> mock.Mock:
+    route = mock.Mock(abort=mock.AsyncMock(), continue_=mock.AsyncMock())
+    route.request.url = url
+    route.request.resource_type = resource_type
+    return route
+
+
+class TestGoogleMaps(unittest.IsolatedAsyncioTestCase):
+    def test_create_place_by_url(self):
+        place = google_maps._create_place_by_url('https://www.google.es/maps/place/M%C3%A1laga/@36.7212737,-4.4213988,13z/data=!3m1!4b1')
+
+        self.assertEqual(('Málaga', 36.7212737, -4.4213988), (place.name, place.latitude, place.longitude))
+        self.assertIsNone(google_maps._create_place_by_url('https://www.google.es/maps/search/malaga'))
+
+    def test_response_coordinates(self):
+        with open(FIXTURE_PATH, encoding='utf-8') as file:
+            match = google_maps.RESPONSE_COORDINATES_PATTERN.search(file.read())
+
+        self.assertEqual(('36.7212737', '-4.4213988'), match.groups())
+        self.assertTrue(google_maps.SEARCH_RESPONSE_URL_PATTERN.search('https://www.google.es/search?tbm=map&authuser=0&hl=es&q=malaga'))
+
+    def test_response_place(self):
+        with open(FIXTURE_PATH, encoding='utf-8') as file:
+            place = google_maps._create_place_by_response(file.read(), 'malaga')
+
+        self.assertEqual(('malaga', 36.7212737, -4.4213988), (place.name, place.latitude, place.longitude))
+
+    def test_response_without_results(self):
+        with open(NO_RESULTS_FIXTURE_PATH, encoding='utf-8') as file:
+            self.assertIsNone(google_maps._create_place_by_response(file.read(), 'xyzzyqwerty'))
+
+    async def test_route_request(self):
+        for url, resource_type, blocked in (
+            ('https://www.google.es/maps/search/malaga', 'document', False),
+            ('https://www.google.es/search?tbm=map&q=malaga', 'fetch', False),
+            ('https://www.google.es/maps/vt?pb=!1m5!1m4!1i15', 'fetch', True),
+            ('https://khms1.google.es/kh/v=979?x=1', 'other', True),
+            ('https://fonts.gstatic.com/s/googlesans/v58/4Ua_rENHsxJlGDuGo1OIlJfC6l_24rlCK1Yo_Iqcsih3SAyH6cAwhX9RFD48TE63OOYKtrw2IJllpyk.woff2', 'font', True),
+            ('https://maps.gstatic.com/tactile/omnibox/directions-2x-20150909.png', 'image', True)
+        ):
+            with self.subTest(url=url):
+                route = create_route_mock(url, resource_type)
+
+                await google_maps._route_request(route)
+
+                self.assertEqual(blocked, route.abort.called)
+                self.assertEqual(not blocked, route.continue_.called)
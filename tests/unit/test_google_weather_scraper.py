@@ -0,0 +1,61 @@
+import pathlib
+import unittest
+from unittest import mock
+
+from flanaapis.scraping import google_weather_scraper
+
+FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'google_weather.html'
+
+
+class TestGetForecast(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(FIXTURE_PATH, encoding='utf-8') as file:
+            cls.html = file.read()
+
+    def get_sync_forecast(self) -> dict:
+        response = mock.Mock(text=self.html)
+        with mock.patch.object(google_weather_scraper.requests.Session, 'get', return_value=response), mock.patch.object(google_weather_scraper.requests, 'get', return_value=response) as get_mock:
+            forecast = google_weather_scraper.get_forecast('Málaga, España')
+        self.assertEqual(1, get_mock.call_count)
+        return forecast
+
+    async def test_single_fetch(self):
+        with mock.patch.object(google_weather_scraper.flanautils, 'get_request', mock.AsyncMock(return_value=self.html)) as get_request_mock:
+            forecast = await google_weather_scraper.get_forecast_async('Málaga, España')
+
+        get_request_mock.assert_awaited_once()
+        self.assertEqual('https://www.google.com/search?hl=es&lr=lang_es&ie=UTF-8&q=weather+M%C3%A1laga,+Espa%C3%B1a', get_request_mock.await_args.args[0])
+        self.assertEqual(self.get_sync_forecast(), forecast)
+
+    async def test_forecast(self):
+        with mock.patch.object(google_weather_scraper.flanautils, 'get_request', mock.AsyncMock(return_value=self.html)):
+            forecast = await google_weather_scraper.get_forecast_async('Málaga')
+
+        self.assertEqual('Málaga', forecast['region'])
+        self.assertEqual(27, forecast['weather_now']['temp'])
+        self.assertEqual(8, len(forecast['next_days']))
+        self.assertEqual(16, len(forecast['wind']))
+        self.assertEqual(48, len(forecast['hourly_forecast']))
+
+
+class TestExtractForecast(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(FIXTURE_PATH, encoding='utf-8') as file:
+            cls.html = file.read()
+
+    def test_same_as_soup(self):
+        for output_units in ({'temp': 'c', 'speed': 'km/h'}, {'temp': 'f', 'speed': 'mph'}):
+            with self.subTest(output_units=output_units):
+                self.assertEqual(google_weather_scraper._get_forecast_by_soup(self.html, output_units), google_weather_scraper._extract_forecast(self.html, output_units))
+
+    def test_soup_fallback(self):
+        html = self.html.replace('class="wob_df"', 'class="wob_df2"')
+        with mock.patch.object(google_weather_scraper, '_get_forecast_by_soup', wraps=google_weather_scraper._get_forecast_by_soup) as get_forecast_by_soup_mock:
+            with self.assertRaises(ValueError):
+                google_weather_scraper._extract_forecast(html, {'temp': 'c', 'speed': 'km/h'})
+            forecast = google_weather_scraper._get_forecast_by_html(html, {'temp': 'c', 'speed': 'km/h'})
+
+        get_forecast_by_soup_mock.assert_called_once()
+        self.assertEqual([], forecast['next_days'])
@@ -0,0 +1,78 @@
+import asyncio
+import time
+import unittest
+
+from flanaapis import governor
+from flanaapis.exceptions import ResponseError
+from flanaapis.governor import Priority, RequestGovernor
+
+REQUESTS_PER_SECOND = 20
+
+
+class TestRequestGovernor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.governor = RequestGovernor(REQUESTS_PER_SECOND, backoff_time=0.05)
+        self.sent_keys = []
+        self.send_times = []
+
+    async def asyncTearDown(self):
+        await self.governor.stop()
+
+    def make_request(self, key, result=None, exception: Exception = None):
+        async def request():
+            self.sent_keys.append(key)
+            self.send_times.append(time.monotonic())
+            await asyncio.sleep(0)
+            if exception:
+                raise exception
+            return result
+
+        return request
+
+    async def test_rate(self):
+        results = await asyncio.gather(*(self.governor.request(key, self.make_request(key, key)) for key in range(6)))
+
+        self.assertEqual(list(range(6)), results)
+        for previous_time, send_time in zip(self.send_times, self.send_times[1:]):
+            self.assertGreaterEqual(send_time - previous_time, 0.9 / REQUESTS_PER_SECOND)
+
+    async def test_coalescing(self):
+        results = await asyncio.gather(*(self.governor.request('malaga', self.make_request('malaga', [1, 2])) for _ in range(5)))
+
+        self.assertEqual(['malaga'], self.sent_keys)
+        self.assertEqual([[1, 2]] * 5, results)
+        self.assertEqual([3], await self.governor.request('malaga', self.make_request('malaga', [3])))
+
+    async def test_priority(self):
+        tasks = [
+            asyncio.create_task(self.governor.request('background_1', self.make_request('background_1'), Priority.BACKGROUND)),
+            asyncio.create_task(self.governor.request('background_2', self.make_request('background_2'), Priority.BACKGROUND)),
+            asyncio.create_task(self.governor.request('default', self.make_request('default'))),
+            governor.create_task(self.governor.request('interactive', self.make_request('interactive')), Priority.INTERACTIVE),
+            asyncio.create_task(self.governor.request('upgraded', self.make_request('upgraded'), Priority.BACKGROUND)),
+            asyncio.create_task(self.governor.request('upgraded', self.make_request('upgraded'), Priority.INTERACTIVE))
+        ]
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(['interactive', 'upgraded', 'default', 'background_1', 'background_2'], self.sent_keys)
+
+    async def test_too_many_requests(self):
+        responses = iter((ResponseError('429 - Too Many Requests'), 'malaga'))
+
+        async def request():
+            self.send_times.append(time.monotonic())
+            if isinstance(response := next(responses), Exception):
+                raise response
+            return response
+
+        self.assertEqual('malaga', await self.governor.request('malaga', request))
+        self.assertGreaterEqual(self.send_times[1] - self.send_times[0], self.governor.backoff_time)
+
+    async def test_errors_are_shared(self):
+        results = await asyncio.gather(
+            *(self.governor.request('malaga', self.make_request('malaga', exception=ResponseError('500 - Internal Server Error'))) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        self.assertEqual(['malaga'], self.sent_keys)
+        self.assertTrue(all(isinstance(result, ResponseError) for result in results))
@@ -0,0 +1,101 @@
+import asyncio
+import copy
+import datetime
+import json
+import pathlib
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from flanaapis.weather import open_weather_map
+from flanaapis.weather.models import DayPhases
+
+FIXTURE_PATH = pathlib.Path(__file__).parent.parent / 'fixtures' / 'open_weather_map.json'
+
+
+class TestGetDayWeathersByPlace(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(FIXTURE_PATH) as file:
+            cls.payloads = json.load(file)
+        cls.timezone = datetime.timezone(datetime.timedelta(seconds=cls.payloads['present_future']['timezone_offset']))
+
+    async def asyncSetUp(self):
+        payloads = copy.deepcopy(self.payloads)
+        with mock.patch.object(open_weather_map, 'get_weather_api_data', mock.AsyncMock(return_value=(payloads['past_days'], payloads['present_future'], payloads['near_future'], self.timezone))):
+            self.current_weather, self.day_weathers = await open_weather_map.get_day_weathers_by_place(36.72, -4.42)
+
+    def test_days(self):
+        dates = [day_weather.date for day_weather in self.day_weathers]
+        self.assertEqual(sorted(set(dates)), dates)
+        for day_weather in self.day_weathers:
+            hours = [instant_weather.date_time.hour for instant_weather in day_weather.instant_weathers]
+            self.assertEqual(sorted(set(hours)), hours)
+
+    def test_hourly_data_has_priority(self):
+        hour_data = self.payloads['present_future']['hourly'][0]
+        date_time = datetime.datetime.fromtimestamp(hour_data['dt'], self.timezone)
+        day_weather = next(day_weather for day_weather in self.day_weathers if day_weather.date == date_time.date())
+
+        self.assertEqual(hour_data['temp'], day_weather.get_instant_weather_by_hour(date_time.hour).temperature)
+
+    def test_day_phases(self):
+        day_data = self.payloads['present_future']['daily'][-1]
+        date_time = datetime.datetime.fromtimestamp(day_data['dt'], self.timezone)
+        day_weather = self.day_weathers[-1]
+
+        self.assertEqual(date_time.date(), day_weather.date)
+        self.assertEqual(day_data['temp']['max'], day_weather.max_temperature)
+        # noinspection PyTypeChecker
+        for phase_name, hour in DayPhases.items:
+            instant_weather = day_weather.get_instant_weather_by_hour(hour)
+            self.assertEqual(day_data['temp'][phase_name.lower()], instant_weather.temperature)
+            self.assertEqual(day_data['uvi'] if phase_name == 'DAY' else 0, instant_weather.uvi)
+
+    def test_three_hour_forecast_format(self):
+        hour_data = self.payloads['near_future']['list'][0]
+
+        instant_weather = open_weather_map.create_instant_weather_by_data(hour_data, self.timezone)
+
+        self.assertEqual(hour_data['main']['temp'], instant_weather.temperature)
+        self.assertEqual(hour_data['main']['humidity'], instant_weather.humidity)
+        self.assertEqual(hour_data['clouds']['all'], instant_weather.clouds)
+        self.assertEqual(hour_data['wind']['deg'], instant_weather.wind_degrees)
+        self.assertAlmostEqual(hour_data['wind']['speed'] * 3.6, instant_weather.wind_speed)
+        self.assertEqual(hour_data['visibility'] / 1000, instant_weather.visibility)
+
+    async def test_payloads_not_mutated(self):
+        payloads = copy.deepcopy(self.payloads)
+        with mock.patch.object(open_weather_map, 'get_weather_api_data', mock.AsyncMock(return_value=(payloads['past_days'], payloads['present_future'], payloads['near_future'], self.timezone))):
+            await open_weather_map.get_day_weathers_by_place(36.72, -4.42)
+
+        self.assertEqual(self.payloads, payloads)
+
+
+class TestGetWeatherApiData(unittest.IsolatedAsyncioTestCase):
+    async def _count_requests(self, days_back: int = None, days_ahead: int = None) -> list[str]:
+        with (
+            mock.patch.dict('os.environ', {'OPEN_WEATHER_MAP_API_KEY': 'key'}),
+            mock.patch.object(open_weather_map.flanaapis.weather.history, 'get_days_data', mock.AsyncMock(return_value={})),
+            mock.patch.object(open_weather_map.flanaapis.weather.history, 'add_days_data', mock.AsyncMock()),
+            mock.patch.object(open_weather_map, 'get_request_with_retries', mock.AsyncMock(return_value={'timezone_offset': 3600})) as get_request_mock
+        ):
+            await open_weather_map.get_weather_api_data(36.72, -4.42, days_back=days_back, days_ahead=days_ahead)
+
+        return [call.args[0] for call in get_request_mock.await_args_list]
+
+    async def test_horizon_limits(self):
+        self.assertEqual(6 * [open_weather_map.PAST_ENDPOINT] + [open_weather_map.PRESENT_FUTURE_ENDPOINT, open_weather_map.NEAR_FUTURE_ENDPOINT], await self._count_requests())
+        self.assertEqual([open_weather_map.PAST_ENDPOINT, open_weather_map.PRESENT_FUTURE_ENDPOINT], await self._count_requests(days_back=0, days_ahead=0))
+        self.assertEqual(3 * [open_weather_map.PAST_ENDPOINT] + [open_weather_map.PRESENT_FUTURE_ENDPOINT, open_weather_map.NEAR_FUTURE_ENDPOINT], await self._count_requests(days_back=2, days_ahead=3))
+
+    async def test_transient_errors_are_retried(self):
+        with (
+            mock.patch('flanautils.get_request', mock.AsyncMock(side_effect=[aiohttp.ClientConnectionError, asyncio.TimeoutError, {'timezone_offset': 3600}])) as get_request_mock,
+            mock.patch.object(asyncio, 'sleep', mock.AsyncMock())
+        ):
+            data = await open_weather_map.get_request_with_retries(open_weather_map.PAST_ENDPOINT, {}, None, asyncio.Semaphore())
+
+        self.assertEqual({'timezone_offset': 3600}, data)
+        self.assertEqual(3, get_request_mock.await_count)
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from flanaapis.geolocation import functions, google_maps, open_street_map, place_cache
+from flanaapis.geolocation.models import Place
+
+PLACES_DATA = [
+    {
+        'display_name': 'Málaga, Andalucía, España',
+        'lat': '36.7213028',
+        'lon': '-4.4216366',
+        'address': {'city': 'Málaga', 'state': 'Andalucía', 'country': 'España', 'country_code': 'es'}
+    }
+]
+
+
+async def get_request(url: str, *_args, **_kwargs) -> dict | list[dict]:
+    return PLACES_DATA[0] if url.endswith('/reverse') else PLACES_DATA
+
+
+class TestNormalizeQuery(unittest.TestCase):
+    def test_normalize_query(self):
+        for place_query in ('Málaga, España', 'malaga,espana', '  MÁLAGA ,  España ', 'Málaga, España'):
+            with self.subTest(place_query=place_query):
+                self.assertEqual('malaga, espana', place_cache.normalize_query(place_query))
+
+
+class TestPlaceCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        os.environ['FLANAAPIS_PLACE_CACHE_PATH'] = os.path.join(self.temporary_directory.name, 'place_cache.sqlite3')
+        os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND'] = '1000'
+        place_cache.memory_cache.clear()
+        open_street_map.reverse_cache.clear()
+
+    def tearDown(self):
+        place_cache.memory_cache.clear()
+        open_street_map.reverse_cache.clear()
+        del os.environ['FLANAAPIS_PLACE_CACHE_PATH']
+        del os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND']
+        self.temporary_directory.cleanup()
+
+    async def test_find_places(self):
+        with mock.patch('flanautils.get_request', mock.AsyncMock(return_value=PLACES_DATA)) as get_request_mock:
+            places = await open_street_map.find_places('Málaga')
+            cached_places = await open_street_map.find_places('  malaga ')
+
+        get_request_mock.assert_awaited_once()
+        self.assertEqual([(place.city, place.latitude, place.longitude) for place in places], [(place.city, place.latitude, place.longitude) for place in cached_places])
+
+    async def test_persistent_tier(self):
+        with mock.patch('flanautils.get_request', mock.AsyncMock(return_value=PLACES_DATA)) as get_request_mock:
+            place = await functions.find_place('Málaga', fast=True)
+            place_cache.memory_cache.clear()
+            stored_place = await functions.find_place('MALAGA', fast=True)
+
+        get_request_mock.assert_awaited_once()
+        self.assertIsInstance(stored_place, Place)
+        self.assertEqual(vars(place), vars(stored_place))
+        self.assertIn(place_cache.create_key('fast_place', 'malaga'), place_cache.memory_cache)
+
+    async def test_fast_mode_keys(self):
+        with (
+            mock.patch.object(google_maps, 'find_place', mock.AsyncMock(return_value=Place('Málaga', 36.72, -4.42))) as google_maps_find_place_mock,
+            mock.patch('flanautils.get_request', get_request)
+        ):
+            await functions.find_place('Málaga', fast=True)
+            await functions.find_place('Málaga')
+            await functions.find_place('malaga')
+
+        google_maps_find_place_mock.assert_awaited_once()
+
+    async def test_not_found(self):
+        find_mock = mock.AsyncMock(return_value=None)
+        key = place_cache.create_key('place', 'nowhere')
+
+        self.assertIsNone(await place_cache.get_or_find(key, find_mock))
+        self.assertIsNone(await place_cache.get_or_find(key, find_mock))
+        find_mock.assert_awaited_once()
+        self.assertLessEqual(place_cache.memory_cache.expires_in(key), place_cache.NOT_FOUND_TTL)
+
+        with mock.patch.object(time, 'time', return_value=time.time() + place_cache.NOT_FOUND_TTL + 1):
+            place_cache.memory_cache.clear()
+            await place_cache.get_or_find(key, find_mock)
+
+        self.assertEqual(2, find_mock.await_count)
+
+    async def test_errors_are_not_cached(self):
+        find_mock = mock.AsyncMock(side_effect=[ConnectionError, Place('Málaga', 36.72, -4.42)])
+        key = place_cache.create_key('place', 'malaga')
+
+        with self.assertRaises(ConnectionError):
+            await place_cache.get_or_find(key, find_mock)
+        self.assertEqual(36.72, (await place_cache.get_or_find(key, find_mock)).latitude)
+
+
+class TestReverseFindPlace(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND'] = '1000'
+        open_street_map.reverse_cache.clear()
+
+    def tearDown(self):
+        open_street_map.reverse_cache.clear()
+        del os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND']
+
+    async def test_close_coordinates_share_request(self):
+        with mock.patch('flanautils.get_request', mock.AsyncMock(return_value=PLACES_DATA[0])) as get_request_mock:
+            place = await open_street_map.reverse_find_place(36.72131, -4.42163)
+            close_place = await open_street_map.reverse_find_place(36.72089, -4.42201)
+            far_place = await open_street_map.reverse_find_place(36.7225, -4.42163)
+
+        self.assertEqual(2, get_request_mock.await_count)
+        self.assertEqual({'lat': 36.721, 'lon': -4.422}, {k: v for k, v in get_request_mock.await_args_list[0].args[1].items() if k in ('lat', 'lon')})
+        self.assertEqual('Málaga, Andalucía, España', str(place))
+        self.assertEqual(vars(place), vars(close_place))
+        self.assertIsNotNone(far_place)
+
+    async def test_concurrent_requests_are_coalesced(self):
+        with mock.patch('flanautils.get_request', mock.AsyncMock(return_value=PLACES_DATA[0])) as get_request_mock:
+            places = await asyncio.gather(*(open_street_map.reverse_find_place(36.72131, -4.42163) for _ in range(3)))
+
+        get_request_mock.assert_awaited_once()
+        self.assertEqual(3, len([place for place in places if str(place) == 'Málaga, Andalucía, España']))
+
+    async def test_not_found(self):
+        with mock.patch('flanautils.get_request', mock.AsyncMock(return_value={'error': 'Unable to geocode'})) as get_request_mock:
+            self.assertIsNone(await open_street_map.reverse_find_place(0, -160))
+            self.assertIsNone(await open_street_map.reverse_find_place(0, -160))
+
+        get_request_mock.assert_awaited_once()
+        self.assertLessEqual(open_street_map.reverse_cache.expires_in((0, -160, open_street_map.REVERSE_CACHE_GRID_SIZE)), place_cache.NOT_FOUND_TTL)
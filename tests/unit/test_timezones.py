@@ -0,0 +1,38 @@
+import datetime
+import unittest
+from unittest import mock
+
+from flanaapis.geolocation import functions, timezones
+
+
+class TestCreateTimezoneData(unittest.TestCase):
+    def test_dst_zone(self):
+        timezone_data = timezones.create_timezone_data('Europe/Madrid', datetime.datetime(2022, 6, 10, 10, tzinfo=datetime.timezone.utc))
+
+        self.assertEqual('Europe/Madrid', timezone_data['zoneName'])
+        self.assertEqual('CEST', timezone_data['abbreviation'])
+        self.assertEqual(7200, timezone_data['gmtOffset'])
+        self.assertEqual('1', timezone_data['dst'])
+        self.assertEqual(1648342800, timezone_data['zoneStart'])
+        self.assertEqual(1667091599, timezone_data['zoneEnd'])
+        self.assertEqual('CET', timezone_data['nextAbbreviation'])
+        self.assertEqual(1654862400, timezone_data['timestamp'])
+        self.assertEqual('2022-06-10 12:00:00', timezone_data['formatted'])
+
+    def test_fixed_zone(self):
+        timezone_data = timezones.create_timezone_data('Asia/Tokyo', datetime.datetime(2022, 6, 10, 10, tzinfo=datetime.timezone.utc))
+
+        self.assertEqual(32400, timezone_data['gmtOffset'])
+        self.assertEqual('0', timezone_data['dst'])
+        self.assertIsNone(timezone_data['zoneEnd'])
+
+
+@unittest.skipIf(timezones.TimezoneFinder is None, 'timezonefinder is not installed')
+class TestFindTimezone(unittest.IsolatedAsyncioTestCase):
+    async def test_offline(self):
+        with mock.patch.object(functions.flanautils, 'get_request', mock.AsyncMock()) as get_request_mock:
+            timezone_data = await functions.find_timezone(36.72, -4.42)
+
+        get_request_mock.assert_not_awaited()
+        self.assertEqual('Europe/Madrid', timezone_data['zoneName'])
+        self.assertIn(timezone_data['gmtOffset'], (3600, 7200))
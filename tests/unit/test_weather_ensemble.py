@@ -0,0 +1,55 @@
+import datetime
+import unittest
+
+from flanaapis.weather import ensemble
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+DATE = datetime.date(2022, 6, 1)
+
+
+def create_day_weather(date: datetime.date, temperatures: dict[int, float | None], max_temperature: float = None) -> DayWeather:
+    day_weather = DayWeather(date, TIMEZONE, max_temperature=max_temperature)
+    for hour, temperature in temperatures.items():
+        day_weather.instant_weathers.append(InstantWeather(datetime.datetime(date.year, date.month, date.day, hour, tzinfo=TIMEZONE), temperature=temperature, humidity=50))
+    return day_weather
+
+
+class TestMeanDayWeathers(unittest.TestCase):
+    def assert_same_day_weathers(self, expected: DayWeather, day_weather: DayWeather):
+        self.assertEqual(expected.date, day_weather.date)
+        self.assertAlmostEqual(expected.max_temperature, day_weather.max_temperature)
+        self.assertEqual([instant_weather.date_time for instant_weather in expected.instant_weathers], [instant_weather.date_time for instant_weather in day_weather.instant_weathers])
+        for expected_instant_weather, instant_weather in zip(expected.instant_weathers, day_weather.instant_weathers):
+            for attribute_name in ensemble.INSTANT_WEATHER_ATTRIBUTE_NAMES:
+                if (expected_value := getattr(expected_instant_weather, attribute_name)) is None:
+                    self.assertIsNone(getattr(instant_weather, attribute_name))
+                else:
+                    self.assertAlmostEqual(expected_value, getattr(instant_weather, attribute_name))
+
+    def test_equivalent_to_day_weather_mean(self):
+        open_day_weather = create_day_weather(DATE, {0: 10, 1: 12, 2: None}, 20)
+        vc_day_weather = create_day_weather(DATE, {1: 14, 2: 16, 3: 18}, 22)
+        google_day_weather = create_day_weather(DATE, {0: 11, 3: 19})
+
+        for ratios in (None, [0.5, 0.3, 0.2]):
+            with self.subTest(ratios=ratios):
+                day_weathers = ensemble.mean_day_weathers(([open_day_weather], [vc_day_weather], [google_day_weather]), ratios)
+                expected = DayWeather.mean([open_day_weather, vc_day_weather, google_day_weather], ratios)
+
+                self.assertEqual(1, len(day_weathers))
+                self.assert_same_day_weathers(expected, day_weathers[0])
+
+    def test_missing_provider_days(self):
+        next_date = DATE + datetime.timedelta(days=1)
+        open_day_weathers = [create_day_weather(DATE, {12: 10}, 20), create_day_weather(next_date, {12: 12}, 21)]
+        vc_day_weathers = [create_day_weather(next_date, {12: 16}, 25)]
+
+        day_weathers = ensemble.mean_day_weathers((open_day_weathers, vc_day_weathers, None), [0.5, 0.3, 0.2])
+
+        self.assertIs(open_day_weathers[0], day_weathers[0])
+        self.assert_same_day_weathers(DayWeather.mean([open_day_weathers[1], vc_day_weathers[0]], [0.6, 0.4]), day_weathers[1])
+
+    def test_non_positive_ratios(self):
+        self.assertTrue(ensemble.can_mean_day_weathers(None))
+        self.assertFalse(ensemble.can_mean_day_weathers([1, 0, 0]))
@@ -0,0 +1,243 @@
+import asyncio
+import datetime
+import gc
+import time
+import unittest
+from unittest import mock
+
+from flanaapis.weather import functions, google, open_weather_map, visual_crossing
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+DATE = datetime.date(2022, 6, 1)
+
+
+def create_provider_mock(temperature: float, delay: float = 0, exception: Exception = None):
+    async def get_day_weathers_by_place(*_args, **_kwargs) -> tuple[InstantWeather, list[DayWeather]]:
+        await asyncio.sleep(delay)
+        if exception:
+            raise exception
+
+        day_weather = DayWeather(DATE, TIMEZONE)
+        day_weather.instant_weathers.append(InstantWeather(datetime.datetime(DATE.year, DATE.month, DATE.day, 12, tzinfo=TIMEZONE), temperature=temperature))
+        return InstantWeather(datetime.datetime.now(TIMEZONE), temperature=temperature), [day_weather]
+
+    return get_day_weathers_by_place
+
+
+class TestGetDayWeathersByPlace(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def _get_day_weathers_by_place(self, open_weather_map_mock, visual_crossing_mock, ratios: list[float] = None, timeouts: dict[str, float] = None) -> tuple[InstantWeather, list[DayWeather]]:
+        with (
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place', open_weather_map_mock),
+            mock.patch.object(visual_crossing, 'get_day_weathers_by_place', visual_crossing_mock),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            return await functions.get_day_weathers_by_place(36.7, -4.4, ratios, timeouts)
+
+    async def test_concurrent_providers(self):
+        gc.collect()  # the garbage of the previous tests must not be collected while timing
+        start = asyncio.get_running_loop().time()
+        current_weather, day_weathers = await self._get_day_weathers_by_place(create_provider_mock(10, delay=0.2), create_provider_mock(20, delay=0.2))
+
+        self.assertLess(asyncio.get_running_loop().time() - start, 0.35)
+        self.assertEqual(15, current_weather.temperature)
+        self.assertEqual(15, day_weathers[0].instant_weathers[0].temperature)
+
+    async def test_late_provider_is_dropped(self):
+        current_weather, day_weathers = await self._get_day_weathers_by_place(create_provider_mock(10), create_provider_mock(20, delay=5), timeouts={'visual_crossing': 0.1})
+
+        self.assertEqual(10, current_weather.temperature)
+        self.assertEqual(10, day_weathers[0].instant_weathers[0].temperature)
+
+    async def test_failed_provider_is_dropped(self):
+        current_weather, day_weathers = await self._get_day_weathers_by_place(create_provider_mock(10, exception=ValueError()), create_provider_mock(20))
+
+        self.assertEqual(20, current_weather.temperature)
+        self.assertEqual(20, day_weathers[0].instant_weathers[0].temperature)
+
+    async def test_ratios_of_dropped_providers(self):
+        current_weather, day_weathers = await self._get_day_weathers_by_place(create_provider_mock(10), create_provider_mock(20), ratios=[0.5, 0.3, 0.2])
+
+        self.assertAlmostEqual(current_weather.temperature, day_weathers[0].instant_weathers[0].temperature)
+
+    async def test_forecast_cache(self):
+        open_weather_map_mock = mock.AsyncMock(side_effect=create_provider_mock(10))
+        visual_crossing_mock = mock.AsyncMock(side_effect=create_provider_mock(20))
+
+        await self._get_day_weathers_by_place(open_weather_map_mock, visual_crossing_mock)
+        current_weather, day_weathers = await self._get_day_weathers_by_place(open_weather_map_mock, visual_crossing_mock)
+
+        self.assertEqual(1, open_weather_map_mock.await_count)
+        self.assertEqual(1, visual_crossing_mock.await_count)
+        self.assertEqual(15, current_weather.temperature)
+        self.assertEqual(15, day_weathers[0].instant_weathers[0].temperature)
+        self.assertEqual(1, functions.forecast_caches['open_weather_map'].hits)
+        self.assertEqual(1, functions.forecast_caches['open_weather_map'].misses)
+
+
+class TestIterateDayWeathersByPlace(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def test_updates(self):
+        with (
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place', create_provider_mock(10, delay=0.2)),
+            mock.patch.object(visual_crossing, 'get_day_weathers_by_place', create_provider_mock(20)),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            updates = [update async for update in functions.iterate_day_weathers_by_place(36.7, -4.4)]
+
+        self.assertEqual([['visual_crossing'], ['open_weather_map', 'visual_crossing']], [providers for providers, *_ in updates])
+        self.assertEqual([], updates[-1][1])
+        self.assertEqual([20, 15], [current_weather.temperature for _, _, current_weather, _ in updates])
+        self.assertEqual(15, updates[-1][3][0].instant_weathers[0].temperature)
+
+
+class TestGetBatchDayWeathers(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def test_same_cell_places_are_requested_once(self):
+        open_weather_map_mock = mock.AsyncMock(side_effect=create_provider_mock(10))
+        visual_crossing_mock = mock.AsyncMock(side_effect=create_provider_mock(20))
+
+        with (
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place', open_weather_map_mock),
+            mock.patch.object(visual_crossing, 'get_day_weathers_by_place', visual_crossing_mock),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            results = await functions.get_batch_day_weathers([(36.7, -4.4), (36.701, -4.401), (40.4, -3.7), (36.7, -4.4)])
+
+        self.assertEqual(4, len(results))
+        self.assertEqual(2, open_weather_map_mock.await_count)
+        self.assertEqual(2, visual_crossing_mock.await_count)
+        self.assertEqual(1, len({call.args[2] for call in open_weather_map_mock.await_args_list}))
+        self.assertIs(results[0], results[1])
+        self.assertEqual([15] * 4, [current_weather.temperature for current_weather, _ in results])
+
+
+class TestStaleWhileRevalidate(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def test_stale_weathers_are_refreshed_in_background(self):
+        open_weather_map_mock = mock.AsyncMock(side_effect=create_provider_mock(10, delay=0.1))
+
+        with (
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place', open_weather_map_mock),
+            mock.patch.object(visual_crossing, 'get_day_weathers_by_place', mock.AsyncMock(return_value=(None, None))),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            await functions.get_day_weathers_by_place(36.7, -4.4)
+            key = list(functions.forecast_caches['open_weather_map']._entries)[0]
+            expiration, weathers = functions.forecast_caches['open_weather_map']._entries[key]
+            functions.forecast_caches['open_weather_map']._entries[key] = (expiration - functions.FORECAST_CACHE_TTLS['open_weather_map'], weathers)
+
+            start = asyncio.get_running_loop().time()
+            current_weather, _ = await functions.get_day_weathers_by_place(36.7, -4.4)
+            elapsed = asyncio.get_running_loop().time() - start
+            await asyncio.gather(*functions._refresh_tasks.values())
+
+        self.assertEqual(10, current_weather.temperature)
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(2, open_weather_map_mock.await_count)
+        self.assertGreater(functions.forecast_caches['open_weather_map'].expires_in(key), 0)
+
+
+class TestFindCachedCoordinates(unittest.TestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    def test_nearest_cell_with_most_providers(self):
+        functions.forecast_caches['open_weather_map'].set((36.72, -4.42), 'weathers')
+        functions.forecast_caches['open_weather_map'].set((36.71, -4.41), 'weathers')
+        functions.forecast_caches['visual_crossing'].set((36.72, -4.42), 'weathers')
+        functions.forecast_caches['open_weather_map'].set((36.7, -4.4), 'weathers', ttl=0)
+
+        self.assertEqual((36.72, -4.42), functions.find_cached_coordinates(36.7, -4.4, radius=4))
+        self.assertEqual((36.71, -4.41), functions.find_cached_coordinates(36.7, -4.4, radius=2))
+        self.assertIsNone(functions.find_cached_coordinates(36.7, -4.4, radius=1))
+        self.assertIsNone(functions.find_cached_coordinates(36.71, -4.41, radius=0))
+
+    def test_grid_and_cached_keys_give_the_same_cell(self):
+        functions.forecast_caches['open_weather_map'].set((36.71, -4.41), 'weathers')
+        functions.forecast_caches['open_weather_map'].set((36.7, -4.41, None, 1), 'weathers')
+        self.assertEqual((36.71, -4.41), functions.find_cached_coordinates(36.7, -4.4, radius=2))  # cached keys
+
+        for longitude in range(100):
+            functions.forecast_caches['google'].set((0, longitude), 'weathers')
+        self.assertEqual((36.71, -4.41), functions.find_cached_coordinates(36.7, -4.4, radius=2))  # grid
+
+    def test_huge_radius(self):
+        functions.forecast_caches['open_weather_map'].set((-33.87, 151.21), 'weathers')
+
+        start = time.perf_counter()
+        self.assertEqual((-33.87, 151.21), functions.find_cached_coordinates(36.7, -4.4, radius=20000))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+
+class TestHorizon(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def test_short_horizon_is_served_from_whole_horizon(self):
+        async def get_day_weathers_by_place(*_args, **_kwargs) -> tuple[InstantWeather, list[DayWeather]]:
+            today = datetime.datetime.now(TIMEZONE).date()
+            return InstantWeather(datetime.datetime.now(TIMEZONE), temperature=10), [DayWeather(today + datetime.timedelta(days=days), TIMEZONE) for days in range(-2, 3)]
+
+        open_weather_map_mock = mock.AsyncMock(side_effect=get_day_weathers_by_place)
+        with (
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place', open_weather_map_mock),
+            mock.patch.object(visual_crossing, 'get_day_weathers_by_place', mock.AsyncMock(return_value=(None, None))),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            _, today_day_weathers = await functions.get_day_weathers_by_place(36.7, -4.4, days_back=0, days_ahead=0)
+            _, all_day_weathers = await functions.get_day_weathers_by_place(36.7, -4.4)
+            _, near_day_weathers = await functions.get_day_weathers_by_place(36.7, -4.4, days_back=1, days_ahead=1)
+
+        self.assertEqual([datetime.datetime.now(TIMEZONE).date()], [day_weather.date for day_weather in today_day_weathers])
+        self.assertEqual(5, len(all_day_weathers))
+        self.assertEqual(3, len(near_day_weathers))
+        self.assertEqual([mock.call(36.7, -4.4, None, 0, 0), mock.call(36.7, -4.4, None, None, None)], open_weather_map_mock.await_args_list)
+
+
+class TestGetCurrentWeather(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        functions.current_weather_cache.clear()
+
+    async def test_current_blocks_only(self):
+        open_weather_map_mock = mock.AsyncMock(return_value=InstantWeather(datetime.datetime.now(TIMEZONE), temperature=10))
+        visual_crossing_mock = mock.AsyncMock(return_value=InstantWeather(datetime.datetime.now(TIMEZONE), temperature=20))
+
+        with (
+            mock.patch.object(open_weather_map, 'get_current_weather', open_weather_map_mock),
+            mock.patch.object(visual_crossing, 'get_current_weather', visual_crossing_mock),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value={'weather_now': {'datetime': 'lunes 12:00', 'temp': 30}})),
+            mock.patch.object(open_weather_map, 'get_day_weathers_by_place') as open_weather_map_days_mock
+        ):
+            current_weather = await functions.get_current_weather(36.7, -4.4)
+            cached_current_weather = await functions.get_current_weather(36.701, -4.401)
+
+        self.assertEqual(20, current_weather.temperature)
+        self.assertEqual(TIMEZONE, current_weather.date_time.tzinfo)
+        self.assertEqual(20, cached_current_weather.temperature)
+        self.assertEqual(1, open_weather_map_mock.await_count)
+        self.assertEqual(1, visual_crossing_mock.await_count)
+        open_weather_map_days_mock.assert_not_called()
+
+    async def test_no_providers(self):
+        with (
+            mock.patch.object(open_weather_map, 'get_current_weather', mock.AsyncMock(side_effect=ValueError)),
+            mock.patch.object(visual_crossing, 'get_current_weather', mock.AsyncMock(side_effect=ValueError)),
+            mock.patch.object(google, 'get_weather_api_data', mock.AsyncMock(return_value=None))
+        ):
+            self.assertIsNone(await functions.get_current_weather(36.7, -4.4))
@@ -0,0 +1,71 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flanaapis.geolocation import timezones
+from flanaapis.weather import functions, history, visual_crossing
+
+DATE = datetime.date(2022, 6, 1)
+TIMEZONE_OFFSET = 7200
+
+
+def create_open_weather_map_day_data(temperature: float) -> dict:
+    midnight = datetime.datetime(DATE.year, DATE.month, DATE.day, tzinfo=datetime.timezone.utc)
+    return {
+        'timezone_offset': TIMEZONE_OFFSET,
+        'hourly': [{'dt': int((midnight + datetime.timedelta(hours=hour)).timestamp()), 'temp': temperature} for hour in range(24)]
+    }
+
+
+def create_visual_crossing_day_data(temperature: float) -> dict:
+    midnight = datetime.datetime(DATE.year, DATE.month, DATE.day, tzinfo=datetime.timezone(datetime.timedelta(seconds=TIMEZONE_OFFSET)))
+    return {
+        'datetime': DATE.isoformat(),
+        'hours': [{'datetimeEpoch': int((midnight + datetime.timedelta(hours=hour)).timestamp()), 'temp': temperature} for hour in range(24)]
+    }
+
+
+class TestWeatherHistory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        os.environ['FLANAAPIS_WEATHER_HISTORY_PATH'] = os.path.join(self.temporary_directory.name, 'weather_history.sqlite3')
+
+    def tearDown(self):
+        del os.environ['FLANAAPIS_WEATHER_HISTORY_PATH']
+        self.temporary_directory.cleanup()
+
+    async def test_days_are_immutable(self):
+        await history.add_days_data('open_weather_map', 36.7213, -4.4214, [(DATE, TIMEZONE_OFFSET, create_open_weather_map_day_data(10))])
+        await history.add_days_data('open_weather_map', 36.7213, -4.4214, [(DATE, TIMEZONE_OFFSET, create_open_weather_map_day_data(20))])
+
+        days_data = await history.get_days_data('open_weather_map', 36.7209, -4.4211, [DATE, DATE + datetime.timedelta(days=1)])
+
+        self.assertEqual([DATE], list(days_data))
+        self.assertEqual((TIMEZONE_OFFSET, create_open_weather_map_day_data(10)), days_data[DATE])
+
+    async def test_iterate_history_instant_weathers(self):
+        await history.add_days_data('open_weather_map', 36.7213, -4.4214, [(DATE, TIMEZONE_OFFSET, create_open_weather_map_day_data(10))])
+        await history.add_days_data('visual_crossing', 36.7213, -4.4214, [(DATE, TIMEZONE_OFFSET, create_visual_crossing_day_data(20))])
+
+        instant_weathers = [instant_weather async for instant_weather in functions.iterate_history_instant_weathers(36.7213, -4.4214, DATE, DATE)]
+
+        self.assertEqual(24, len(instant_weathers))
+        self.assertEqual(sorted(instant_weather.date_time for instant_weather in instant_weathers), [instant_weather.date_time for instant_weather in instant_weathers])
+        self.assertTrue(all(instant_weather.date_time.date() == DATE for instant_weather in instant_weathers))
+        self.assertEqual([20] * 2 + [15] * 22, [instant_weather.temperature for instant_weather in instant_weathers])
+
+    async def test_visual_crossing_past_days_of_the_location(self):
+        location_timezone = datetime.timezone(datetime.timedelta(hours=14))
+        today = datetime.datetime.now(location_timezone).date()
+
+        with (
+            mock.patch.dict(os.environ, {'VISUAL_CROSSING_API_KEY': ''}),
+            mock.patch.object(timezones, 'find_timezone', mock.AsyncMock(return_value={'gmtOffset': 14 * 3600})),
+            mock.patch.object(history, 'get_days_data', mock.AsyncMock(return_value={})) as get_days_data_mock,
+            mock.patch('flanautils.get_request', mock.AsyncMock(return_value={'tzoffset': 14, 'days': []}))
+        ):
+            await visual_crossing.get_weather_api_data(36.7213, -4.4214, days_back=2)
+
+        self.assertEqual([today - datetime.timedelta(days=2), today - datetime.timedelta(days=1)], get_days_data_mock.await_args.args[3])
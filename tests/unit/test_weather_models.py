@@ -0,0 +1,67 @@
+import copy
+import datetime
+import pickle
+import unittest
+
+from flanaapis.weather.models import DayWeather, HourlyInstantWeathers, InstantWeather, Precipitation, PrecipitationType
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+DATE = datetime.date(2022, 6, 1)
+
+
+def create_instant_weather(hour: int, temperature: float = None) -> InstantWeather:
+    return InstantWeather(datetime.datetime(DATE.year, DATE.month, DATE.day, hour, tzinfo=TIMEZONE), temperature=temperature)
+
+
+class TestDayWeather(unittest.TestCase):
+    def test_hour_index(self):
+        day_weather = DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(5, 10)])
+        self.assertIsInstance(day_weather.instant_weathers, HourlyInstantWeathers)
+        self.assertEqual(10, day_weather.get_instant_weather_by_hour(5).temperature)
+        self.assertIsNone(day_weather.get_instant_weather_by_hour(6))
+
+        day_weather.instant_weathers.append(create_instant_weather(6, 11))
+        self.assertEqual(11, day_weather.get_instant_weather_by_hour(6).temperature)
+
+        day_weather.instant_weathers.pop(0)
+        self.assertIsNone(day_weather.get_instant_weather_by_hour(5))
+
+    def test_distribute_days_precipitation_volume(self):
+        next_date = DATE + datetime.timedelta(days=1)
+        day_weathers = [DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(hour) for hour in range(24)]), DayWeather(next_date, TIMEZONE)]
+        start_date = datetime.datetime(DATE.year, DATE.month, DATE.day, 10, tzinfo=TIMEZONE)
+        precipitations = [
+            Precipitation(PrecipitationType.RAIN, start_date, start_date + datetime.timedelta(hours=3), 6),
+            Precipitation(PrecipitationType.RAIN, start_date, start_date + datetime.timedelta(hours=1), 1),
+            Precipitation(PrecipitationType.SNOW, start_date + datetime.timedelta(days=1), start_date + datetime.timedelta(days=1, hours=1), 2)
+        ]
+
+        DayWeather.distribute_days_precipitation_volume(day_weathers, precipitations)
+
+        self.assertEqual([1, 2.5, 2.5], [day_weathers[0].get_instant_weather_by_hour(hour).rain_volume for hour in range(10, 13)])
+        self.assertIsNone(day_weathers[0].get_instant_weather_by_hour(13).rain_volume)
+        self.assertEqual([2], [instant_weather.snow_volume for instant_weather in day_weathers[1].instant_weathers])
+
+    def test_fill_24h_instant_weathers(self):
+        day_weather = DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(12, 20), create_instant_weather(3, 15)])
+        day_weather.fill_24h_instant_weathers()
+
+        self.assertEqual(list(range(24)), [instant_weather.date_time.hour for instant_weather in day_weather.instant_weathers])
+        self.assertEqual(15, day_weather.get_instant_weather_by_hour(3).temperature)
+        self.assertEqual(20, day_weather.get_instant_weather_by_hour(12).temperature)
+
+    def test_mean(self):
+        day_weather_1 = DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(hour, 10) for hour in range(24)])
+        day_weather_2 = DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(hour, 20) for hour in range(12)])
+
+        day_weather = DayWeather.mean([day_weather_1, day_weather_2], [0.5, 0.5])
+
+        self.assertEqual(15, day_weather.get_instant_weather_by_hour(0).temperature)
+        self.assertEqual(10, day_weather.get_instant_weather_by_hour(12).temperature)
+
+    def test_copy(self):
+        day_weather = DayWeather(DATE, TIMEZONE, instant_weathers=[create_instant_weather(hour, hour) for hour in range(24)])
+
+        for day_weather_copy in (copy.deepcopy(day_weather), pickle.loads(pickle.dumps(day_weather))):
+            self.assertIsInstance(day_weather_copy.instant_weathers, HourlyInstantWeathers)
+            self.assertEqual(7, day_weather_copy.get_instant_weather_by_hour(7).temperature)
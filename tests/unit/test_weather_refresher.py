@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from flanaapis import upstream_calls
+from flanaapis.weather import functions
+from flanaapis.weather.refresher import ESTIMATED_REFRESH_CALLS, WeatherRefresher
+
+CELL_REFRESH_CALLS = sum(ESTIMATED_REFRESH_CALLS.values())
+
+
+class TestWeatherRefresher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+
+    async def refresh(self, refresher: WeatherRefresher, refresh_cached_weathers_mock: mock.AsyncMock = None) -> tuple[list[tuple[float, float]], mock.AsyncMock]:
+        with mock.patch.object(functions, 'refresh_cached_weathers', refresh_cached_weathers_mock or mock.AsyncMock()) as refresh_cached_weathers_mock:
+            refreshed_cells = refresher.refresh_hot_cells()
+            await asyncio.gather(*refresher._refresh_tasks.values())
+            await refresher.stop()
+
+        return refreshed_cells, refresh_cached_weathers_mock
+
+    async def test_hot_cells_are_refreshed_within_budget(self):
+        refresher = WeatherRefresher(calls_per_minute=CELL_REFRESH_CALLS * 2, hot_cell_min_requests=2)
+        for latitude, longitude, times in ((36.7, -4.4, 3), (40.4, -3.7, 2), (41.4, 2.2, 2), (43.3, -8.4, 1)):
+            for _ in range(times):
+                refresher.record_request(latitude, longitude)
+
+        with mock.patch.object(functions, 'refresh_cached_weathers', mock.AsyncMock()) as refresh_cached_weathers_mock:
+            refreshed_cells = refresher.refresh_hot_cells()
+            self.assertEqual([], refresher.refresh_hot_cells())
+            await asyncio.gather(*refresher._refresh_tasks.values())
+            await refresher.stop()
+
+        self.assertEqual(3, len(refresher.get_hot_cells()))
+        self.assertEqual([(36.7, -4.4), (40.4, -3.7)], refreshed_cells)
+        self.assertEqual(
+            [mock.call(36.7, -4.4, list(functions.forecast_caches), None, None), mock.call(40.4, -3.7, list(functions.forecast_caches), None, None)],
+            refresh_cached_weathers_mock.call_args_list
+        )
+
+    async def test_only_expiring_providers_are_refreshed(self):
+        refresher = WeatherRefresher(calls_per_minute=CELL_REFRESH_CALLS, hot_cell_min_requests=1)
+        refresher.record_request(36.7, -4.4)
+        functions.forecast_caches['open_weather_map'].set((36.7, -4.4), (None, []))
+        functions.forecast_caches['google'].set((36.7, -4.4), (None, []))
+
+        refreshed_cells, refresh_cached_weathers_mock = await self.refresh(refresher)
+
+        self.assertEqual([(36.7, -4.4)], refreshed_cells)
+        refresh_cached_weathers_mock.assert_called_once_with(36.7, -4.4, ['visual_crossing'], None, None)
+
+    async def test_only_requested_horizons_are_refreshed(self):
+        refresher = WeatherRefresher(calls_per_minute=CELL_REFRESH_CALLS, hot_cell_min_requests=1)
+        refresher.record_request(36.7, -4.4, days_ahead=1)
+
+        _, refresh_cached_weathers_mock = await self.refresh(refresher)
+
+        refresh_cached_weathers_mock.assert_called_once_with(36.7, -4.4, list(functions.forecast_caches), None, 1)
+
+    async def test_horizons_served_by_the_whole_one_are_not_refreshed(self):
+        refresher = WeatherRefresher(calls_per_minute=CELL_REFRESH_CALLS * 2, hot_cell_min_requests=1)
+        refresher.record_request(36.7, -4.4)
+        refresher.record_request(36.7, -4.4, days_ahead=1)
+
+        _, refresh_cached_weathers_mock = await self.refresh(refresher)
+
+        refresh_cached_weathers_mock.assert_called_once_with(36.7, -4.4, list(functions.forecast_caches), None, None)
+
+    async def test_real_calls_are_charged(self):
+        async def refresh_cached_weathers(*_args):
+            for _ in range(CELL_REFRESH_CALLS * 3):
+                upstream_calls.count_call()
+
+        refresher = WeatherRefresher(calls_per_minute=CELL_REFRESH_CALLS * 2, hot_cell_min_requests=1)
+        refresher.record_request(36.7, -4.4)
+
+        await self.refresh(refresher, mock.AsyncMock(side_effect=refresh_cached_weathers))
+
+        self.assertLess(refresher._available_calls, 0)
+        refresher.record_request(40.4, -3.7)
+        self.assertEqual([], refresher.refresh_hot_cells())
+
+    def test_tracking_is_bounded(self):
+        refresher = WeatherRefresher(hot_cell_window=60, max_tracked_cells=2)
+        with mock.patch('time.monotonic', return_value=1000):
+            refresher.record_request(36.7, -4.4)
+            refresher.record_request(36.7, -4.4, days_ahead=1)
+        with mock.patch('time.monotonic', return_value=1100):
+            refresher.record_request(36.7, -4.4)
+            refresher.record_request(40.4, -3.7)
+            refresher.record_request(41.4, 2.2)
+
+        self.assertEqual([(40.4, -3.7), (41.4, 2.2)], list(refresher._cell_requests))
+        self.assertEqual(2, len(refresher._cell_coordinates))
+        self.assertEqual(2, len(refresher._cell_keys))
+
+    def test_old_requests_are_forgotten_while_tracking(self):
+        refresher = WeatherRefresher(hot_cell_window=60)
+        with mock.patch('time.monotonic', return_value=1000):
+            for _ in range(3):
+                refresher.record_request(36.7, -4.4, days_ahead=1)
+        with mock.patch('time.monotonic', return_value=1100):
+            refresher.record_request(36.7, -4.4)
+
+        self.assertEqual(1, len(refresher._cell_requests[36.7, -4.4]))
+        self.assertEqual([(36.7, -4.4)], list(refresher._cell_keys[36.7, -4.4]))
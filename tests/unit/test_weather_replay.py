@@ -0,0 +1,64 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import flanautils
+
+from flanaapis.geolocation import open_street_map, place_cache
+from flanaapis.weather import functions, google, open_weather_map, visual_crossing
+from tests.replay import Cassette, MissingInteractionError, SECRET_PARAMETERS
+
+LATITUDE = 36.72
+LONGITUDE = -4.42
+DATE = datetime.date(2022, 6, 10)
+
+
+class TestWeatherReplay(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        os.environ['FLANAAPIS_WEATHER_HISTORY_PATH'] = os.path.join(self.temporary_directory.name, 'weather_history.sqlite3')
+        os.environ['FLANAAPIS_PLACE_CACHE_PATH'] = os.path.join(self.temporary_directory.name, 'place_cache.sqlite3')
+        os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND'] = '1000'
+        for forecast_cache in functions.forecast_caches.values():
+            forecast_cache.clear()
+        place_cache.memory_cache.clear()
+        open_street_map.reverse_cache.clear()
+        self.cassette = Cassette('weather', mode='replay')
+        self.cassette.__enter__()
+
+    def tearDown(self):
+        self.cassette.__exit__(None, None, None)
+        del os.environ['FLANAAPIS_WEATHER_HISTORY_PATH']
+        del os.environ['FLANAAPIS_PLACE_CACHE_PATH']
+        del os.environ['FLANAAPIS_NOMINATIM_REQUESTS_PER_SECOND']
+        self.temporary_directory.cleanup()
+
+    async def test_providers(self):
+        for provider in (open_weather_map, visual_crossing, google):
+            with self.subTest(provider=provider.__name__):
+                current_weather, day_weathers = await provider.get_day_weathers_by_place(LATITUDE, LONGITUDE)
+
+                self.assertIsNotNone(current_weather)
+                self.assertTrue(day_weathers)
+
+    async def test_get_day_weathers_by_place(self):
+        _, open_weather_map_day_weathers = await open_weather_map.get_day_weathers_by_place(LATITUDE, LONGITUDE)
+        _, visual_crossing_day_weathers = await visual_crossing.get_day_weathers_by_place(LATITUDE, LONGITUDE)
+
+        current_weather, day_weathers = await functions.get_day_weathers_by_place(LATITUDE, LONGITUDE)
+        day_weather = flanautils.find(day_weathers, condition=lambda day_weather_: day_weather_.date == DATE)
+        open_weather_map_day_weather = flanautils.find(open_weather_map_day_weathers, condition=lambda day_weather_: day_weather_.date == DATE)
+        visual_crossing_day_weather = flanautils.find(visual_crossing_day_weathers, condition=lambda day_weather_: day_weather_.date == DATE)
+
+        self.assertIsNotNone(current_weather)
+        self.assertEqual(24, len(day_weather.instant_weathers))
+        self.assertAlmostEqual((open_weather_map_day_weather.max_temperature + visual_crossing_day_weather.max_temperature) / 2, day_weather.max_temperature)
+
+    async def test_missing_interaction(self):
+        with self.assertRaises(MissingInteractionError):
+            await flanautils.get_request('https://api.openweathermap.org/data/2.5/onecall', {'lat': 0, 'lon': 0})
+
+    def test_secrets_are_not_stored(self):
+        for interaction in self.cassette.interactions:
+            self.assertFalse(set(SECRET_PARAMETERS) & set(interaction['params']))
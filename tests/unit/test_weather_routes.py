@@ -0,0 +1,90 @@
+import datetime
+import json
+import unittest
+from unittest import mock
+
+import httpx
+import msgpack
+import ujson
+from fastapi import FastAPI
+
+from flanaapis import sessions
+from flanaapis.weather import functions, routes
+from flanaapis.weather.models import DayWeather, InstantWeather
+
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=2))
+DATE = datetime.date(2022, 6, 1)
+
+
+class TestDayWeatherToColumns(unittest.TestCase):
+    def setUp(self):
+        self.day_weather = DayWeather(
+            DATE,
+            TIMEZONE,
+            sunrise=datetime.datetime(DATE.year, DATE.month, DATE.day, 7, 1, tzinfo=TIMEZONE),
+            min_temperature=15.5,
+            max_temperature=28
+        )
+        for hour in range(24):
+            self.day_weather.instant_weathers.append(InstantWeather(datetime.datetime(DATE.year, DATE.month, DATE.day, hour, tzinfo=TIMEZONE), humidity=50 + hour, temperature=15 + hour / 2))
+
+    def test_same_data_as_dict(self):
+        day_weather_vars = routes.day_weather_to_dict(self.day_weather)
+        day_weather_columns = routes.day_weather_to_columns(self.day_weather)
+
+        self.assertEqual(
+            {k: v for k, v in day_weather_vars.items() if k not in ('sunrise', 'sunset', 'instant_weathers')},
+            {k: v for k, v in day_weather_columns.items() if k not in ('sunrise', 'sunset', 'instant_weathers')}
+        )
+        for field_name, values in day_weather_columns['instant_weathers'].items():
+            self.assertEqual([instant_weather_vars[field_name] for instant_weather_vars in day_weather_vars['instant_weathers']], values)
+        self.assertLess(len(ujson.dumps(day_weather_columns)), len(json.dumps(day_weather_vars)) / 2)
+
+    def test_sunrise(self):
+        day_weather_vars = routes.day_weather_to_dict(self.day_weather)
+        day_weather_columns = routes.day_weather_to_columns(self.day_weather)
+
+        self.assertEqual(datetime.datetime(DATE.year, DATE.month, DATE.day).timestamp(), day_weather_vars['sunrise'])
+        self.assertEqual(self.day_weather.sunrise.timestamp(), day_weather_columns['sunrise'])
+        self.assertIsNone(day_weather_vars['sunset'])
+        self.assertIsNone(day_weather_columns['sunset'])
+
+    def test_fields(self):
+        day_weather_columns = routes.day_weather_to_columns(self.day_weather, routes.parse_fields('temperature'))
+
+        self.assertEqual(['date_time', 'temperature'], list(day_weather_columns['instant_weathers']))
+
+
+class TestWeatherRoute(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = FastAPI()
+        app.include_router(routes.router)
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+        await sessions.start()
+
+    async def asyncTearDown(self):
+        await sessions.stop()
+        await self.client.aclose()
+
+    async def test_shared_session(self):
+        weathers = (InstantWeather(datetime.datetime(DATE.year, DATE.month, DATE.day, tzinfo=TIMEZONE)), [])
+        with mock.patch.object(functions, 'get_day_weathers_by_place', mock.AsyncMock(return_value=weathers)) as get_day_weathers_by_place_mock:
+            for _ in range(2):
+                response = await self.client.get('/weather', params={'latitude': 36.72, 'longitude': -4.42, 'radius': 0})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([sessions.get_session()] * 2, [call.kwargs['session'] for call in get_day_weathers_by_place_mock.await_args_list])
+        self.assertIsNotNone(sessions.get_session())
+
+    async def test_radius_is_bounded(self):
+        response = await self.client.get('/weather', params={'latitude': 36.72, 'longitude': -4.42, 'radius': functions.FORECAST_REUSE_MAX_RADIUS + 1})
+
+        self.assertEqual(422, response.status_code)
+
+    async def test_msgpack(self):
+        weathers = (InstantWeather(datetime.datetime(DATE.year, DATE.month, DATE.day, tzinfo=TIMEZONE), temperature=20), [])
+        with mock.patch.object(functions, 'get_day_weathers_by_place', mock.AsyncMock(return_value=weathers)):
+            response = await self.client.get('/weather', params={'latitude': 36.72, 'longitude': -4.42, 'radius': 0, 'format': 'msgpack'})
+
+        self.assertEqual('application/msgpack', response.headers['content-type'])
+        self.assertEqual(20, msgpack.unpackb(response.content)['current_weather']['temperature'])